@@ -0,0 +1,50 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+from domains.auth.utils.rbac import check_user_role
+from services.metrics import PROMETHEUS_CONTENT_TYPE, metrics_registry, slow_query_log
+from services.profiling import profile_path
+from utils.seeds.create_superuser import SuperAdminRoleInfo
+
+metrics_router = APIRouter(tags=["API METRICS"])
+
+
+@metrics_router.get(
+    path="/metrics",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+)
+async def get_metrics() -> Response:
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@metrics_router.get(
+    path="/metrics/slow-queries",
+    response_class=JSONResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_user_role(["SuperAdmin", "Admin"]))],
+)
+async def list_slow_queries(limit: int = 20) -> JSONResponse:
+    """
+    Slowest statement shapes since startup, ordered by total time spent in them.
+    """
+    return JSONResponse(content=slow_query_log.top(limit=limit))
+
+
+@metrics_router.get(
+    path="/metrics/profiles/{profile_id}",
+    response_class=FileResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_user_role([SuperAdminRoleInfo.title]))],
+)
+async def download_profile(profile_id: str) -> FileResponse:
+    """
+    Folded stacks recorded for a profiled request, ready for flamegraph.pl or speedscope.
+    """
+    path = profile_path(profile_id)
+    if not os.path.exists(path): raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile not found: {profile_id}"
+    )
+    return FileResponse(path, media_type="text/plain", filename=os.path.basename(path))
@@ -0,0 +1,99 @@
+"""
+End-to-end benchmarks against the real application, in-process.
+
+    python -m benchmarks run --scale 0.01                       # ~1k stocks, ~50k sales on SQLite
+    python -m benchmarks run --database-url postgresql://... --scale 1
+    python -m benchmarks compare benchmarks/results/a.json benchmarks/results/b.json
+
+`--scale 1` builds the full dataset: 100k stocks, 1M receipts, ~5M sales and 200k expenses.
+The dataset is built once per database and reused by later runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(os.path.dirname(__file__), '.data', 'benchmark.db')}"
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="build the dataset if needed and run the scenarios")
+    run.add_argument("--database-url", default=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL))
+    run.add_argument("--scale", type=float, default=0.01, help="fraction of the full-size dataset")
+    run.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--scenarios", nargs="*", help="subset of scenarios to run, all by default")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--output", help="result file, defaults to benchmarks/results/<timestamp>-<commit>.json")
+
+    compare = commands.add_parser("compare", help="compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+    from sqlalchemy import select
+
+    from benchmarks.dataset import DatasetBuilder, DatasetSize
+    from benchmarks.report import environment, format_results, save_results
+    from benchmarks.runner import run_scenario
+    from benchmarks.scenarios import SCENARIOS, BenchmarkContext, authenticate
+    from config.jobs import reconcile_stock_totals
+    from db.session import engine
+    from db.table import Base
+    from domains.auth.models import User
+    from main import app
+    from utils.seeds.create_superuser import SuperAdminInfo
+
+    Base.metadata.create_all(engine)
+    async with app.router.lifespan_context(app):
+        with engine.connect() as connection:
+            admin_id = connection.execute(select(User.id).where(User.username == SuperAdminInfo.username)).scalar_one()
+
+        builder = DatasetBuilder(engine, DatasetSize().scaled(args.scale), created_by_id=admin_id, seed=args.seed)
+        if not builder.is_built():
+            await builder.build()
+            await reconcile_stock_totals()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            ctx = BenchmarkContext(client=client, engine=engine, rng=random.Random(args.seed))
+            await authenticate(ctx)
+
+            results = {"environment": environment(args.database_url, args.scale), "scenarios": {}}
+            for name in args.scenarios or SCENARIOS:
+                print(f"running {name} ...", file=sys.stderr)
+                results["scenarios"][name] = await run_scenario(ctx, SCENARIOS[name], args.requests, args.concurrency)
+
+    print(format_results(results))
+    print(f"\nresults written to {save_results(results, args.output)}")
+
+
+def main(argv: list[str]) -> None:
+    args = parse_args(argv)
+    if args.command == "compare":
+        from benchmarks.report import compare_results
+        with open(args.baseline) as baseline, open(args.candidate) as candidate:
+            print(compare_results(json.load(baseline), json.load(candidate)))
+        return
+
+    if args.database_url.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(args.database_url.removeprefix("sqlite:///")) or ".", exist_ok=True)
+    # settings are read at import time, so the environment has to be in place before the app is imported
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SERVER_HOST", "127.0.0.1")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("HASHING_SALT", "benchmark")
+    os.environ.setdefault("QUERY_BUDGET_MODE", "off")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,202 @@
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Iterator
+from uuid import UUID, uuid4
+
+import pendulum
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from config.logger import log
+from domains.shop.models import Expenses, Receipt, Sale, Stock
+from utils.seeds.bulk_seed import DRUGS, EXPENSES, FORMS, PAYMENT_TYPES, STRENGTHS, BulkSeeder, BulkSeedSize
+
+
+@dataclass
+class DatasetSize:
+    stocks: int = 100_000
+    receipts: int = 1_000_000
+    sales_per_receipt: int = 5  # average; the full-size dataset lands near 5M sales
+    expenses: int = 200_000
+    refund_rate: float = 0.02
+    days: int = 365
+
+    def scaled(self, scale: float) -> "DatasetSize":
+        return DatasetSize(
+            stocks=max(int(self.stocks * scale), 50),
+            receipts=max(int(self.receipts * scale), 100),
+            sales_per_receipt=self.sales_per_receipt,
+            expenses=max(int(self.expenses * scale), 20),
+            refund_rate=self.refund_rate,
+            days=self.days,
+        )
+
+
+def stock_name(rng: random.Random) -> str:
+    return f"{rng.choice(DRUGS)} {rng.choice(STRENGTHS)}mg {rng.choice(FORMS)}"
+
+
+class DatasetBuilder:
+    """
+    Fills the shop tables with a consistent synthetic pharmacy history.
+
+    Receipt totals equal the cost of their sales, refunded receipts soft-delete their sales,
+    and every stock's `issues`/`total_issues_cost` match its remaining sales, so the app sees
+    the same invariants it maintains itself. Generation is seeded and reproducible.
+    """
+
+    def __init__(self, engine: Engine, size: DatasetSize, created_by_id: UUID, seed: int = 42, batch_size: int = 10_000):
+        self.engine = engine
+        self.size = size
+        self.created_by_id = created_by_id
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = pendulum.now("UTC")
+
+    def is_built(self) -> bool:
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(Stock.__table__)).scalar() >= self.size.stocks
+
+    async def build(self) -> None:
+        if self.engine.dialect.name == "postgresql": return await self._bulk_build()
+
+        log.info(f"<Benchmark> building dataset {self.size}")
+        stocks = self._stock_rows()
+        self._insert(Stock.__table__, iter(stocks))
+        prices = [(row["id"], row["selling_price"]) for row in stocks]
+        del stocks
+
+        receipts, sales = [], []
+        for receipt, receipt_sales in self._receipts(prices):
+            receipts.append(receipt)
+            sales.extend(receipt_sales)
+            if len(sales) >= self.batch_size:
+                self._insert_many(Receipt.__table__, receipts)
+                self._insert_many(Sale.__table__, sales)
+                receipts, sales = [], []
+        self._insert_many(Receipt.__table__, receipts)
+        self._insert_many(Sale.__table__, sales)
+
+        self._insert(Expenses.__table__, self._expense_rows())
+        self.refresh_stock_counters(self.engine)
+        log.info("<Benchmark> dataset ready")
+
+    async def _bulk_build(self) -> None:
+        """
+        On PostgreSQL the COPY seeder builds the same kind of dataset in a fraction of the time.
+        """
+        await BulkSeeder(self.engine, BulkSeedSize(
+            stocks=self.size.stocks,
+            receipts=self.size.receipts,
+            sales_per_receipt=self.size.sales_per_receipt,
+            expenses=self.size.expenses,
+            refund_rate=self.size.refund_rate,
+            days=self.size.days,
+        ), created_by_id=self.created_by_id, seed=self.seed).seed()
+
+    @staticmethod
+    def refresh_stock_counters(engine: Engine) -> None:
+        """
+        Recompute every stock's sale counters in one set-based statement.
+        """
+        with engine.begin() as connection:
+            connection.execute(text(
+                "UPDATE stocks SET issues = totals.issues, total_issues_cost = totals.cost "
+                "FROM (SELECT item_id, count(*) AS issues, sum(cost) AS cost FROM sales "
+                "WHERE deleted_at IS NULL GROUP BY item_id) AS totals "
+                "WHERE stocks.id = totals.item_id"
+            ))
+
+    def _stock_rows(self) -> list[dict[str, Any]]:
+        rows = []
+        today = self.now.date()
+        for index in range(self.size.stocks):
+            purchase_price = round(self.rng.uniform(0.5, 200), 2)
+            created_at = self._timestamp()
+            rows.append({
+                "id": uuid4(),
+                "ref": f"STK{index:07d}",
+                "name": stock_name(self.rng),
+                "description": None,
+                "purchase_price": purchase_price,
+                "selling_price": round(purchase_price * self.rng.uniform(1.1, 1.6), 2),
+                "quantity": self.rng.randint(50, 5_000),
+                # a few percent already expired, like any real shelf
+                "expiry_date": today + timedelta(days=self.rng.randint(-60, 3 * 365)),
+                "issues": 0,
+                "total_issues_cost": 0,
+                "created_by_id": self.created_by_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "deleted_at": None,
+            })
+        return rows
+
+    def _receipts(self, prices: list[tuple[UUID, float]]) -> Iterator[tuple[dict, list[dict]]]:
+        for _ in range(self.size.receipts):
+            receipt_id = uuid4()
+            created_at = self._timestamp()
+            deleted_at = created_at + timedelta(minutes=5) if self.rng.random() < self.size.refund_rate else None
+            payment_type = self.rng.choice(PAYMENT_TYPES)
+
+            sales = []
+            for item_id, selling_price in self.rng.sample(prices, self.rng.randint(1, 2 * self.size.sales_per_receipt - 1)):
+                quantity = self.rng.randint(1, 3)
+                sales.append({
+                    "id": uuid4(),
+                    "quantity": quantity,
+                    "payment_type": payment_type,
+                    "cost": round(selling_price * quantity, 2),
+                    "item_id": item_id,
+                    "receipt_id": receipt_id,
+                    "created_by_id": self.created_by_id,
+                    "created_at": created_at,
+                    "updated_at": deleted_at or created_at,
+                    "deleted_at": deleted_at,
+                })
+
+            total_cost = round(sum(sale["cost"] for sale in sales), 2)
+            yield {
+                "id": receipt_id,
+                "total_cost": total_cost,
+                "amount_paid": total_cost + self.rng.choice((0, 0, 0, 0.5, 1, 5)),
+                "created_by_id": self.created_by_id,
+                "payment_type": payment_type,
+                "created_at": created_at,
+                "updated_at": deleted_at or created_at,
+                "deleted_at": deleted_at,
+            }, sales
+
+    def _expense_rows(self) -> Iterator[dict[str, Any]]:
+        for _ in range(self.size.expenses):
+            paid_at = self._timestamp()
+            yield {
+                "id": uuid4(),
+                "expense": self.rng.choice(EXPENSES),
+                "price": round(self.rng.uniform(5, 2_000), 2),
+                "description": None,
+                "created_by_id": self.created_by_id,
+                "paid_at": paid_at.naive(),
+                "created_at": paid_at,
+                "updated_at": paid_at,
+                "deleted_at": None,
+            }
+
+    def _timestamp(self) -> pendulum.DateTime:
+        return self.now.subtract(seconds=self.rng.randint(0, self.size.days * 86_400))
+
+    def _insert(self, table: Any, rows: Iterator[dict[str, Any]]) -> None:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._insert_many(table, batch)
+                batch = []
+        self._insert_many(table, batch)
+
+    def _insert_many(self, table: Any, rows: list[dict[str, Any]]) -> None:
+        if not rows: return
+        with self.engine.begin() as connection:
+            connection.execute(insert(table), rows)
@@ -0,0 +1,81 @@
+import json
+import os
+import platform
+import subprocess
+from typing import Any, Optional
+
+import pendulum
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values: return 0.0
+    ordered = sorted(values)
+    index = (len(ordered) - 1) * q
+    lower, upper = int(index), min(int(index) + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def environment(database_url: str, scale: float) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": pendulum.now("UTC").to_iso8601_string(),
+        "commit": commit,
+        "database": database_url.split("://", 1)[0],
+        "scale": scale,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def save_results(results: dict[str, Any], output: Optional[str] = None) -> str:
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = pendulum.parse(results["environment"]["timestamp"]).format("YYYYMMDD-HHmmss")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{results['environment']['commit'] or 'local'}.json")
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    return output
+
+
+def format_results(results: dict[str, Any]) -> str:
+    header = f"{'scenario':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>10}{'errors':>8}"
+    lines = [header, "-" * len(header)]
+    for name, result in results["scenarios"].items():
+        lines.append(
+            f"{name:<22}{result['throughput_rps']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}"
+            f"{result['queries_per_request']:>10}{result['errors']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def compare_results(baseline: dict[str, Any], candidate: dict[str, Any]) -> str:
+    """
+    Side-by-side of two result files; positive percentages mean the candidate is higher.
+    """
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    header = f"{'scenario':<22}{'req/s':>12}{'p50':>12}{'p99':>12}{'queries':>12}"
+    lines = [
+        f"baseline  {baseline['environment']['commit']} ({baseline['environment']['timestamp']})",
+        f"candidate {candidate['environment']['commit']} ({candidate['environment']['timestamp']})",
+        header, "-" * len(header),
+    ]
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None: continue
+        lines.append(
+            f"{name:<22}{change(old['throughput_rps'], new['throughput_rps']):>12}"
+            f"{change(old['p50_ms'], new['p50_ms']):>12}{change(old['p99_ms'], new['p99_ms']):>12}"
+            f"{change(old['queries_per_request'], new['queries_per_request']):>12}"
+        )
+    return "\n".join(lines)
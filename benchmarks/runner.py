@@ -0,0 +1,46 @@
+import asyncio
+from time import perf_counter
+from typing import Any
+
+from benchmarks.report import percentile
+from benchmarks.scenarios import BenchmarkContext, Scenario
+from services.metrics import metrics_registry
+
+
+async def run_scenario(ctx: BenchmarkContext, scenario: Scenario, iterations: int, concurrency: int) -> dict[str, Any]:
+    if scenario.setup: await scenario.setup(ctx, iterations)
+
+    db_queries = metrics_registry.histogram("http_request_db_queries", "SQL statements executed per request.")
+    db_seconds = metrics_registry.histogram("http_request_db_seconds", "Time spent in the database per request.")
+    queries_before, db_time_before = db_queries.totals()[1], db_seconds.totals()[1]
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(iterations))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = perf_counter()
+            response = await scenario.request(ctx)
+            latencies.append(perf_counter() - start)
+            if response.status_code >= 400: errors += 1
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_time = perf_counter() - started
+
+    return {
+        "requests": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_time_s": round(wall_time, 4),
+        "throughput_rps": round(iterations / wall_time, 2) if wall_time else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(max(latencies, default=0) * 1000, 3),
+        "queries_per_request": round((db_queries.totals()[1] - queries_before) / iterations, 2),
+        "db_ms_per_request": round((db_seconds.totals()[1] - db_time_before) / iterations * 1000, 3),
+    }
@@ -0,0 +1,103 @@
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import pendulum
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from benchmarks.dataset import DRUGS
+from config.settings import settings
+from domains.shop.models import Stock
+from utils.seeds.create_superuser import SuperAdminInfo
+
+API = settings.API_PREFIX
+
+
+@dataclass
+class BenchmarkContext:
+    client: httpx.AsyncClient
+    engine: Engine
+    rng: random.Random
+    headers: dict[str, str] = field(default_factory=dict)
+    stock_ids: list[str] = field(default_factory=list)
+    refundable_receipts: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    request: Callable[[BenchmarkContext], Awaitable[httpx.Response]]
+    setup: Optional[Callable[[BenchmarkContext, int], Awaitable[None]]] = None
+
+
+async def login(ctx: BenchmarkContext) -> httpx.Response:
+    return await ctx.client.post(
+        f"{API}/login", data={"username": SuperAdminInfo.username, "password": SuperAdminInfo.password}
+    )
+
+
+async def authenticate(ctx: BenchmarkContext) -> None:
+    response = await login(ctx)
+    response.raise_for_status()
+    ctx.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    today = pendulum.now(settings.TIMEZONE).date()
+    with ctx.engine.connect() as connection:
+        ctx.stock_ids = [str(stock_id) for stock_id in connection.execute(
+            select(Stock.id)
+            .where(Stock.deleted_at.is_(None), Stock.quantity >= 1_000, Stock.expiry_date > today)
+            .limit(5_000)
+        ).scalars()]
+
+
+async def checkout(ctx: BenchmarkContext) -> httpx.Response:
+    items = [
+        {"item_id": item_id, "quantity": ctx.rng.randint(1, 2)}
+        for item_id in ctx.rng.sample(ctx.stock_ids, ctx.rng.randint(1, 5))
+    ]
+    return await ctx.client.post(
+        f"{API}/shop/receipts", json={"amount_paid": 1_000_000, "items": items}, headers=ctx.headers
+    )
+
+
+async def catalogue_search(ctx: BenchmarkContext) -> httpx.Response:
+    return await ctx.client.get(
+        f"{API}/shop/stock", params={"search": ctx.rng.choice(DRUGS)[:5], "limit": 20}, headers=ctx.headers
+    )
+
+
+DASHBOARDS = (
+    "/shop/dash/total_stock_value_and_daily_sale",
+    "/shop/dash/summaries/sales",
+    "/shop/dash/summaries/expenses",
+    "/shop/dash/summaries/stock",
+)
+
+
+async def dashboard_summaries(ctx: BenchmarkContext) -> httpx.Response:
+    return await ctx.client.get(f"{API}{ctx.rng.choice(DASHBOARDS)}", headers=ctx.headers)
+
+
+async def prepare_refunds(ctx: BenchmarkContext, iterations: int) -> None:
+    # receipts are created outside the timed section; each refund consumes one
+    for _ in range(iterations):
+        response = await checkout(ctx)
+        response.raise_for_status()
+        ctx.refundable_receipts.append(response.json()["id"])
+
+
+async def refund(ctx: BenchmarkContext) -> httpx.Response:
+    return await ctx.client.delete(f"{API}/shop/receipts/{ctx.refundable_receipts.pop()}", headers=ctx.headers)
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        Scenario("login", login),
+        Scenario("catalogue_search", catalogue_search),
+        Scenario("dashboard_summaries", dashboard_summaries),
+        Scenario("checkout", checkout),
+        Scenario("refund", refund, setup=prepare_refunds),
+    )
+}
@@ -2,7 +2,12 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from config.jobs import register_jobs, scheduler
 from config.logger import log
+from config.settings import settings
+from db.session import engine
+from services.invalidation import invalidation_bus
+from services.storage import get_client
 # from db.events import inspect_db_server_on_connection, inspect_db_server_on_close  # noqa
 from utils.seeds.create_superuser import create_system_admin
 
@@ -11,8 +16,15 @@ from utils.seeds.create_superuser import create_system_admin
 async def event_manager(app: FastAPI):
     log.info(msg=f"Initializing {app.title}")
     await create_system_admin()
+    if settings.SCHEDULER_ENABLED:
+        register_jobs()
+        await scheduler.start()
+    await invalidation_bus.start(engine)
     log.info(msg=f"Application v{app.version} started elegantly!")
     yield
     log.info(msg="Goodbye 🚀")
+    await scheduler.stop()
+    await invalidation_bus.stop()
+    await get_client().close()
 
     log.info(msg=f"Application v{app.version} shut down gracefully!")
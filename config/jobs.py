@@ -0,0 +1,63 @@
+import pendulum
+
+from config.logger import log
+from config.settings import settings
+from db.session import AuthSessionLocal, ReportingSessionLocal, SessionLocal, engine
+from services.metrics import metrics_registry
+from services.scheduler import CronTrigger, IntervalTrigger, Scheduler
+
+scheduler = Scheduler(engine, metrics_registry, timezone=settings.TIMEZONE)
+
+
+async def refresh_leaderboards() -> None:
+    from domains.shop.services.leaderboard import stock_leaderboards
+
+    with ReportingSessionLocal() as db:
+        await stock_leaderboards.refresh(db=db)
+
+
+async def reconcile_stock_totals() -> None:
+    from domains.shop.services.stock import stock_service
+
+    with SessionLocal() as db:
+        await stock_service.reconcile_totals(db=db)
+
+
+async def prune_revoked_tokens() -> None:
+    from domains.auth.services.revoked_token import revoked_token_service
+
+    with AuthSessionLocal() as db:
+        pruned = await revoked_token_service.prune_expired_tokens(db=db)
+    if pruned: log.info(f"<Scheduler> pruned {pruned} expired revoked tokens")
+
+
+async def prune_idempotency_keys() -> None:
+    from domains.common.repositories.idempotency_key import idempotency_key_actions
+
+    with SessionLocal() as db:
+        pruned = await idempotency_key_actions.prune(db=db, expired_before=pendulum.now())
+    if pruned: log.info(f"<Scheduler> pruned {pruned} expired idempotency keys")
+
+
+def register_jobs() -> None:
+    if scheduler.jobs: return
+    jitter = settings.SCHEDULER_JITTER_SECONDS
+    # the leaderboards live in each worker's memory, so every worker refreshes its own ahead of the TTL
+    scheduler.add_job(
+        "refresh_leaderboards", refresh_leaderboards,
+        IntervalTrigger(settings.LEADERBOARD_TTL_SECONDS / 2, jitter=min(jitter, settings.LEADERBOARD_TTL_SECONDS / 4)),
+        leader_only=False,
+    )
+    scheduler.add_job(
+        "reconcile_stock_totals", reconcile_stock_totals,
+        IntervalTrigger(settings.STOCK_TOTALS_VERIFY_INTERVAL_SECONDS, jitter=jitter),
+        run_at_startup=True,
+    )
+    scheduler.add_job(
+        "prune_revoked_tokens", prune_revoked_tokens,
+        CronTrigger(settings.REVOKED_TOKEN_PRUNE_CRON, jitter=jitter),
+    )
+    scheduler.add_job(
+        "prune_idempotency_keys", prune_idempotency_keys,
+        IntervalTrigger(3_600, jitter=jitter),
+    )
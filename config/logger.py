@@ -1,9 +1,109 @@
+import atexit
+import copy
+import json
 from functools import lru_cache
-from logging import basicConfig, getLogger
+from logging import ERROR, Filter, Formatter, LogRecord, StreamHandler, WARNING, basicConfig, getLogger, makeLogRecord
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from threading import Lock
+from time import monotonic
 
 from config.settings import settings
 
 
+class JsonFormatter(Formatter):
+    """
+    One JSON object per line, for log shippers that would otherwise have to parse the text format.
+    """
+
+    def format(self, record: LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.exc_info: payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text: payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class RateLimitFilter(Filter):
+    """
+    Lets through at most `burst` error records per call site in every `window` seconds.
+
+    The first record of the next window carries the number of records suppressed in between,
+    so a failing dependency produces a handful of tracebacks a minute instead of one per request.
+    """
+
+    def __init__(self, window: float, burst: int):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._lock = Lock()
+        self._sites: dict[tuple[str, int], list] = {}  # call site -> [window start, emitted, suppressed]
+
+    def filter(self, record: LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno < ERROR: return True
+
+        now = monotonic()
+        with self._lock:
+            site = self._sites.setdefault((record.pathname, record.lineno), [now, 0, 0])
+            if now - site[0] >= self.window:
+                suppressed = site[2]
+                site[:] = [now, 0, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar records in the last {self.window:g}s)"
+            if site[1] >= self.burst:
+                site[2] += 1
+                return False
+            site[1] += 1
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to a background listener without ever blocking the caller.
+
+    Unlike the stdlib handler, the traceback is not formatted here: the record keeps its
+    `exc_info` and the listener thread renders it, so `log.exception` on the event loop costs
+    a copy and a queue put. When the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+            self._unreported += 1
+            return
+
+        if self._unreported:
+            dropped, self._unreported = self._unreported, 0
+            try:
+                self.queue.put_nowait(makeLogRecord({
+                    "name": record.name,
+                    "levelno": WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Logging queue was full, dropped {dropped} records",
+                }))
+            except Full:
+                self._unreported += dropped
+
+
 class AppLogger:
     __instance = None
 
@@ -14,30 +114,58 @@ class AppLogger:
         return cls.__instance
 
     def __setup_logger(self):
-        basicConfig(
-            format="%(levelname)s:     %(asctime)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-            level=settings.LOGGING_LEVEL,
+        datefmt = "%Y-%m-%d %H:%M:%S"
+        sink = StreamHandler()
+        sink.setFormatter(
+            JsonFormatter(datefmt=datefmt)
+            if settings.LOGGING_JSON
+            else Formatter(fmt="%(levelname)s:     %(asctime)s - %(message)s", datefmt=datefmt)
         )
+
+        self.queue_handler = NonBlockingQueueHandler(Queue(maxsize=settings.LOGGING_QUEUE_SIZE))
+        self.queue_handler.addFilter(
+            RateLimitFilter(window=settings.LOGGING_RATE_LIMIT_WINDOW, burst=settings.LOGGING_RATE_LIMIT_BURST)
+        )
+        self.listener = QueueListener(self.queue_handler.queue, sink, respect_handler_level=True)
+        self.sink = sink
+
+        basicConfig(level=settings.LOGGING_LEVEL, handlers=[self.queue_handler])
+        self.listener.start()
+        atexit.register(self.shutdown)
         self.logger = getLogger(name=settings.TITLE)
 
+    def shutdown(self):
+        """
+        Drain the queue and fall back to writing synchronously, so records logged after
+        shutdown (e.g. by the server itself) are not lost.
+        """
+        if self.listener._thread is None: return
+        self.listener.stop()
+
+        root = getLogger()
+        root.removeHandler(self.queue_handler)
+        for log_filter in self.queue_handler.filters: self.sink.addFilter(log_filter)
+        root.addHandler(self.sink)
+
+    # stacklevel=2 attributes records to the caller rather than to this wrapper, which is what
+    # the rate limiter keys on and what %(pathname)s / %(lineno)d should show.
     def critical(self, msg: str, exc_info: bool = False):
-        return self.logger.critical(msg=msg, exc_info=exc_info)
+        return self.logger.critical(msg=msg, exc_info=exc_info, stacklevel=2)
 
     def debug(self, msg: str, exc_info: bool = False):
-        return self.logger.debug(msg=msg, exc_info=exc_info)
+        return self.logger.debug(msg=msg, exc_info=exc_info, stacklevel=2)
 
     def error(self, msg: str, exc_info: bool = False):
-        return self.logger.error(msg=msg, exc_info=exc_info)
+        return self.logger.error(msg=msg, exc_info=exc_info, stacklevel=2)
 
     def info(self, msg: str, exc_info: bool = False):
-        return self.logger.info(msg=msg, exc_info=exc_info)
+        return self.logger.info(msg=msg, exc_info=exc_info, stacklevel=2)
 
     def warning(self, msg: str, exc_info: bool = False):
-        return self.logger.warning(msg=msg, exc_info=exc_info)
+        return self.logger.warning(msg=msg, exc_info=exc_info, stacklevel=2)
 
     def exception(self, msg: str, exc_info: bool = True):
-        return self.logger.exception(msg=msg, exc_info=exc_info)
+        return self.logger.exception(msg=msg, exc_info=exc_info, stacklevel=2)
 
 
 @lru_cache()
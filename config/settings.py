@@ -42,10 +42,19 @@ class AppSettings(BaseSettings):
         "DELETE",
     )
     ALLOWED_HEADER_LIST: str = "*"
+    EXPOSED_HEADER_LIST: list[str] = (  # response headers browser clients may read
+        "Retry-After",
+        "ETag",
+        "Idempotent-Replayed",
+    )
     LOGGING_LEVEL: int = INFO
     ACCESS_LOGGER: str = "uvicorn.access"
     ASGI_LOGGER: str = "uvicorn.asgi"
     LOGGERS: tuple[str, str] = (ASGI_LOGGER, ASGI_LOGGER)
+    LOGGING_QUEUE_SIZE: int = 10_000  # records beyond this are dropped (and counted) instead of blocking
+    LOGGING_JSON: bool = False
+    LOGGING_RATE_LIMIT_WINDOW: float = 60.0  # seconds
+    LOGGING_RATE_LIMIT_BURST: int = 5  # errors per call site per window, 0 disables rate limiting
     SECRET_KEY: Annotated[str, SecretStr]
 
     # Security Hashing
@@ -60,14 +69,96 @@ class AppSettings(BaseSettings):
     DB_POOL_SIZE: int = 100
     DB_MAX_POOL_CON: int = 80
     DB_POOL_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 10_000  # Postgres only, like the other statement timeouts
+    DB_REPORTING_POOL_SIZE: int = 10  # dashboards and summaries
+    DB_REPORTING_POOL_OVERFLOW: int = 5
+    DB_REPORTING_POOL_TIMEOUT: int = 10
+    DB_REPORTING_STATEMENT_TIMEOUT_MS: int = 60_000
+    DB_AUTH_POOL_SIZE: int = 10  # token checks, logins and user administration
+    DB_AUTH_POOL_OVERFLOW: int = 10
+    DB_AUTH_POOL_TIMEOUT: int = 5
+    DB_AUTH_STATEMENT_TIMEOUT_MS: int = 2_000
     IS_DB_ECHO_LOG: bool = False
+    QUERY_BUDGET_MODE: str = "warn"  # "off", "warn" (log) or "raise" (fail the request; meant for test runs)
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5  # executions of one statement shape per request that count as N+1
+    REQUEST_TIMEOUT_SECONDS: float = 10.0  # database time per request; routes may declare their own
+    REPORTS_TIMEOUT_SECONDS: float = 30.0
+    MAX_PAGE_SIZE: int = 500  # upper bound on `limit` for list endpoints
+    MAX_PATTERN_TERMS: int = 10  # ILIKE alternatives accepted per search field
+    MAX_PATTERN_LENGTH: int = 100
+    TIMESERIES_MAX_BUCKETS: int = 1_000
+    LEADERBOARD_SIZE: int = 100  # entries kept per window and ranking; deeper pages fall back to the query path
+    LEADERBOARD_TTL_SECONDS: int = 300  # full rebuild interval; sales and refunds are applied in between
+    LEADERBOARD_MAX_STALENESS_SECONDS: float = 5.0  # rebuild at most this often once any worker changed sales or stocks
+    STOCK_TOTALS_VERIFY_INTERVAL_SECONDS: int = 3_600  # recompute the running stock valuation and fix drift
+    STOCK_TOTALS_SLOTS: int = 16  # rows the running valuation is striped across, so writers do not queue on one lock
+    DASHBOARD_CACHE_TTL_SECONDS: float = 5.0  # identical dashboard reads share one computation, then its result for this long
+    INVALIDATION_CHANNEL: str = "cache_invalidation"  # Postgres NOTIFY channel telling workers what to evict
+    INVALIDATION_MAX_KEYS: int = 50  # changed rows listed per table; beyond that the whole table counts as changed
+    CHECKOUT_BATCHING_ENABLED: bool = False  # group-commit concurrent checkouts, see CheckoutBatcher
+    CHECKOUT_BATCH_WINDOW_MS: float = 5.0
+    CHECKOUT_BATCH_MAX_SIZE: int = 50
+    CHECKOUT_RETRY_ATTEMPTS: int = 3  # runs of a checkout that hits a deadlock or serialization failure
+    CHECKOUT_RETRY_BACKOFF_MS: float = 20.0
     IS_DB_EXPIRE_ON_COMMIT: bool = False
     IS_DB_FORCE_ROLLBACK: bool = True
     # File Storage
     BASE_DIR: Any = Path(__file__).resolve().parent.parent
+    STORAGE_BACKEND: str = "local"
 
     UPLOAD_URL: str = "/uploads/"
     UPLOAD_ROOT: str = os.path.join(BASE_DIR, 'uploads')
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_MAX_SIZE: int = 25 * 1024 * 1024
+    UPLOAD_MIME_SNIFF_SIZE: int = 2048
+    STORAGE_STREAM_CHUNK_SIZE: int = 256 * 1024
+
+    # S3 Storage (STORAGE_BACKEND="s3"); any S3-compatible endpoint, e.g. MinIO or moto server
+    AWS_S3_ENDPOINT_URL: str = "https://s3.amazonaws.com"
+    AWS_S3_BUCKET: str = ""
+    AWS_S3_REGION: str = "us-east-1"
+    AWS_ACCESS_KEY_ID: str = ""
+    AWS_SECRET_ACCESS_KEY: str = ""
+    AWS_S3_CUSTOM_DOMAIN: str = ""
+    AWS_S3_PART_SIZE: int = 8 * 1024 * 1024
+    AWS_S3_MAX_CONCURRENCY: int = 8
+    AWS_S3_MAX_CONNECTIONS: int = 32
+    AWS_S3_TIMEOUT: int = 60
+
+    # Slow Query Log
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0  # share of slow SELECTs re-run under EXPLAIN ANALYZE (PostgreSQL only)
+    SLOW_QUERY_MAX_PARAMETERS_LENGTH: int = 500
+    SLOW_QUERY_LOG_FILE: str = os.path.join(BASE_DIR, "logs", "slow_queries.log")
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+
+    # Request Profiler
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = os.path.join(BASE_DIR, "logs", "profiles")
+
+    # Idempotency Keys
+    IDEMPOTENCY_HEADER: str = "Idempotency-Key"
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60  # a first attempt still unfinished after this is presumed dead
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 65_536
+    # admission control: concurrent requests per route class, kept under DB_POOL_SIZE together
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_CHECKOUT_LIMIT: int = 32
+    ADMISSION_CHECKOUT_QUEUE: int = 64
+    ADMISSION_READS_LIMIT: int = 48
+    ADMISSION_READS_QUEUE: int = 96
+    ADMISSION_REPORTS_LIMIT: int = 8
+    ADMISSION_REPORTS_QUEUE: int = 16
+    ADMISSION_MAX_WAIT_SECONDS: float = 2.0  # longer waits are shed rather than left to time out on the pool
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Scheduler
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_JITTER_SECONDS: float = 30.0
+    REVOKED_TOKEN_PRUNE_CRON: str = "15 3 * * *"
 
     # jwt
     ACCESS_TOKEN_EXPIRES_IN: int = 60
@@ -9,12 +9,15 @@ from pydantic import BaseModel, UUID4
 from sqlalchemy import or_, desc, select, delete
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from starlette import status
 
 from config.logger import log
+from config.settings import settings
 from db.table import Base
 from utils.exceptions.exc_400 import http_400_exc_bad_request
 from utils.exceptions.exc_409 import http_409_exc_conflict
+from utils.exceptions.exc_412 import http_412_exc_precondition_failed
 from utils.exceptions.exc_500 import http_500_exc_internal_server_error
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -22,6 +25,13 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def page_limit(limit: int) -> int:
+    """
+    Clamp a requested page size to `MAX_PAGE_SIZE`; a negative LIMIT means no limit at all to some databases.
+    """
+    return max(0, min(limit, settings.MAX_PAGE_SIZE))
+
+
 class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Base class for CRUD operations on database models.
@@ -133,7 +143,7 @@ class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
             if time_range_max: query = query.filter(self.model.created_at <= time_range_max)
 
             query = await self._get_ordering(query=query, order_by=order_by)
-            results = query.offset(skip).limit(limit).all()
+            results = query.offset(skip).limit(page_limit(limit)).all()
             return results
         except HTTPException:
             raise
@@ -172,7 +182,7 @@ class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
                 if value is not None: query = query.filter(getattr(self.model, field) == value)
 
             query = await self._get_ordering(query=query, order_by=order_by)
-            results = query.offset(skip).limit(limit).all()
+            results = query.offset(skip).limit(page_limit(limit)).all()
             return results
 
         except HTTPException:
@@ -215,14 +225,24 @@ class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
 
                     valid_patterns = [p.strip() for p in pattern if p]
                     if not valid_patterns: continue
+                    if len(valid_patterns) > settings.MAX_PATTERN_TERMS: raise await http_400_exc_bad_request(
+                        f"Search on {field} accepts at most {settings.MAX_PATTERN_TERMS} terms."
+                    )
+                    if any(len(p) > settings.MAX_PATTERN_LENGTH for p in valid_patterns):
+                        raise await http_400_exc_bad_request(
+                            f"Search terms should be at most {settings.MAX_PATTERN_LENGTH} characters long."
+                        )
 
                     query = query.filter(or_(*[field_attr.ilike(f"%{p}%") for p in valid_patterns]))
 
                 else:
+                    if len(str(pattern)) > settings.MAX_PATTERN_LENGTH: raise await http_400_exc_bad_request(
+                        f"Search terms should be at most {settings.MAX_PATTERN_LENGTH} characters long."
+                    )
                     query = query.filter(field_attr.ilike(f"%{pattern}%"))
 
             query = await self._get_ordering(query=query, order_by=order_by)
-            result = query.offset(skip).limit(limit).all()
+            result = query.offset(skip).limit(page_limit(limit)).all()
             return result
 
         except HTTPException:
@@ -300,7 +320,8 @@ class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
             self, *,
             db: Session,
             db_obj: ModelType,
-            data: Union[UpdateSchemaType, Dict[str, Any]]
+            data: Union[UpdateSchemaType, Dict[str, Any]],
+            version: Optional[int] = None
     ) -> ModelType:
         """
         Update an existing record.
@@ -309,10 +330,16 @@ class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
             db: Database session
             db_obj: Existing record to update
             data: Update data (Pydantic model or dict)
+            version: Version the client last read (If-Match), for models with a `VersionedMixin`
 
         Returns:
             ModelType: Updated record
+
+        Raises:
+            HTTPException: 412 if `version` is not current, 409 if the record changed while updating
         """
+        if version is not None and getattr(db_obj, "version", version) != version:
+            raise await http_412_exc_precondition_failed()
         try:
             update_data = data.model_dump(exclude_none=True) if isinstance(data, BaseModel) else data
             for field, value in update_data.items():
@@ -323,6 +350,11 @@ class BaseCRUDRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
             db.refresh(db_obj)
 
             return db_obj
+        except StaleDataError:
+            db.rollback()
+            raise await http_409_exc_conflict(
+                f"{self.model.__name__} was modified by another request. Fetch it again and retry."
+            )
         except:
             db.rollback()
             log.exception(f"Error updating {self.model.__name__}")
@@ -1,3 +1,4 @@
 from db.table import Base  # noqa
 from domains.auth.models import *  # noqa
 from domains.shop.models import *  # noqa
+from domains.common.models import *  # noqa
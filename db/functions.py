@@ -0,0 +1,22 @@
+from typing import Literal
+
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
+TimeBucket = Literal["hour", "day", "week", "month"]
+
+# SQLite has no date_trunc; strftime/date modifiers give the same bucket starts (weeks start on Monday)
+_SQLITE_BUCKETS = {
+    "hour": lambda column: func.strftime("%Y-%m-%d %H:00:00", column),
+    "day": lambda column: func.strftime("%Y-%m-%d 00:00:00", column),
+    "week": lambda column: func.strftime("%Y-%m-%d 00:00:00", column, "weekday 0", "-6 days"),
+    "month": lambda column: func.strftime("%Y-%m-01 00:00:00", column),
+}
+
+
+def date_bucket(column: ColumnElement, interval: TimeBucket, dialect: str) -> ColumnElement:
+    """
+    Truncate a timestamp column to the start of its hour/day/week/month bucket.
+    """
+    if dialect == "sqlite": return _SQLITE_BUCKETS[interval](column)
+    return func.date_trunc(interval, column)
@@ -0,0 +1,46 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy.exc import DBAPIError
+
+from config.logger import log
+from services.metrics import metrics_registry
+
+T = TypeVar("T")
+
+# serialization_failure, deadlock_detected
+TRANSIENT_SQLSTATES = {"40001", "40P01"}
+
+transaction_retries = metrics_registry.counter(
+    "db_transaction_retries_total", "Transactions retried after a deadlock or serialization failure.", ("operation",)
+)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    True for database errors that are worth retrying as-is: the transaction lost a race, not an argument.
+    """
+    if not isinstance(exc, DBAPIError): return False
+    # psycopg2 exposes the SQLSTATE as `pgcode`, psycopg 3 as `sqlstate`
+    code = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    if code: return code in TRANSIENT_SQLSTATES
+    return "database is locked" in str(exc.orig)
+
+
+async def retry_transient(
+        func: Callable[[], Awaitable[T]], *, operation: str, attempts: int, backoff_ms: float
+) -> T:
+    """
+    Run `func`, running it again up to `attempts` times in all when it fails with a transient
+    database error. `func` must start its own transaction and roll it back on failure.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return await func()
+        except Exception as exc:
+            if attempt == attempts or not is_transient(exc): raise
+            transaction_retries.inc(operation=operation)
+            log.warning(f"<Retry> {operation} hit a transient error (attempt {attempt}/{attempts}): {exc.orig}")
+            # full jitter, so the transactions that collided do not collide again
+            await asyncio.sleep(random.uniform(0, backoff_ms * 2 ** (attempt - 1)) / 1000)
@@ -1,24 +1,82 @@
+from typing import Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from config.settings import settings
+from services.metrics import instrument_engine, metrics_registry
+from services.timeouts import instrument_timeouts
 
-# Create async engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.IS_DB_ECHO_LOG,
-    pool_size=settings.DB_POOL_SIZE,
-    pool_recycle=3600,
-    max_overflow=settings.DB_POOL_OVERFLOW,
-    pool_pre_ping=True,
-)
 
-# Create async session factory
+def create_pool_engine(name: str, *, pool_size: int, max_overflow: int, pool_timeout: int, statement_timeout_ms: int) -> Engine:
+    """
+    Create the engine behind one named connection pool. On Postgres every connection of the
+    pool gets its own `statement_timeout`, so a runaway query is cancelled by the server.
+    """
+    connect_args = {}
+    if settings.DATABASE_URL.startswith("postgresql") and statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.IS_DB_ECHO_LOG,
+        pool_size=pool_size,
+        pool_recycle=3600,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+    instrument_engine(engine, metrics_registry, pool=name)
+    instrument_timeouts(engine, statement_timeout_ms=statement_timeout_ms)
+    return engine
+
+
+# Separate pools per workload, so reports or a burst of logins cannot starve checkout of connections
+engines: Dict[str, Engine] = {
+    "oltp": create_pool_engine(
+        "oltp",
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_POOL_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+    ),
+    "reporting": create_pool_engine(
+        "reporting",
+        pool_size=settings.DB_REPORTING_POOL_SIZE,
+        max_overflow=settings.DB_REPORTING_POOL_OVERFLOW,
+        pool_timeout=settings.DB_REPORTING_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_REPORTING_STATEMENT_TIMEOUT_MS,
+    ),
+    "auth": create_pool_engine(
+        "auth",
+        pool_size=settings.DB_AUTH_POOL_SIZE,
+        max_overflow=settings.DB_AUTH_POOL_OVERFLOW,
+        pool_timeout=settings.DB_AUTH_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_AUTH_STATEMENT_TIMEOUT_MS,
+    ),
+}
+engine = engines["oltp"]
+
+# Create session factories
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
+ReportingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engines["reporting"]
+)
+# auth lookups commit as soon as they are done to hand their connection back for the rest of
+# the request, so the loaded user must survive the commit
+AuthSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engines["auth"]
+)
 
 
 def get_db():
@@ -27,3 +85,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_reporting_db():
+    db = ReportingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_auth_db():
+    db = AuthSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -6,7 +6,7 @@ from uuid import uuid4
 import inflect
 import pendulum
 import sqlalchemy
-from sqlalchemy import DateTime, Column
+from sqlalchemy import DateTime, Column, Integer, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import as_declarative
 from sqlalchemy.orm import DeclarativeBase, declared_attr
@@ -68,3 +68,19 @@ class BaseModel(BaseMethodMixin, Base):
     def is_deleted(self) -> bool:
         if self.deleted_at is None: return False
         return True
+
+
+class VersionedMixin(object):
+    """
+    Opt-in optimistic locking: every ORM update bumps `version` and only applies if the row still
+    has the version that was read, raising StaleDataError otherwise. Set-based UPDATEs on these
+    tables should bump it themselves.
+    """
+
+    @declared_attr
+    def version(cls):
+        return Column(Integer, nullable=False, default=1, server_default=text("1"))
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"version_id_col": cls.version}
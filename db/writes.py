@@ -0,0 +1,28 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+def has_writes(session: Session) -> bool:
+    """
+    Whether the session's transaction changed anything, for `before_commit` listeners: objects
+    already flushed or bulk statements, plus pending objects the commit is about to flush.
+    """
+    return bool(session.info.get("writes") or session.new or session.dirty or session.deleted)
+
+
+@event.listens_for(Session, "after_flush")
+def note_flushed_writes(session: Session, flush_context: Any) -> None:
+    session.info["writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def note_bulk_writes(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["writes"] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def forget_writes(session: Session, transaction: Any) -> None:
+    if transaction.parent is None: session.info.pop("writes", None)
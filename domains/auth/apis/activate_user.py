@@ -3,7 +3,7 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from crud.base_schema import HTTPError
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.utils import get_current_user
 from domains.auth.utils.rbac import check_user_role
@@ -20,7 +20,7 @@ activate_user_router = APIRouter(prefix="/user")
     dependencies=[Depends(check_user_role(["SystemAdmin", "Admin", "Manager"]))],
 )
 async def activate_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> None:
@@ -3,7 +3,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models.user import User
 from domains.auth.utils.get_current_user import get_current_user
 from domains.auth.schemas.user import ChangePasswordSchema
@@ -17,7 +17,7 @@ change_password_router = APIRouter(prefix='/users')
     status_code=status.HTTP_204_NO_CONTENT,
 )
 async def change_password(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         passwords_in: ChangePasswordSchema
 ) -> None:
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.utils import get_current_user
 from domains.auth.schemas.user import UserSchema
@@ -11,5 +11,5 @@ current_user_router = APIRouter(prefix="/users")
 
 
 @current_user_router.get("/me", response_model=UserSchema)
-async def get_current_user_details(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_current_user_details(db: Session = Depends(get_auth_db), current_user: User = Depends(get_current_user)):
     return await user_service.get_user(db=db, id=current_user.id)
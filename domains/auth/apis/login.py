@@ -6,7 +6,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from config.settings import settings
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.utils.authenticate_user import authenticate_user
 from domains.auth.utils.create_token import create_refresh_token, create_access_token
 from domains.auth.schemas.token import Token
@@ -17,7 +17,7 @@ login_router = APIRouter()
 @login_router.post("/login")
 async def get_access_token(
         form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_auth_db)
 ) -> Token:
     user = await authenticate_user(db, form_data.username, form_data.password)
 
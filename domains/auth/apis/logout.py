@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from starlette import status
 
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.utils import get_current_user
 from domains.auth.services.user import user_service
@@ -16,7 +16,7 @@ logout_router = APIRouter()
 )
 async def logout(
         request: Request,
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_auth_db),
         user: User = Depends(get_current_user),
 ) -> None:
     token = request.headers.get("authorization").strip()
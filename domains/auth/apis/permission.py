@@ -5,7 +5,7 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from crud.base_schema import HTTPError
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.schemas import permission as schemas
 from domains.auth.services.permission import permission_service as actions
@@ -22,7 +22,7 @@ allowed_roles = ['SuperAdmin', 'Admin']
     dependencies=[Depends(check_user_role([*allowed_roles, 'Manager']))],
 )
 async def list_permissions(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         skip: int = 0,
         limit: int = 100,
@@ -42,7 +42,7 @@ async def list_permissions(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def create_permission(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         permission_in: schemas.PermissionCreate
 ) -> Any:
@@ -57,7 +57,7 @@ async def create_permission(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def update_permission(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         permission_in: schemas.PermissionUpdate,
@@ -73,7 +73,7 @@ async def update_permission(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def get_permission(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
@@ -88,7 +88,7 @@ async def get_permission(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def delete_permission(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> None:
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from starlette import status
 
 from config.settings import settings
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.utils.create_token import create_access_token, create_refresh_token
 from domains.auth.utils.validate_refresh_token import validate_refresh_token
 
@@ -18,7 +18,7 @@ class RefreshTokenSchema(BaseModel):
 
 
 @refresh_token_router.post("/refresh", status_code=status.HTTP_200_OK)
-async def get_new_access_token(payload: RefreshTokenSchema, db: Session = Depends(get_db)):
+async def get_new_access_token(payload: RefreshTokenSchema, db: Session = Depends(get_auth_db)):
     user, token = await validate_refresh_token(payload.refresh_token, db=db)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRES_IN)
@@ -5,7 +5,7 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from crud.base_schema import HTTPError
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.schemas import revoked_token as schemas
 from domains.auth.services.revoked_token import revoked_token_service as actions
@@ -22,7 +22,7 @@ allowed_roles = ["SuperAdmin", "Admin"]
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def list_revoked_tokens(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         skip: int = 0,
         limit: int = 100,
@@ -41,7 +41,7 @@ async def list_revoked_tokens(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def create_revoked_token(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         revoked_token_in: schemas.RevokedTokenCreate
 ) -> Any:
@@ -56,7 +56,7 @@ async def create_revoked_token(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def update_revoked_token(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         revoked_token_in: schemas.RevokedTokenUpdate,
@@ -72,7 +72,7 @@ async def update_revoked_token(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def get_revoked_token(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
@@ -87,7 +87,7 @@ async def get_revoked_token(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def delete_revoked_token(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> None:
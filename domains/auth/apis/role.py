@@ -5,7 +5,7 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from crud.base_schema import HTTPError
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.schemas import role as schemas
 from domains.auth.services.role import role_service as actions
@@ -22,7 +22,7 @@ allowed_roles = ['SuperAdmin', 'Admin']
     dependencies=[Depends(check_user_role([*allowed_roles, 'Manager']))],
 )
 async def list_roles(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         skip: int = 0,
         limit: int = 100,
@@ -42,7 +42,7 @@ async def list_roles(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def create_role(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         role_in: schemas.RoleCreate
 ) -> Any:
@@ -57,7 +57,7 @@ async def create_role(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def update_role(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         role_in: schemas.RoleUpdate,
@@ -73,7 +73,7 @@ async def update_role(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def get_role_by_id(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
@@ -88,7 +88,7 @@ async def get_role_by_id(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def delete_role(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> None:
@@ -102,7 +102,7 @@ async def delete_role(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def add_permissions_to_role(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         permissions_in: schemas.RolePermissions,
@@ -119,7 +119,7 @@ async def add_permissions_to_role(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def remove_permissions_from_role(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         permissions_in: schemas.RolePermissions,
@@ -135,7 +135,7 @@ async def remove_permissions_from_role(
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
 )
 async def get_role(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
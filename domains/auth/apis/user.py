@@ -6,7 +6,7 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from crud.base_schema import HTTPError
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models import User
 from domains.auth.schemas import user as schemas
 from domains.auth.schemas.permission import PermissionSchema
@@ -25,7 +25,7 @@ allowed_roles = ['SuperAdmin', 'Admin', 'Manager']
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def list_users(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         skip: int = 0,
         limit: int = 100,
@@ -52,7 +52,7 @@ async def list_users(
     dependencies=[Depends(check_user_role(allowed_roles))]
 )
 async def create_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         data: schemas.UserCreate
 ) -> Any:
@@ -66,7 +66,7 @@ async def create_user(
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
 )
 async def update_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         data: schemas.UserUpdate,
@@ -82,7 +82,7 @@ async def update_user(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def get_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
@@ -98,7 +98,7 @@ async def get_user(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def delete_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> None:
@@ -111,7 +111,7 @@ async def delete_user(
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
 )
 async def get_user_roles(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
@@ -124,7 +124,7 @@ async def get_user_roles(
     status_code=status.HTTP_201_CREATED,
 )
 async def set_roles_on_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         role_ids: schemas.UserRole
@@ -141,7 +141,7 @@ async def set_roles_on_user(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def add_role_to_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         role_ids: schemas.UserRole
@@ -158,7 +158,7 @@ async def add_role_to_user(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def remove_role_from_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         role_ids: schemas.UserRole
@@ -174,7 +174,7 @@ async def remove_role_from_user(
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
 )
 async def get_user_permissions(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4
 ) -> Any:
@@ -188,7 +188,7 @@ async def get_user_permissions(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def set_permissions_on_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         permission_ids: schemas.UserPermission
@@ -205,7 +205,7 @@ async def set_permissions_on_user(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def add_permission_to_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         permission_ids: schemas.UserPermission
@@ -222,7 +222,7 @@ async def add_permission_to_user(
     dependencies=[Depends(check_user_role(allowed_roles))],
 )
 async def remove_permission_from_user(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_auth_db),
         current_user: User = Depends(get_current_user),
         id: UUID4,
         permission_ids: schemas.UserPermission
@@ -3,7 +3,7 @@ from typing import List
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
-from crud.base_repository import BaseCRUDRepository
+from crud.base_repository import BaseCRUDRepository, page_limit
 from domains.auth.models.permission import Permission
 from domains.auth.models.user import user_permissions
 from domains.auth.schemas.permission import (
@@ -20,7 +20,7 @@ class CRUDPermission(BaseCRUDRepository[Permission, PermissionCreate, Permission
             .join(user_permissions, user_permissions.permission_id == Permission.id)
             .filter(user_permissions.user_id == user_id)
             .offset(skip)
-            .limit(limit)
+            .limit(page_limit(limit))
             .all()
         )
         return query
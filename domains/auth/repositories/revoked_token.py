@@ -1,3 +1,8 @@
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
 from crud.base_repository import BaseCRUDRepository
 from domains.auth.models.revoked_token import RevokedToken
 from domains.auth.schemas.revoked_token import (
@@ -6,7 +11,11 @@ from domains.auth.schemas.revoked_token import (
 
 
 class CRUDRevokedToken(BaseCRUDRepository[RevokedToken, RevokedTokenCreate, RevokedTokenUpdate]):
-    pass
+
+    async def prune(self, db: Session, *, revoked_before: datetime) -> int:
+        result = db.execute(delete(RevokedToken).where(RevokedToken.created_at < revoked_before))
+        db.commit()
+        return result.rowcount
 
 
 revoked_token_actions = CRUDRevokedToken(RevokedToken)
@@ -2,7 +2,7 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from config.logger import log
-from crud.base_repository import BaseCRUDRepository
+from crud.base_repository import BaseCRUDRepository, page_limit
 from domains.auth.models import Permission, User
 from domains.auth.models.role import Role
 from domains.auth.schemas.role import (
@@ -18,7 +18,7 @@ class CRUDRole(BaseCRUDRepository[Role, RoleCreate, RoleUpdate]):
             db.query(self.model)
             .join(self.model.users)
             .filter(User.id == user_id)
-            .limit(limit)
+            .limit(page_limit(limit))
             .offset(skip)
             .all()
         )
@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session
 from starlette import status
 
 from config.logger import log
-from crud.base_repository import BaseCRUDRepository
+from crud.base_repository import BaseCRUDRepository, page_limit
 from domains.auth.models.permission import Permission
 from domains.auth.models.role import Role
 from domains.auth.models.user import User
@@ -273,7 +273,7 @@ class CRUDUser(BaseCRUDRepository[User, UserCreate, UserUpdate]):
             if time_range_max: query = query.filter(User.created_at <= time_range_max)
 
             query = await self._get_ordering(query, order_by)
-            results = query.offset(skip).limit(limit).all()
+            results = query.offset(skip).limit(page_limit(limit)).all()
             return results
         except HTTPException:
             raise
@@ -1,8 +1,10 @@
 from typing import List, Optional
 
+import pendulum
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from config.settings import settings
 from domains.auth.repositories.revoked_token import revoked_token_actions as revoked_token_repo
 from domains.auth.schemas.revoked_token import RevokedTokenSchema, RevokedTokenUpdate, RevokedTokenCreate
 
@@ -44,6 +46,11 @@ class RevokedTokenService:
     async def delete_revoked_token(self, db: Session, *, id: UUID4) -> None:
         await self.repo.delete(db=db, id=id, soft=False)
 
+    async def prune_expired_tokens(self, db: Session) -> int:
+        # a token revoked longer ago than the longest token lifetime has expired anyway
+        lifetime = max(settings.ACCESS_TOKEN_EXPIRES_IN, settings.REFRESH_TOKEN_EXPIRES_IN)
+        return await self.repo.prune(db=db, revoked_before=pendulum.now().subtract(minutes=lifetime))
+
     async def get_revoked_token_by_keywords(
             self, db: Session, *,
             skip: int = 0,
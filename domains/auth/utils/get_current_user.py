@@ -6,13 +6,13 @@ from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from config.settings import settings
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.services.revoked_token import revoked_token_service
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/login")
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_auth_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -34,4 +34,5 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Se
 
     is_blacklisted = await revoked_token_service.get_revoked_token_by_jti(db=db, jti=token.strip())
     if is_blacklisted: raise credentials_exception
+    db.commit()  # hand the auth connection back while the endpoint runs
     return user
@@ -4,7 +4,7 @@ from typing import Annotated
 from fastapi import Depends, status, HTTPException
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.models.user import User
 from domains.auth.utils.get_current_active_user import get_current_active_user
 from domains.auth.utils.get_current_user import get_current_user
@@ -14,10 +14,11 @@ from domains.auth.services.user import user_service
 def check_user_role(roles: list[str]):
     async def role_check(
             current_active_user: Annotated[User, Depends(get_current_user)],
-            db: Session = Depends(get_db)
+            db: Session = Depends(get_auth_db)
     ):
         user_roles = await user_service.get_roles(db=db, user_id=current_active_user.id)
         roles_names = [role.title for role in user_roles]
+        db.commit()  # hand the auth connection back while the endpoint runs
 
         user_roles = set(roles) & set(roles_names)
         if not user_roles: raise HTTPException(
@@ -6,11 +6,11 @@ from sqlalchemy.orm import Session
 from starlette import status
 
 from config.settings import settings
-from db.session import get_db
+from db.session import get_auth_db
 from domains.auth.utils.get_current_user import oauth2_scheme
 
 
-async def validate_refresh_token(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+async def validate_refresh_token(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_auth_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials"
     )
@@ -0,0 +1,5 @@
+__all__ = [
+    "IdempotencyKey",
+]
+
+from .idempotency_key import IdempotencyKey
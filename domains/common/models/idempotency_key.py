@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text, UniqueConstraint
+
+from db.table import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """
+    The stored outcome of a request sent with an `Idempotency-Key` header.
+
+    `status_code` stays empty while the first request is still running; `committed_at` is set in
+    the same transaction as the request's own writes, so a key whose work committed is never freed.
+    """
+    key = Column(String(255), nullable=False)
+    scope = Column(String(64), nullable=False)  # hash of the caller's identity, so keys never cross users
+    method = Column(String(10), nullable=False)
+    path = Column(Text, nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # hash of the request body
+    status_code = Column(Integer, nullable=True)
+    response_headers = Column(Text, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    committed_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+    )
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from domains.common.models import IdempotencyKey
+
+
+class CRUDIdempotencyKey:
+
+    def __init__(self, model=IdempotencyKey):
+        self.model = model
+
+    async def claim(
+            self, db: Session, *,
+            scope: str, key: str, method: str, path: str, fingerprint: str, expires_at: datetime,
+    ) -> Optional[IdempotencyKey]:
+        """
+        Insert an in-progress record for the key; returns None when the key is already taken.
+        """
+        record = IdempotencyKey(
+            scope=scope, key=key, method=method, path=path, fingerprint=fingerprint, expires_at=expires_at
+        )
+        try:
+            db.add(record)
+            db.commit()
+            return record
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    async def get(self, db: Session, *, scope: str, key: str) -> Optional[IdempotencyKey]:
+        return db.execute(
+            select(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        ).scalar_one_or_none()
+
+    async def complete(self, db: Session, *, id, status_code: int, headers: str, body: bytes) -> None:
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == id)
+            .values(status_code=status_code, response_headers=headers, response_body=body)
+        )
+        db.commit()
+
+    async def release(self, db: Session, *, id, uncommitted_only: bool = False) -> bool:
+        """
+        Free the key; with `uncommitted_only`, only if the request's writes never committed.
+        Returns whether it was freed.
+        """
+        statement = delete(IdempotencyKey).where(IdempotencyKey.id == id)
+        if uncommitted_only: statement = statement.where(IdempotencyKey.committed_at.is_(None))
+        result = db.execute(statement)
+        db.commit()
+        return result.rowcount > 0
+
+    async def prune(self, db: Session, *, expired_before: datetime) -> int:
+        result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < expired_before))
+        db.commit()
+        return result.rowcount
+
+
+idempotency_key_actions = CRUDIdempotencyKey()
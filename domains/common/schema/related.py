@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, UUID4
@@ -20,4 +21,5 @@ class RelatedStockSchema(BaseModel):
 class RelatedSaleSchema(BaseModel):
     quantity: Optional[int] = None
     cost: Optional[float] = None
+    deleted_at: Optional[datetime] = None  # set on refunded lines
     item: RelatedStockSchema
@@ -1,26 +1,34 @@
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from db.session import get_db
+from config.settings import settings
+from db.functions import TimeBucket
+from db.session import get_reporting_db
 from domains.auth.models import User
 from domains.auth.utils import get_current_user
-from domains.shop.schemas.dashboard import TotalStockValueAndDailySaleSchema, SaleSummarySchema, StockSummarySchema
+from domains.shop.schemas.dashboard import (
+    TotalStockValueAndDailySaleSchema, SaleSummarySchema, StockSummarySchema, TimeSeriesSchema
+)
 from domains.shop.services.expenses import expenses_service
+from domains.shop.services.leaderboard import LeaderboardWindow
 from domains.shop.services.sale import sale_service
 from domains.shop.services.stock import stock_service
+from services.metrics import query_budget
+from services.timeouts import statement_timeout
 
-dash_router = APIRouter(prefix="/dash")
+dash_router = APIRouter(prefix="/dash", dependencies=[Depends(statement_timeout(settings.REPORTS_TIMEOUT_SECONDS))])
 
 
 @dash_router.get(
     "/total_stock_value_and_daily_sale",
     response_model=TotalStockValueAndDailySaleSchema,
+    dependencies=[Depends(query_budget(12))],
 )
 async def get_total_stock_value_and_daily_sale(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_reporting_db),
         current_user: User = Depends(get_current_user),
 ) -> Any:
     sales = await stock_service.get_total_stock_value_and_daily_sale(db=db)
@@ -30,9 +38,10 @@ async def get_total_stock_value_and_daily_sale(
 @dash_router.get(
     "/summaries/sales",
     response_model=SaleSummarySchema,
+    dependencies=[Depends(query_budget(12))],
 )
 async def get_sale_summary(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_reporting_db),
         current_user: User = Depends(get_current_user),
 ) -> Any:
     sales = await sale_service.assemble_dash(db=db)
@@ -42,9 +51,10 @@ async def get_sale_summary(
 @dash_router.get(
     "/summaries/expenses",
     response_model=SaleSummarySchema,
+    dependencies=[Depends(query_budget(12))],
 )
 async def get_expenses_summary(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_reporting_db),
         current_user: User = Depends(get_current_user),
 ) -> Any:
     sales = await expenses_service.assemble_dash(db=db)
@@ -54,17 +64,41 @@ async def get_expenses_summary(
 @dash_router.get(
     "/summaries/stock",
     response_model=StockSummarySchema,
+    description="Rankings for a fixed `window` come from precomputed leaderboards; a custom time range queries sales",
+    dependencies=[Depends(query_budget(12))],
 )
 async def get_stock_summary(
-        *, db: Session = Depends(get_db),
+        *, db: Session = Depends(get_reporting_db),
         current_user: User = Depends(get_current_user),
         skip: int = 0,
         limit: int = 5,
         time_range_from: datetime = None,
         time_range_to: datetime = None,
+        window: Optional[LeaderboardWindow] = None,
 ) -> Any:
     sales = await stock_service.assemble_summary(
         db=db, skip=skip, limit=limit,
-        time_range_min=time_range_from, time_range_max=time_range_to,
+        time_range_min=time_range_from, time_range_max=time_range_to, window=window,
     )
     return sales
+
+
+@dash_router.get(
+    "/timeseries",
+    response_model=TimeSeriesSchema,
+    description="Sales, refunds and expenses per hour/day/week/month, optionally split by payment type or item",
+    dependencies=[Depends(query_budget(8))],
+)
+async def get_timeseries(
+        *, db: Session = Depends(get_reporting_db),
+        current_user: User = Depends(get_current_user),
+        interval: TimeBucket = "day",
+        group_by: Optional[Literal["payment_type", "item"]] = None,
+        time_range_from: datetime = None,
+        time_range_to: datetime = None,
+) -> Any:
+    timeseries = await sale_service.assemble_timeseries(
+        db=db, interval=interval, group_by=group_by,
+        time_range_min=time_range_from, time_range_max=time_range_to,
+    )
+    return timeseries
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
@@ -11,6 +11,8 @@ from domains.auth.models import User
 from domains.auth.utils import get_current_user
 from domains.shop.schemas import receipt as schemas
 from domains.shop.services.receipt import receipt_service as actions
+from services.metrics import query_budget
+from utils.etag import if_match_version, set_etag
 
 receipt_router = APIRouter(prefix="/receipts")
 
@@ -18,6 +20,7 @@ receipt_router = APIRouter(prefix="/receipts")
 @receipt_router.get(
     "",
     response_model=List[schemas.VanillaReceiptSchema],
+    dependencies=[Depends(query_budget(10))],
 )
 async def list_receipts(
         *, db: Session = Depends(get_db),
@@ -57,7 +60,7 @@ async def create_receipt(
         current_user: User = Depends(get_current_user),
         data: schemas.ReceiptCreateWithSales
 ) -> Any:
-    receipt = await actions.create_receipt(db=db, data=data, created_by_id=current_user.id)
+    receipt = await actions.checkout(db=db, data=data, created_by_id=current_user.id)
     return receipt
 
 
@@ -69,10 +72,13 @@ async def create_receipt(
 async def update_receipt(
         *, db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user),
+        response: Response,
         id: UUID4,
         data: schemas.ReceiptUpdate,
+        version: Optional[int] = Depends(if_match_version),
 ) -> Any:
-    receipt = await actions.update_receipt(db=db, id=id, data=data)
+    receipt = await actions.update_receipt(db=db, id=id, data=data, version=version)
+    set_etag(response, receipt.version)
     return receipt
 
 
@@ -80,6 +86,7 @@ async def update_receipt(
     "/{id}",
     response_model=schemas.ReceiptSchema,
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
+    dependencies=[Depends(query_budget(10))],
 )
 async def get_receipt(
         *, db: Session = Depends(get_db),
@@ -102,3 +109,19 @@ async def delete_receipt(
         id: UUID4
 ) -> None:
     await actions.delete_receipt(db=db, id=id)
+
+
+@receipt_router.post(
+    "/{id}/refund",
+    name="refund_some_sold_items",
+    response_model=schemas.ReceiptSchema,
+    responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
+)
+async def refund_receipt_items(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        id: UUID4,
+        data: schemas.ReceiptRefund,
+) -> Any:
+    receipt = await actions.refund_items(db=db, id=id, data=data)
+    return receipt
@@ -11,6 +11,7 @@ from domains.auth.models import User
 from domains.auth.utils import get_current_user
 from domains.shop.schemas import sale as schemas
 from domains.shop.services.sale import sale_service as actions
+from services.metrics import query_budget
 
 sale_router = APIRouter(prefix="/sales")
 
@@ -19,6 +20,7 @@ sale_router = APIRouter(prefix="/sales")
     "",
     name="list_all_sold_items",
     response_model=List[schemas.SaleSchema],
+    dependencies=[Depends(query_budget(10))],
 )
 async def list_sales(
         *, db: Session = Depends(get_db),
@@ -2,7 +2,7 @@ from datetime import date
 from typing import Any, List, Optional
 
 import pendulum
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
@@ -13,6 +13,8 @@ from domains.auth.utils import get_current_user
 from domains.auth.utils.rbac import check_user_role
 from domains.shop.schemas import stock as schemas
 from domains.shop.services.stock import stock_service as actions
+from services.metrics import query_budget
+from utils.etag import if_match_version, set_etag
 
 stock_router = APIRouter(prefix="/stock")
 allowed_roles = ["SuperAdmin", "Admin", "Manager", "Supervisor"]
@@ -22,6 +24,7 @@ allowed_roles = ["SuperAdmin", "Admin", "Manager", "Supervisor"]
     "",
     description="Get a list of available stock in alphabetical order",
     response_model=List[schemas.VanillaStockSchema],
+    dependencies=[Depends(query_budget(10))],
 )
 # @ContentQueryChecker(Stock.c(), None)
 async def list_stocks(
@@ -78,10 +81,13 @@ async def create_stock(
 async def update_stock(
         *, db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user),
+        response: Response,
         id: UUID4,
         data: schemas.StockUpdate,
+        version: Optional[int] = Depends(if_match_version),
 ) -> Any:
-    stock = await actions.update_stock(db=db, id=id, data=data)
+    stock = await actions.update_stock(db=db, id=id, data=data, version=version)
+    set_etag(response, stock.version)
     return stock
 
 
@@ -89,13 +95,16 @@ async def update_stock(
     "/{id}",
     response_model=schemas.StockSchema,
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
+    dependencies=[Depends(query_budget(5))],
 )
 async def get_stock(
         *, db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user),
+        response: Response,
         id: UUID4
 ) -> Any:
     stock = await actions.get_stock(db=db, id=id)
+    set_etag(response, stock.version)
     return stock
 
 
@@ -3,9 +3,11 @@ __all__ = [
     "Receipt",
     "Sale",
     "Stock",
+    "StockTotal",
 ]
 
 from .expenses import Expenses
 from .receipt import Receipt
 from .sale import Sale
 from .stock import Stock
+from .stock_total import StockTotal
@@ -10,4 +10,4 @@ class Expenses(BaseModel):
     price = Column(Float, nullable=False)
     description = Column(Text, nullable=True)
     created_by_id = Column(UUID, ForeignKey("users.id"), nullable=False)
-    paid_at = Column(DateTime, nullable=False)
\ No newline at end of file
+    paid_at = Column(DateTime, nullable=False, index=True)
\ No newline at end of file
@@ -3,10 +3,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 
-from db.table import BaseModel
+from db.table import BaseModel, VersionedMixin
 
 
-class Receipt(BaseModel):
+class Receipt(VersionedMixin, BaseModel):
     total_cost = Column(Float, nullable=False)
     amount_paid = Column(Float, nullable=False)
     created_by_id = Column(UUID, ForeignKey("users.id"), nullable=False)
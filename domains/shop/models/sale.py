@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, UUID, ForeignKey, Integer, Float
+    Column, String, UUID, ForeignKey, Integer, Float, Index
 )
 from sqlalchemy.orm import relationship
 
@@ -10,9 +10,15 @@ class Sale(BaseModel):
     quantity = Column(Integer, nullable=False)
     payment_type = Column(String(250), default="CASH")
     cost = Column(Float, nullable=False)
-    item_id = Column(UUID, ForeignKey("stocks.id"), nullable=False)
+    item_id = Column(UUID, ForeignKey("stocks.id"), nullable=False, index=True)
     receipt_id = Column(UUID, ForeignKey("receipts.id"), nullable=False)
     created_by_id = Column(UUID, ForeignKey("users.id"), nullable=False)
 
     item = relationship("Stock", back_populates="sales")
     receipt = relationship("Receipt", back_populates="items")
+
+    __table_args__ = (
+        # time-series buckets: sales by created_at, refunds by deleted_at
+        Index("ix_sales_created_at", "created_at"),
+        Index("ix_sales_deleted_at", "deleted_at"),
+    )
@@ -4,10 +4,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 
-from db.table import BaseModel
+from db.table import BaseModel, VersionedMixin
 
 
-class Stock(BaseModel):
+class Stock(VersionedMixin, BaseModel):
     ref = Column(String, nullable=False)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
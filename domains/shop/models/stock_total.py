@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, Integer
+
+from db.table import BaseModel
+
+
+class StockTotal(BaseModel):
+    """
+    Running valuation of all live stock, striped across `STOCK_TOTALS_SLOTS` rows summed on read.
+
+    Adjusted in the same transaction as every stock change, each transaction on one slot picked
+    at random, so concurrent writers rarely wait on the same row lock. Recomputed periodically
+    by `StockService.reconcile_totals`.
+    """
+    slot = Column(Integer, nullable=False, unique=True, default=0)
+    purchase_value = Column(Float, nullable=False, default=0)
+    expected_return = Column(Float, nullable=False, default=0)
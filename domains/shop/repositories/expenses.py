@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Literal, List
+from typing import Any, Optional, Literal, List
 
 from fastapi import HTTPException, status
 from sqlalchemy import desc, func
@@ -7,7 +7,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from config.logger import log
-from crud.base_repository import BaseCRUDRepository, ModelType
+from crud.base_repository import BaseCRUDRepository, ModelType, page_limit
+from db.functions import TimeBucket, date_bucket
 from domains.shop.models.expenses import Expenses
 from domains.shop.schemas.expenses import (
     ExpensesCreate, ExpensesUpdate
@@ -42,7 +43,7 @@ class CRUDExpenses(BaseCRUDRepository[Expenses, ExpensesCreate, ExpensesUpdate])
             if time_range_max: query = query.filter(Expenses.created_at <= time_range_max)
 
             query = await self._get_ordering(query=query, order_by=order_by)
-            results = query.offset(skip).limit(limit).all()
+            results = query.offset(skip).limit(page_limit(limit)).all()
 
             return results
         except HTTPException:
@@ -68,5 +69,20 @@ class CRUDExpenses(BaseCRUDRepository[Expenses, ExpensesCreate, ExpensesUpdate])
         result = query.scalar() or 0.0
         return round(result, 2)
 
+    async def get_expenses_timeseries(
+            self, db: Session, *,
+            interval: TimeBucket,
+            time_range_min: datetime,
+            time_range_max: datetime,
+    ) -> List[Any]:
+        bucket = date_bucket(Expenses.paid_at, interval, db.get_bind().dialect.name).label("bucket")
+        query = (
+            db.query(bucket, func.sum(Expenses.price).label("amount"), func.count(Expenses.id).label("count"))
+            .filter(Expenses.paid_at >= time_range_min)
+            .filter(Expenses.paid_at < time_range_max)
+            .filter(Expenses.deleted_at.is_(None))
+        )
+        return query.group_by(bucket).order_by(bucket).all()
+
 
 expenses_actions = CRUDExpenses(Expenses)
@@ -1,16 +1,25 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import pendulum
 from fastapi import HTTPException
+from pydantic import UUID4
+from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from config.logger import log
-from crud.base_repository import BaseCRUDRepository
+from crud.base_repository import BaseCRUDRepository, page_limit
+from db.retry import is_transient
 from domains.shop.models.receipt import Receipt
+from domains.shop.models.sale import Sale
+from domains.shop.repositories.stock import stock_actions
 from domains.shop.schemas.receipt import (
     ReceiptCreateInternal, ReceiptUpdateInternal
 )
+from utils.exceptions.exc_409 import http_409_exc_conflict
 from utils.exceptions.exc_500 import http_500_exc_internal_server_error
 
 
@@ -40,7 +49,7 @@ class CRUDReceipt(BaseCRUDRepository[Receipt, ReceiptCreateInternal, ReceiptUpda
             if time_range_max: query = query.filter(Receipt.created_at <= time_range_max)
 
             query = await self._get_ordering(query=query, order_by=order_by)
-            results = query.offset(skip).limit(limit).all()
+            results = query.offset(skip).limit(page_limit(limit)).all()
 
             return results
         except HTTPException:
@@ -52,5 +61,154 @@ class CRUDReceipt(BaseCRUDRepository[Receipt, ReceiptCreateInternal, ReceiptUpda
             log.exception(f"Unexpected error in get_all {Receipt.__name__}")
             raise await http_500_exc_internal_server_error()
 
+    async def checkout(
+            self, db: Session, *,
+            data: ReceiptCreateInternal,
+            sales: List[Sale],
+            created_by_id: UUID4,
+            commit: bool = True,
+    ) -> Receipt:
+        """
+        Insert a receipt with its sales and take the sold stock off the shelf.
+
+        With `commit=False` everything is only flushed, so a caller batching several checkouts
+        (see `CheckoutBatcher`) can wrap each one in a savepoint and commit them together.
+        Raises a 409 if some item no longer has enough stock, and re-raises transient database
+        errors (deadlocks, serialization failures) after rolling back, for the caller to retry.
+        """
+        changes: Dict[UUID4, List] = defaultdict(lambda: [0, 0, 0.0])
+        for sale in sales:
+            changes[sale.item_id][0] += sale.quantity
+            changes[sale.item_id][1] += 1
+            changes[sale.item_id][2] += sale.cost
+        try:
+            # stock goes first: a checkout that comes up short fails before inserting anything
+            await stock_actions.sell_items(
+                db=db, sales={item_id: tuple(values) for item_id, values in changes.items()}
+            )
+            receipt = Receipt(**data.model_dump(), created_by_id=created_by_id, items=sales)
+            db.add(receipt)
+            db.flush()
+            if commit: db.commit()
+            return receipt
+        except HTTPException:
+            if commit: db.rollback()
+            raise
+        except SQLAlchemyError as exc:
+            if not commit: raise
+            db.rollback()
+            if is_transient(exc): raise  # the caller retries the whole checkout
+            log.exception(f"Error creating {Receipt.__name__}")
+            raise await http_500_exc_internal_server_error()
+
+    async def refund(
+            self, db: Session, *,
+            receipt: Receipt,
+            quantities: Optional[Dict[UUID4, int]] = None,
+    ) -> Dict[UUID4, Tuple[int, int, float]]:
+        """
+        Refund a whole receipt, or `quantities` of some of its items, in a single transaction.
+
+        Fully refunded sales are soft-deleted with one UPDATE; a sale refunded in part keeps its
+        remaining quantity and the refunded part becomes a separate soft-deleted sale, so refund
+        reports still see it. Stock and its counters are then corrected with one set-based UPDATE.
+        The receipt itself is soft-deleted once none of its sales remain.
+
+        Returns the refunded (quantity, sales removed, cost) per item.
+        """
+        now = pendulum.now()
+        refunds: Dict[UUID4, List] = defaultdict(lambda: [0, 0, 0.0])
+        try:
+            if quantities is None:
+                refunded = db.execute(
+                    update(Sale)
+                    .where(Sale.receipt_id == receipt.id, Sale.deleted_at.is_(None))
+                    .values(deleted_at=now, updated_at=now)
+                    .returning(Sale.item_id, Sale.quantity, Sale.cost)
+                ).all()
+                for item_id, quantity, cost in refunded:
+                    refunds[item_id][0] += quantity
+                    refunds[item_id][1] += 1
+                    refunds[item_id][2] += cost
+            else:
+                await self._refund_quantities(db, receipt=receipt, quantities=quantities, refunds=refunds, now=now)
+
+            refunds = {item_id: tuple(values) for item_id, values in refunds.items()}
+            await stock_actions.restock_refunds(db=db, refunds=refunds)
+
+            receipt.total_cost = round(receipt.total_cost - sum(cost for _, _, cost in refunds.values()), 2)
+            remaining = db.execute(
+                select(Sale.id).where(Sale.receipt_id == receipt.id, Sale.deleted_at.is_(None)).limit(1)
+            ).first()
+            if remaining is None: receipt.deleted_at = now
+            db.add(receipt)
+            db.commit()
+            return refunds
+        except (HTTPException, ValueError):
+            db.rollback()
+            raise
+        except StaleDataError:
+            db.rollback()
+            raise await http_409_exc_conflict("This receipt was changed by another request. Fetch it again and retry.")
+        except SQLAlchemyError:
+            db.rollback()
+            log.exception(f"Error refunding {Receipt.__name__} {receipt.id}")
+            raise await http_500_exc_internal_server_error()
+
+    @staticmethod
+    async def _refund_quantities(
+            db: Session, *,
+            receipt: Receipt,
+            quantities: Dict[UUID4, int],
+            refunds: Dict[UUID4, List],
+            now: datetime,
+    ) -> None:
+        sales = db.execute(
+            select(Sale)
+            .where(Sale.receipt_id == receipt.id, Sale.deleted_at.is_(None), Sale.item_id.in_(list(quantities)))
+            .order_by(Sale.created_at)
+            .with_for_update()
+        ).scalars().all()
+
+        sold = defaultdict(int)
+        for sale in sales: sold[sale.item_id] += sale.quantity
+        for item_id, quantity in quantities.items():
+            if quantity > sold[item_id]: raise ValueError(
+                f"Cannot refund {quantity} of item {item_id}; only {sold[item_id]} remain on this receipt."
+            )
+
+        fully_refunded = []
+        for sale in sales:
+            wanted = quantities[sale.item_id] - refunds[sale.item_id][0]
+            if wanted <= 0: continue
+            if wanted >= sale.quantity:
+                fully_refunded.append(sale.id)
+                refunds[sale.item_id][0] += sale.quantity
+                refunds[sale.item_id][1] += 1
+                refunds[sale.item_id][2] += sale.cost
+                continue
+            # split: the sale keeps what was not returned, the returned part is recorded as refunded
+            refunded_cost = round(sale.cost / sale.quantity * wanted, 2)
+            db.add(Sale(
+                quantity=wanted,
+                payment_type=sale.payment_type,
+                cost=refunded_cost,
+                item_id=sale.item_id,
+                receipt_id=sale.receipt_id,
+                created_by_id=sale.created_by_id,
+                created_at=sale.created_at,
+                deleted_at=now,
+            ))
+            sale.quantity -= wanted
+            sale.cost = round(sale.cost - refunded_cost, 2)
+            refunds[sale.item_id][0] += wanted
+            refunds[sale.item_id][2] += refunded_cost
+
+        if fully_refunded: db.execute(
+            update(Sale)
+            .where(Sale.id.in_(fully_refunded))
+            .values(deleted_at=now, updated_at=now)
+        )
+
 
 receipt_actions = CRUDReceipt(Receipt)
@@ -1,19 +1,52 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Literal, Optional
 
+from fastapi import HTTPException
 from pydantic import UUID4
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from config.logger import log
 from crud.base_repository import BaseCRUDRepository
+from db.functions import TimeBucket, date_bucket
 from domains.shop.models.sale import Sale
+from domains.shop.models.stock import Stock
+from domains.shop.repositories.stock import stock_actions
 from domains.shop.schemas.sale import (
     SaleUpdate, SaleCreateInternal
 )
+from utils.exceptions.exc_409 import http_409_exc_conflict
+from utils.exceptions.exc_500 import http_500_exc_internal_server_error
 
 
 class CRUDSale(BaseCRUDRepository[Sale, SaleCreateInternal, SaleUpdate]):
 
+    async def sell(self, db: Session, *, data: SaleCreateInternal) -> Sale:
+        """
+        Take the sold quantity off the shelf, add the sale to the item's counters and insert it,
+        in one transaction. Raises a 409 if the item no longer has enough stock.
+        """
+        try:
+            # stock goes first: a sale that comes up short fails before inserting anything
+            await stock_actions.sell_an_item(db=db, id=data.item_id, quantity=data.quantity, cost=data.cost)
+            sale = Sale(**data.model_dump(exclude_none=True))
+            db.add(sale)
+            db.commit()
+            db.refresh(sale)
+            return sale
+        except HTTPException:
+            db.rollback()
+            raise
+        except IntegrityError as e:
+            db.rollback()
+            log.error(f"Integrity error creating {Sale.__name__}", exc_info=True)
+            raise await http_409_exc_conflict(self._format_integrity_error(e))
+        except SQLAlchemyError:
+            db.rollback()
+            log.exception(f"Error creating {Sale.__name__}")
+            raise await http_500_exc_internal_server_error()
+
     async def get_sales_amount_for_date_range(
             self, db: Session, *,
             time_range_min: datetime,
@@ -48,5 +81,37 @@ class CRUDSale(BaseCRUDRepository[Sale, SaleCreateInternal, SaleUpdate]):
         )
         return total_sales_amount
 
+    async def get_sales_timeseries(
+            self, db: Session, *,
+            interval: TimeBucket,
+            time_range_min: datetime,
+            time_range_max: datetime,
+            refunds: bool = False,
+            group_by: Optional[Literal["payment_type", "item"]] = None,
+    ) -> List[Any]:
+        """
+        Sum and count sales per time bucket, optionally split by payment type or item.
+
+        Sales are bucketed by when they were made; refunds (soft-deleted sales) by when they
+        were refunded, so each series answers "what happened in this bucket".
+        """
+        timestamp = Sale.deleted_at if refunds else Sale.created_at
+        bucket = date_bucket(timestamp, interval, db.get_bind().dialect.name).label("bucket")
+        columns = [bucket, func.sum(Sale.cost).label("amount"), func.count(Sale.id).label("count")]
+        group_columns = [bucket]
+        if group_by == "payment_type":
+            group_columns.append(Sale.payment_type.label("group"))
+        elif group_by == "item":
+            group_columns += [Sale.item_id.label("group"), Stock.name.label("label")]
+
+        query = (
+            db.query(*columns, *group_columns[1:])
+            .filter(timestamp >= time_range_min)
+            .filter(timestamp < time_range_max)
+        )
+        if not refunds: query = query.filter(Sale.deleted_at.is_(None))
+        if group_by == "item": query = query.join(Stock, Stock.id == Sale.item_id)
+        return query.group_by(*group_columns).order_by(bucket).all()
+
 
 sale_actions = CRUDSale(Sale)
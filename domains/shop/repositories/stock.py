@@ -1,19 +1,24 @@
+import random
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Set, Tuple
 
 from fastapi import HTTPException
 from pydantic import UUID4
-from sqlalchemy import update, desc, func
+from sqlalchemy import case, event, inspect, select, update, desc, func, true
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from config.logger import log
-from crud.base_repository import BaseCRUDRepository
+from config.settings import settings
+from crud.base_repository import BaseCRUDRepository, page_limit
 from domains.shop.models import Sale
 from domains.shop.models.stock import Stock
+from domains.shop.models.stock_total import StockTotal
 from domains.shop.schemas.stock import (
     StockCreateInternal, StockUpdateInternal
 )
+from utils.exceptions.exc_409 import http_409_exc_conflict
 from utils.exceptions.exc_500 import http_500_exc_internal_server_error
 
 
@@ -35,7 +40,7 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
         if time_range_min: query = query.filter(Sale.created_at >= time_range_min)
         if time_range_max: query = query.filter(Sale.created_at <= time_range_max)
 
-        query = query.order_by(desc('sales_count')).offset(skip).limit(limit).all()
+        query = query.order_by(desc('sales_count')).offset(skip).limit(page_limit(limit)).all()
         results = [item[0] for item in query]
         return results
 
@@ -55,7 +60,7 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
         if time_range_min: query = query.filter(Sale.created_at >= time_range_min)
         if time_range_max: query = query.filter(Sale.created_at <= time_range_max)
 
-        query = query.order_by(desc('total_profit')).offset(skip).limit(limit).all()
+        query = query.order_by(desc('total_profit')).offset(skip).limit(page_limit(limit)).all()
         results = [item[0] for item in query]
         return results
 
@@ -76,11 +81,38 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
         if time_range_min: query = query.filter(Sale.deleted_at >= time_range_min)
         if time_range_max: query = query.filter(Sale.deleted_at <= time_range_max)
 
-        query = query.order_by(desc('total_refunded')).offset(skip).limit(limit).all()
+        query = query.order_by(desc('total_refunded')).offset(skip).limit(page_limit(limit)).all()
 
         results = [item[0] for item in query]
         return results
 
+    async def get_leaderboard_counters(
+            self, db: Session, *,
+            windows: Dict[str, Optional[datetime]],
+    ) -> List[Row]:
+        """
+        Per-stock sale counters for several windows in a single pass over `sales`.
+
+        Each row holds the item id followed by `<window>_issued`, `<window>_profit` and
+        `<window>_refunded` for every window; a window starting at `None` is all-time.
+        """
+        columns = []
+        for name, since in windows.items():
+            sold = Sale.created_at >= since if since else true()
+            refunded = Sale.deleted_at >= since if since else Sale.deleted_at.isnot(None)
+            columns += [
+                func.sum(case((sold, 1), else_=0)).label(f"{name}_issued"),
+                func.sum(case((sold, Sale.cost), else_=0)).label(f"{name}_profit"),
+                func.sum(case((refunded, Sale.quantity), else_=0)).label(f"{name}_refunded"),
+            ]
+        query = (
+            db.query(Sale.item_id, *columns)
+            .join(Stock, Stock.id == Sale.item_id)
+            .filter(Stock.deleted_at.is_(None))
+            .group_by(Sale.item_id)
+        )
+        return query.all()
+
     async def list_soon_expiring_stock(
             self, db: Session, *,
             skip: int = 0,
@@ -91,7 +123,7 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
         query = db.query(Stock).order_by(desc(Stock.expiry_date))
         if time_range_min: query = query.filter(Stock.expiry_date >= time_range_min)
         if time_range_max: query = query.filter(Stock.expiry_date <= time_range_max)
-        results = query.offset(skip).limit(limit).all()
+        results = query.offset(skip).limit(page_limit(limit)).all()
         return results
 
     async def get_total_stock_value(
@@ -99,6 +131,8 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
             time_range_min: datetime = None,
             time_range_max: datetime = None
     ) -> float:
+        if not (time_range_min or time_range_max) and (totals := await self.get_totals(db=db)):
+            return round(totals.purchase_value, 2)
         query = (db.query(func.sum(Stock.purchase_price * Stock.quantity))
                  .filter(Stock.deleted_at.is_(None)))
         if time_range_min: query = query.filter(Stock.created_at >= time_range_min)  # Fixed comparison direction
@@ -107,6 +141,7 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
         return round(result, 2)
 
     async def get_expected_return_amount(self, db: Session) -> float:
+        if totals := await self.get_totals(db=db): return round(totals.expected_return, 2)
         query = (
             db.query(func.sum(Stock.selling_price * Stock.quantity))
             .filter(Stock.deleted_at.is_(None))
@@ -114,20 +149,115 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
         result = query.scalar() or 0.00
         return round(result, 2)
 
+    async def get_totals(self, db: Session) -> Optional[Row]:
+        # plain columns, so a StockTotal cached in the session never masks the latest adjustment
+        totals = db.execute(select(
+            func.sum(StockTotal.purchase_value).label("purchase_value"),
+            func.sum(StockTotal.expected_return).label("expected_return"),
+            func.count().label("slots"),
+        )).first()
+        return totals if totals.slots else None
+
+    async def reconcile_totals(self, db: Session) -> Tuple[float, float]:
+        """
+        Recompute the running totals from the stock table and return the drift that was corrected.
+        """
+        live = Stock.deleted_at.is_(None)
+        actual_purchase = select(func.coalesce(func.sum(Stock.purchase_price * Stock.quantity), 0)).where(live)
+        actual_return = select(func.coalesce(func.sum(Stock.selling_price * Stock.quantity), 0)).where(live)
+        try:
+            totals = await self.get_totals(db=db)
+            existing = set(db.execute(select(StockTotal.slot)).scalars())
+            missing = [slot for slot in range(settings.STOCK_TOTALS_SLOTS) if slot not in existing]
+            if missing:
+                db.add_all(StockTotal(slot=slot, purchase_value=0, expected_return=0) for slot in missing)
+                db.commit()
+
+            # recompute in one statement so adjustments committed meanwhile are not overwritten:
+            # slot 0 takes the whole valuation, the others start again from zero
+            first = StockTotal.slot == 0
+            db.execute(update(StockTotal.__table__).values(
+                purchase_value=case((first, actual_purchase.scalar_subquery()), else_=0),
+                expected_return=case((first, actual_return.scalar_subquery()), else_=0),
+            ))
+            db.commit()
+            if totals is None: return 0.0, 0.0  # first build, nothing drifted
+            reconciled = await self.get_totals(db=db)
+            return (
+                round(reconciled.purchase_value - totals.purchase_value, 2),
+                round(reconciled.expected_return - totals.expected_return, 2),
+            )
+        except SQLAlchemyError:
+            db.rollback()
+            log.exception("Error reconciling stock totals")
+            raise await http_500_exc_internal_server_error()
+
     async def return_an_item(self, db: Session, id: UUID4, quantity: int) -> None:
         db.execute(
             update(Stock)
             .where(Stock.id == id)
-            .values(quantity=Stock.quantity + quantity)
+            .values(quantity=Stock.quantity + quantity, version=Stock.version + 1)
         )
+        adjust_totals_for_quantity(db, id=id, quantity=quantity)
 
-    async def sell_an_item(self, db: Session, id: UUID4, quantity: int) -> None:
-        db.execute(
-            update(Stock)
-            .where(Stock.id == id)
-            .values(quantity=Stock.quantity - quantity)
+    async def get_for_checkout(self, db: Session, *, ids: List[UUID4]) -> List[Stock]:
+        # populate_existing: stock already touched in this transaction (a batched checkout) is re-read
+        return db.query(Stock).filter(Stock.id.in_(ids)).populate_existing().all()
+
+    async def sell_items(self, db: Session, *, sales: Dict[UUID4, Tuple[int, int, float]]) -> None:
+        """
+        Take sold quantities off the shelf and add the new sales to the counters, for all items
+        in one statement. `sales` maps item ids to (quantity, sales added, cost).
+
+        The decrement only applies where enough stock is left, so concurrent checkouts can never
+        take quantities below zero. If any item comes up short this raises a 409 and the caller
+        must roll back, as the other items were already taken off.
+        """
+        await self._move_stock(db, changes=sales, direction=-1)
+
+    async def restock_refunds(self, db: Session, *, refunds: Dict[UUID4, Tuple[int, int, float]]) -> None:
+        """
+        Put refunded quantities back on the shelf and take the refunded sales off the counters,
+        for all items in one statement. `refunds` maps item ids to (quantity, sales removed, cost).
+        """
+        await self._move_stock(db, changes=refunds, direction=1)
+
+    @staticmethod
+    async def _move_stock(db: Session, *, changes: Dict[UUID4, Tuple[int, int, float]], direction: int) -> None:
+        if not changes: return
+
+        def per_item(index: int) -> Any:
+            return case(
+                {item_id: direction * values[index] for item_id, values in changes.items()}, value=Stock.id, else_=0
+            )
+
+        query = update(Stock).where(Stock.id.in_(list(changes)))
+        # selling is guarded: a row that would go below zero is neither updated nor returned
+        if direction < 0: query = query.where(Stock.quantity + per_item(0) >= 0)
+        moved = db.execute(
+            query
+            .values(
+                quantity=Stock.quantity + per_item(0),
+                issues=Stock.issues - per_item(1),
+                total_issues_cost=Stock.total_issues_cost - per_item(2),
+                version=Stock.version + 1,
+            )
+            .returning(Stock.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if short := set(changes) - set(moved): raise await _http_409_short_of_stock(db, ids=short)
+
+        adjust_totals_for_quantities(
+            db, quantities={item_id: direction * values[0] for item_id, values in changes.items()}
         )
 
+    async def sell_an_item(self, db: Session, *, id: UUID4, quantity: int, cost: float) -> None:
+        """
+        Take a single sale of `quantity` off the shelf and add it to the item's counters, without
+        committing: the sale is inserted in the same transaction. Raises a 409 if too few are left.
+        """
+        await self._move_stock(db, changes={id: (quantity, 1, cost)}, direction=-1)
+
     async def get_all(
             self, db: Session,
             skip: int = 0,
@@ -155,7 +285,7 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
             if expiry_date_max is not None: query = query.filter(Stock.expiry_date <= expiry_date_max)
 
             query = await self._get_ordering(query=query, order_by=order_by)
-            results = query.offset(skip).limit(limit).all()
+            results = query.offset(skip).limit(page_limit(limit)).all()
 
             return results
         except HTTPException:
@@ -168,4 +298,89 @@ class CRUDStock(BaseCRUDRepository[Stock, StockCreateInternal, StockUpdateIntern
             raise await http_500_exc_internal_server_error()
 
 
+async def _http_409_short_of_stock(db: Session, *, ids: Set[UUID4]) -> Exception:
+    names = db.execute(select(Stock.name).where(Stock.id.in_(list(ids))).order_by(Stock.name)).scalars().all()
+    return await http_409_exc_conflict(
+        f"Not enough stock left for: {', '.join(name.title() for name in names)}. It was sold in the meantime."
+    )
+
+
+def _totals_slot(db: Session) -> int:
+    # one slot per transaction: a transaction holding two of them could deadlock with another
+    slot = db.info.get("stock_totals_slot")
+    if slot is None: slot = db.info["stock_totals_slot"] = random.randrange(settings.STOCK_TOTALS_SLOTS)
+    return slot
+
+
+def adjust_totals(db: Session, *, purchase_value: Any, expected_return: Any) -> None:
+    db.execute(update(StockTotal.__table__).where(StockTotal.slot == _totals_slot(db)).values(
+        purchase_value=StockTotal.purchase_value + purchase_value,
+        expected_return=StockTotal.expected_return + expected_return,
+    ))
+
+
+def adjust_totals_for_quantity(db: Session, *, id: UUID4, quantity: int) -> None:
+    adjust_totals_for_quantities(db, quantities={id: quantity})
+
+
+def adjust_totals_for_quantities(db: Session, *, quantities: Dict[UUID4, int]) -> None:
+    """
+    Apply bulk quantity changes of several stocks to the running totals, priced in SQL.
+    """
+    quantity = case(quantities, value=Stock.id, else_=0)
+
+    def price(column: Any) -> Any:
+        return func.coalesce(
+            select(func.sum(column * quantity))
+            .where(Stock.id.in_(list(quantities)), Stock.deleted_at.is_(None))
+            .scalar_subquery(), 0
+        )
+
+    adjust_totals(db, purchase_value=price(Stock.purchase_price), expected_return=price(Stock.selling_price))
+
+
+def _valuation(stock: Stock, previous: bool = False) -> Tuple[float, float]:
+    state = inspect(stock)
+
+    def value(key: str) -> Any:
+        history = state.attrs[key].history
+        if previous and history.deleted: return history.deleted[0]
+        if previous and history.added and not history.unchanged: return None  # not set before this flush
+        return state.attrs[key].value
+
+    quantity, deleted_at = value("quantity"), value("deleted_at")
+    purchase_price, selling_price = value("purchase_price"), value("selling_price")
+    if deleted_at is not None or None in (quantity, purchase_price, selling_price): return 0.0, 0.0
+    return purchase_price * quantity, selling_price * quantity
+
+
+@event.listens_for(Session, "before_flush")
+def track_stock_totals(session: Session, flush_context, instances) -> None:
+    """
+    Fold every stock created, edited, soft- or hard-deleted in this flush into the running totals,
+    inside the same transaction.
+    """
+    purchase_value = expected_return = 0.0
+    for stock in session.new:
+        if not isinstance(stock, Stock): continue
+        purchase, expected = _valuation(stock)
+        purchase_value, expected_return = purchase_value + purchase, expected_return + expected
+    for stock in session.dirty:
+        if not isinstance(stock, Stock) or not session.is_modified(stock): continue
+        (purchase, expected), (old_purchase, old_expected) = _valuation(stock), _valuation(stock, previous=True)
+        purchase_value, expected_return = purchase_value + purchase - old_purchase, expected_return + expected - old_expected
+    for stock in session.deleted:
+        if not isinstance(stock, Stock): continue
+        purchase, expected = _valuation(stock, previous=True)
+        purchase_value, expected_return = purchase_value - purchase, expected_return - expected
+
+    if purchase_value or expected_return:
+        adjust_totals(session, purchase_value=purchase_value, expected_return=expected_return)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def forget_totals_slot(session: Session, transaction: Any) -> None:
+    if transaction.parent is None: session.info.pop("stock_totals_slot", None)
+
+
 stock_actions = CRUDStock(Stock)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, List
 
 from pydantic import BaseModel
@@ -31,3 +32,21 @@ class StockSummarySchema(BaseModel):
     soon_expiring: List[VanillaStockSchema]
     gross_stock_value: float
     raw_expected_return: Optional[float]
+
+
+class TimeSeriesPointSchema(BaseModel):
+    bucket: datetime
+    group: Optional[str] = None
+    label: Optional[str] = None
+    amount: float = 0.00
+    count: int = 0
+
+
+class TimeSeriesSchema(BaseModel):
+    interval: str
+    group_by: Optional[str] = None
+    time_range_from: datetime
+    time_range_to: datetime
+    sales: List[TimeSeriesPointSchema]
+    refunds: List[TimeSeriesPointSchema]
+    expenses: List[TimeSeriesPointSchema]
@@ -36,6 +36,7 @@ class VanillaReceiptSchema(ReceiptBase, BaseSchema):
     total_cost: Optional[float] = None
     balance: Optional[float] = None
     created_by_id: Optional[UUID4] = None
+    version: Optional[int] = None
 
 
 class ReceiptSchema(VanillaReceiptSchema):
@@ -51,3 +52,7 @@ class RelatedSaleCreate(BaseModel):
 
 class ReceiptCreateWithSales(ReceiptCreate):
     items: List[RelatedSaleCreate]
+
+
+class ReceiptRefund(BaseModel):
+    items: List[RelatedSaleCreate]
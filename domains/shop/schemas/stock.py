@@ -47,6 +47,7 @@ class StockUpdateInternal(StockBase):
 # Additional properties to return via API
 class VanillaStockSchema(StockBase, BaseSchema):
     created_by_id: Optional[UUID4] = None
+    version: Optional[int] = None
     issues: Optional[int] = 0
     total_issues_cost: Optional[float] = 0
     stock_value: Optional[float] = None
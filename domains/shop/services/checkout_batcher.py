@@ -0,0 +1,118 @@
+import asyncio
+import contextvars
+from dataclasses import dataclass
+from typing import List, Optional
+
+from pydantic import UUID4
+
+from config.logger import log
+from config.settings import settings
+from db.retry import is_transient
+from db.session import SessionLocal
+from domains.shop.schemas.receipt import ReceiptCreateWithSales
+from services.idempotency.context import IdempotencyClaim, current_idempotency_claim, mark_committing
+from services.metrics import metrics_registry
+from utils.exceptions.exc_500 import http_500_exc_internal_server_error
+
+
+@dataclass
+class PendingCheckout:
+    data: ReceiptCreateWithSales
+    created_by_id: UUID4
+    future: asyncio.Future
+    claim: Optional[IdempotencyClaim] = None
+
+
+class CheckoutBatcher:
+    """
+    Group commit for checkouts: receipts submitted within `window_ms` of each other (or until
+    `max_size` are waiting) are written in one transaction, paying for one commit instead of one each.
+
+    Every receipt runs inside its own savepoint, so a receipt that fails validation or hits a
+    database error is rolled back alone and only its caller sees the error. If the final commit
+    fails, every receipt of the batch fails with it; transient errors reach the callers as they
+    are, so `retry_transient` runs their checkouts again. Enabled with `CHECKOUT_BATCHING_ENABLED`.
+    """
+
+    def __init__(self, window_ms: float = settings.CHECKOUT_BATCH_WINDOW_MS, max_size: int = settings.CHECKOUT_BATCH_MAX_SIZE):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.pending: List[PendingCheckout] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set[asyncio.Task] = set()
+        self.batch_sizes = metrics_registry.histogram(
+            "checkout_batch_size", "Receipts committed together by the checkout batcher.",
+            buckets=(1, 2, 5, 10, 20, 50, 100),
+        )
+
+    async def submit(self, *, data: ReceiptCreateWithSales, created_by_id: UUID4) -> UUID4:
+        """
+        Queue a checkout and wait for its batch; returns the new receipt's id.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append(PendingCheckout(
+            data=data, created_by_id=created_by_id, future=future, claim=current_idempotency_claim()
+        ))
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if not batch: return
+        # a fresh context, so the batch's queries are not billed to whichever request triggered the flush
+        task = asyncio.get_running_loop().create_task(self._apply(batch), context=contextvars.Context())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _apply(self, batch: List[PendingCheckout]) -> None:
+        from domains.shop.services.receipt import receipt_service
+
+        applied = []
+        with SessionLocal() as db:
+            for checkout in batch:
+                try:
+                    with db.begin_nested():
+                        receipt = await receipt_service.create_receipt(
+                            db=db, data=checkout.data, created_by_id=checkout.created_by_id, commit=False
+                        )
+                    applied.append((checkout, receipt))
+                except Exception as exc:
+                    self._resolve(checkout, exception=exc)
+
+            try:
+                # the batch runs outside its callers' contexts, so their idempotency keys are flagged here
+                for checkout, _ in applied:
+                    if checkout.claim is not None: mark_committing(db, checkout.claim)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                if is_transient(exc):
+                    # a deadlock or serialization failure: each caller retries its own checkout
+                    log.warning(f"<CheckoutBatcher> commit of {len(applied)} receipts hit a transient error: {exc.orig}")
+                    error = exc
+                else:
+                    log.exception(f"<CheckoutBatcher> commit of {len(applied)} receipts failed")
+                    error = await http_500_exc_internal_server_error()
+                for checkout, _ in applied: self._resolve(checkout, exception=error)
+                return
+
+            self.batch_sizes.observe(len(applied))
+            for checkout, receipt in applied:
+                receipt_service.record_sales(receipt)
+                self._resolve(checkout, result=receipt.id)
+
+    @staticmethod
+    def _resolve(checkout: PendingCheckout, result: UUID4 = None, exception: BaseException = None) -> None:
+        if checkout.future.done(): return  # the caller went away
+        if exception is not None: checkout.future.set_exception(exception)
+        else: checkout.future.set_result(result)
+
+
+checkout_batcher = CheckoutBatcher()
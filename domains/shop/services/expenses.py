@@ -5,9 +5,11 @@ import pendulum
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from config.settings import settings
 from domains.shop.repositories.expenses import expenses_actions as expenses_repo
 from domains.shop.schemas.dashboard import ExpensesSummarySchema
 from domains.shop.schemas.expenses import ExpensesSchema, ExpensesUpdate, ExpensesCreate
+from services.coalescing import coalesce
 
 
 class ExpensesService:
@@ -82,6 +84,10 @@ class ExpensesService:
         )
         return expense
 
+    @coalesce(
+        ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, invalidated_by=("expense",),
+        debounce=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    )
     async def assemble_dash(self, db: Session) -> ExpensesSummarySchema:
         return ExpensesSummarySchema(
             monthly_net=await self.repo.get_expenses_amount_for_date_range(
@@ -0,0 +1,154 @@
+from time import monotonic
+from typing import Any, Dict, List, Literal, Optional
+
+import pendulum
+from pydantic import UUID4
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from domains.shop.repositories.stock import stock_actions as stock_repo
+from services.invalidation import invalidation_bus
+
+LeaderboardWindow = Literal["today", "7d", "30d", "all"]
+Ranking = Literal["most_issued", "most_profitable", "most_refunded"]
+
+WINDOWS = ("today", "7d", "30d", "all")
+RANKINGS = ("most_issued", "most_profitable", "most_refunded")
+
+
+def window_starts() -> Dict[str, Optional[pendulum.DateTime]]:
+    return {
+        "today": pendulum.today(),
+        "7d": pendulum.now().subtract(days=7),
+        "30d": pendulum.now().subtract(days=30),
+        "all": None,
+    }
+
+
+class Leaderboard:
+    """
+    Counters of one window for every stock sold in it, plus the top entries of each ranking.
+
+    Counters only ever grow between rebuilds (a sale adds to issues and profit, a refund adds
+    to the refunded quantity), so a stock can only move up: the top list is kept correct by
+    re-ranking the stock alone whenever its counter changes.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.counters: Dict[UUID4, List[float]] = {}
+        self.tops: Dict[str, List[UUID4]] = {ranking: [] for ranking in RANKINGS}
+
+    def load(self, item_id: UUID4, issued: float, profit: float, refunded: float) -> None:
+        self.counters[item_id] = [issued or 0, profit or 0, refunded or 0]
+
+    def rank(self) -> None:
+        for index, ranking in enumerate(RANKINGS):
+            candidates = [item_id for item_id, counter in self.counters.items() if counter[index] > 0]
+            candidates.sort(key=lambda item_id: self.counters[item_id][index], reverse=True)
+            self.tops[ranking] = candidates[:self.size]
+
+    def add(self, item_id: UUID4, ranking: str, amount: float) -> None:
+        index = RANKINGS.index(ranking)
+        counter = self.counters.setdefault(item_id, [0, 0, 0])
+        counter[index] += amount
+
+        top = self.tops[ranking]
+        if item_id not in top:
+            if len(top) >= self.size and counter[index] <= self.counters[top[-1]][index]: return
+            top.append(item_id)
+        top.sort(key=lambda stock_id: self.counters[stock_id][index], reverse=True)
+        del top[self.size:]
+
+
+class StockLeaderboards:
+    """
+    Top stocks by issues, sales value and refunds for the fixed dashboard windows.
+
+    The boards are rebuilt from one grouped query every `LEADERBOARD_TTL_SECONDS` (and when
+    the day rolls over, which resets "today"); the sale and refund paths apply their changes
+    in between, so reads never touch the sales table.
+
+    Each worker keeps its own copy and only sees its own sales and refunds as they happen.
+    Commits to `sales` or `stocks` in any worker mark the boards as changed through the
+    invalidation bus, and changed boards are rebuilt on the next read at most once every
+    `LEADERBOARD_MAX_STALENESS_SECONDS`, so another worker's writes and deleted stocks show up
+    within that instead of at the scheduled rebuild.
+    """
+
+    def __init__(
+            self,
+            size: int = settings.LEADERBOARD_SIZE,
+            ttl: int = settings.LEADERBOARD_TTL_SECONDS,
+            max_staleness: float = settings.LEADERBOARD_MAX_STALENESS_SECONDS,
+    ):
+        self.size = size
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.boards: Dict[str, Leaderboard] = {}
+        self.built_at: Optional[float] = None
+        self.built_on: Optional[pendulum.Date] = None
+        self.changed_at: Optional[float] = None
+
+    def is_fresh(self) -> bool:
+        if self.built_at is None or self.built_on != pendulum.today().date(): return False
+        age = monotonic() - self.built_at
+        if self.changed_at is not None and age >= self.max_staleness: return False
+        return age < self.ttl
+
+    async def refresh(self, db: Session) -> None:
+        started = monotonic()
+        starts = window_starts()
+        rows = await stock_repo.get_leaderboard_counters(db=db, windows=starts)
+
+        boards = {window: Leaderboard(self.size) for window in WINDOWS}
+        for row in rows:
+            for window, board in boards.items():
+                board.load(
+                    row.item_id,
+                    getattr(row, f"{window}_issued"),
+                    getattr(row, f"{window}_profit"),
+                    getattr(row, f"{window}_refunded"),
+                )
+        for board in boards.values(): board.rank()
+
+        self.boards = boards
+        self.built_at = monotonic()
+        self.built_on = starts["today"].date()
+        # changes committed while the counters were read may have been missed: keep them pending
+        if self.changed_at is not None and self.changed_at <= started: self.changed_at = None
+        log.debug(f"<Leaderboards> rebuilt from {len(rows)} stocks")
+
+    def invalidate(self) -> None:
+        self.built_at = None
+
+    def mark_changed(self, keys: Any = None) -> None:
+        self.changed_at = monotonic()
+
+    def record_sale(self, item_id: UUID4, cost: float) -> None:
+        for board in self.boards.values():
+            board.add(item_id, "most_issued", 1)
+            board.add(item_id, "most_profitable", cost)
+
+    def record_refund(self, item_id: UUID4, quantity: int) -> None:
+        for board in self.boards.values():
+            board.add(item_id, "most_refunded", quantity)
+
+    async def top(
+            self, db: Session, *,
+            window: LeaderboardWindow,
+            ranking: Ranking,
+            skip: int = 0,
+            limit: int = 5,
+    ) -> Optional[List[UUID4]]:
+        """
+        Stock ids of one page of a ranking, or None when the page is deeper than the boards keep.
+        """
+        if skip + limit > self.size: return None
+        if not self.is_fresh(): await self.refresh(db)
+        return self.boards[window].tops[ranking][skip:skip + limit]
+
+
+stock_leaderboards = StockLeaderboards()
+for table in ("sales", "stocks"): invalidation_bus.subscribe(table, stock_leaderboards.mark_changed)
@@ -1,20 +1,22 @@
-import asyncio
 from datetime import datetime
 from typing import List, Optional
 
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from config.settings import settings
+from db.retry import retry_transient
+from domains.shop.models import Receipt, Sale
 from domains.shop.repositories.receipt import receipt_actions as receipt_repo
 from domains.shop.schemas.receipt import (
     ReceiptSchema,
     ReceiptUpdate,
     ReceiptCreateWithSales,
     ReceiptCreateInternal,
+    ReceiptRefund,
     VanillaReceiptSchema
 )
-from domains.shop.schemas.sale import SaleCreate
-from domains.shop.services.sale import sale_service
+from domains.shop.services.leaderboard import stock_leaderboards
 from domains.shop.services.stock import stock_service
 
 
@@ -49,9 +51,35 @@ class ReceiptService:
         )
         return receipts
 
-    async def create_receipt(self, db: Session, *, data: ReceiptCreateWithSales, created_by_id: UUID4) -> ReceiptSchema:
+    async def checkout(self, db: Session, *, data: ReceiptCreateWithSales, created_by_id: UUID4) -> ReceiptSchema:
+        """
+        Create a receipt, retrying it from validation on when the transaction deadlocks.
+
+        No locks are taken while validating: stock is checked again by the decrement itself, and a
+        checkout that loses the race for the last items fails fast with a 409.
+        """
+        from domains.shop.services.checkout_batcher import checkout_batcher
+
+        async def attempt() -> ReceiptSchema:
+            if not settings.CHECKOUT_BATCHING_ENABLED:
+                return await self.create_receipt(db=db, data=data, created_by_id=created_by_id)
+            receipt_id = await checkout_batcher.submit(data=data, created_by_id=created_by_id)
+            return await self.get_receipt(db=db, id=receipt_id)
+
+        return await retry_transient(
+            attempt, operation="checkout",
+            attempts=settings.CHECKOUT_RETRY_ATTEMPTS, backoff_ms=settings.CHECKOUT_RETRY_BACKOFF_MS,
+        )
+
+    async def create_receipt(
+            self, db: Session, *, data: ReceiptCreateWithSales, created_by_id: UUID4, commit: bool = True
+    ) -> ReceiptSchema:
         # get stock info
-        items = await stock_service.repo.get_many_by_ids(db=db, ids=[item.item_id for item in data.items])
+        item_ids = {item.item_id for item in data.items}
+        items = await stock_service.repo.get_for_checkout(db=db, ids=list(item_ids))
+        if missing_ids := item_ids - {item.id for item in items}: raise ValueError(
+            f"Records not found for ids: {missing_ids}"
+        )
 
         # get dictionary of stock/item id for each sale and merge duplicates' quantities
         map_data_items_to_item_id = {}
@@ -60,7 +88,7 @@ class ReceiptService:
                 duplicate.quantity += item.quantity
                 map_data_items_to_item_id[str(item.item_id)] = duplicate
             else:
-                map_data_items_to_item_id[str(item.item_id)] = item
+                map_data_items_to_item_id[str(item.item_id)] = item.model_copy()
 
         # perform validations
         for item in items:
@@ -77,30 +105,38 @@ class ReceiptService:
             "Paid amount should be more than the total cost."
         )
 
-        # create receipt obj
-        receipt = await self.repo.create(
+        # create the receipt with its sales in one transaction
+        stocks = {item.id: item for item in items}
+        payment_type = data.payment_type or Receipt.payment_type.default.arg
+        receipt = await self.repo.checkout(
             db=db,
             created_by_id=created_by_id,
+            commit=commit,
             data=ReceiptCreateInternal(
-                **data.model_dump(exclude_none=True),
+                **data.model_dump(exclude_none=True, exclude={"items"}),
                 total_cost=total_cost,
-            ))
-
-        # create associated sales
-        await asyncio.gather(*[
-            sale_service.create_sale(db=db, data=SaleCreate(
-                quantity=item.quantity,
-                item_id=item.item_id,
-                receipt_id=receipt.id,
-                payment_type=receipt.payment_type,
-                created_by_id=created_by_id,
-            )) for item in data.items
-        ])
+            ),
+            sales=[
+                Sale(
+                    quantity=item.quantity,
+                    item_id=item.item_id,
+                    payment_type=payment_type,
+                    cost=stocks[item.item_id].selling_price * item.quantity,
+                    created_by_id=created_by_id,
+                ) for item in data.items
+            ],
+        )
+        if commit: self.record_sales(receipt)
         return receipt
 
-    async def update_receipt(self, db: Session, *, id: UUID4, data: ReceiptUpdate) -> ReceiptSchema:
+    @staticmethod
+    def record_sales(receipt: Receipt) -> None:
+        for sale in receipt.items:
+            stock_leaderboards.record_sale(item_id=sale.item_id, cost=sale.cost)
+
+    async def update_receipt(self, db: Session, *, id: UUID4, data: ReceiptUpdate, version: int = None) -> ReceiptSchema:
         receipt = await self.repo.get_by_id(db=db, id=id)
-        receipt = await self.repo.update(db=db, db_obj=receipt, data=data)
+        receipt = await self.repo.update(db=db, db_obj=receipt, data=data, version=version)
         return receipt
 
     async def get_receipt(self, db: Session, *, id: UUID4) -> ReceiptSchema:
@@ -109,10 +145,34 @@ class ReceiptService:
 
     async def delete_receipt(self, db: Session, *, id: UUID4) -> None:
         receipt = await self.repo.get_by_id(db=db, id=id)
-        sales = await sale_service.get_sale_by_keywords(db=db, receipt_id=receipt.id)
-        for sale in sales:
-            await sale_service.delete_sale(db=db, id=sale.id)
-        await self.repo.delete(db=db, db_obj=receipt, soft=True)
+        if receipt.is_deleted: raise ValueError(
+            "This receipt has already been refunded."
+        )
+        refunds = await self.repo.refund(db=db, receipt=receipt)
+        for item_id, (quantity, _, _) in refunds.items():
+            stock_leaderboards.record_refund(item_id=item_id, quantity=quantity)
+
+    async def refund_items(self, db: Session, *, id: UUID4, data: ReceiptRefund) -> ReceiptSchema:
+        receipt = await self.repo.get_by_id(db=db, id=id)
+        if receipt.is_deleted: raise ValueError(
+            "This receipt has already been refunded."
+        )
+
+        # merge duplicate items' quantities
+        quantities = {}
+        for item in data.items:
+            if item.quantity <= 0: raise ValueError(
+                "Refunded quantities should be greater than zero."
+            )
+            quantities[item.item_id] = quantities.get(item.item_id, 0) + item.quantity
+        if not quantities: raise ValueError(
+            "Provide at least one item to refund."
+        )
+
+        refunds = await self.repo.refund(db=db, receipt=receipt, quantities=quantities)
+        for item_id, (quantity, _, _) in refunds.items():
+            stock_leaderboards.record_refund(item_id=item_id, quantity=quantity)
+        return receipt
 
     async def get_receipt_by_keywords(
             self, db: Session, *,
@@ -5,10 +5,15 @@ import pendulum
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from config.settings import settings
+from db.functions import TimeBucket
+from domains.shop.repositories.expenses import expenses_actions as expenses_repo
 from domains.shop.repositories.sale import sale_actions as sale_repo
-from domains.shop.schemas.dashboard import SaleSummarySchema
+from domains.shop.schemas.dashboard import SaleSummarySchema, TimeSeriesPointSchema, TimeSeriesSchema
 from domains.shop.schemas.sale import SaleSchema, SaleUpdate, SaleCreate, SaleCreateInternal
+from domains.shop.services.leaderboard import stock_leaderboards
 from domains.shop.services.stock import stock_service
+from services.coalescing import coalesce
 
 
 class SaleService:
@@ -46,11 +51,11 @@ class SaleService:
 
     async def create_sale(self, db: Session, *, data: SaleCreate) -> SaleSchema:
         item = await stock_service.get_stock(db=db, id=data.item_id)
-        sale = await self.repo.create(db=db, data=SaleCreateInternal(
+        sale = await self.repo.sell(db=db, data=SaleCreateInternal(
             **data.model_dump(),
             cost=item.selling_price * data.quantity
         ))
-        await stock_service.sell_an_item(db=db, id=sale.item_id, quantity=data.quantity)
+        stock_leaderboards.record_sale(item_id=sale.item_id, cost=sale.cost)
         return sale
 
     async def update_sale(self, db: Session, *, id: UUID4, data: SaleUpdate) -> SaleSchema:
@@ -66,6 +71,7 @@ class SaleService:
         sale = await self.repo.get_by_id(db=db, id=id)
         await stock_service.return_an_item(db=db, id=sale.item_id, quantity=sale.quantity)
         await self.repo.delete(db=db, id=id, soft=True)
+        stock_leaderboards.record_refund(item_id=sale.item_id, quantity=sale.quantity)
 
     async def get_sale_by_keywords(
             self, db: Session, *,
@@ -91,6 +97,10 @@ class SaleService:
         )
         return sales
 
+    @coalesce(
+        ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, invalidated_by=("sales",),
+        debounce=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    )
     async def assemble_dash(self, db: Session) -> SaleSummarySchema:
         daily_time_range_min = pendulum.today()
         daily_time_range_max = pendulum.tomorrow()
@@ -134,5 +144,63 @@ class SaleService:
             ),
         )
 
+    @coalesce(
+        ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, invalidated_by=("sales", "expense"),
+        debounce=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    )
+    async def assemble_timeseries(
+            self, db: Session, *,
+            interval: TimeBucket = "day",
+            time_range_min: datetime = None,
+            time_range_max: datetime = None,
+            group_by: Optional[Literal["payment_type", "item"]] = None,
+    ) -> TimeSeriesSchema:
+        # naive query params are read in the shop's timezone so they compare with the defaults
+        time_range_max = pendulum.instance(time_range_max, tz=settings.TIMEZONE) if time_range_max else pendulum.now()
+        time_range_min = pendulum.instance(time_range_min, tz=settings.TIMEZONE) if time_range_min \
+            else time_range_max.subtract(days=30)
+        if time_range_min >= time_range_max: raise ValueError(
+            "time_range_from should be earlier than time_range_to."
+        )
+        buckets = (time_range_max - time_range_min).total_seconds() / BUCKET_SECONDS[interval]
+        if buckets > settings.TIMESERIES_MAX_BUCKETS: raise ValueError(
+            f"Range too long for {interval!r} buckets; at most {settings.TIMESERIES_MAX_BUCKETS} buckets are allowed."
+        )
+
+        series = {
+            "sales": await self.repo.get_sales_timeseries(
+                db=db, interval=interval, time_range_min=time_range_min, time_range_max=time_range_max,
+                group_by=group_by,
+            ),
+            "refunds": await self.repo.get_sales_timeseries(
+                db=db, interval=interval, time_range_min=time_range_min, time_range_max=time_range_max,
+                group_by=group_by, refunds=True,
+            ),
+            "expenses": await expenses_repo.get_expenses_timeseries(
+                db=db, interval=interval, time_range_min=time_range_min, time_range_max=time_range_max,
+            ),
+        }
+        return TimeSeriesSchema(
+            interval=interval,
+            group_by=group_by,
+            time_range_from=time_range_min,
+            time_range_to=time_range_max,
+            **{
+                name: [
+                    TimeSeriesPointSchema(
+                        bucket=row.bucket,
+                        group=str(row.group) if "group" in row._fields else None,
+                        label=row.label if "label" in row._fields else None,
+                        amount=round(row.amount or 0, 2),
+                        count=row.count,
+                    )
+                    for row in rows
+                ]
+                for name, rows in series.items()
+            }
+        )
+
+
+BUCKET_SECONDS = {"hour": 3_600, "day": 86_400, "week": 7 * 86_400, "month": 28 * 86_400}
 
 sale_service = SaleService()
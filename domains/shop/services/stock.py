@@ -6,9 +6,13 @@ import pendulum
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from config.logger import log
+from config.settings import settings
 from domains.shop.repositories.stock import stock_actions as stock_repo
 from domains.shop.schemas.dashboard import TotalStockValueAndDailySaleSchema, StockSummarySchema
 from domains.shop.schemas.stock import StockSchema, StockUpdate, StockCreate, StockUpdateInternal, VanillaStockSchema
+from domains.shop.services.leaderboard import RANKINGS, LeaderboardWindow, stock_leaderboards
+from services.coalescing import coalesce
 
 
 class StockService:
@@ -16,10 +20,6 @@ class StockService:
     def __init__(self):
         self.repo = stock_repo
 
-    async def sell_an_item(self, db: Session, *, id: UUID4, quantity: int) -> None:
-        await self.repo.sell_an_item(db=db, id=id, quantity=quantity)
-        await self.update_stock(db=db, id=id, data=StockUpdate())
-
     async def return_an_item(self, db: Session, *, id: UUID4, quantity: int) -> None:
         await self.repo.return_an_item(db=db, id=id, quantity=quantity)
         await self.update_stock(db=db, id=id, data=StockUpdate())
@@ -65,9 +65,9 @@ class StockService:
         stock = await self.repo.create(db=db, data=data, created_by_id=created_by_id)
         return stock
 
-    async def update_stock(self, db: Session, *, id: UUID4, data: StockUpdate) -> StockSchema:
+    async def update_stock(self, db: Session, *, id: UUID4, data: StockUpdate, version: int = None) -> StockSchema:
         stock = await self.repo.get_by_id(db=db, id=id)
-        stock = await self.repo.update(db=db, db_obj=stock, data=data)
+        stock = await self.repo.update(db=db, db_obj=stock, data=data, version=version)
         # set values
         from domains.shop.services.sale import sale_service
         payload = StockUpdateInternal(**data.model_dump())
@@ -82,6 +82,7 @@ class StockService:
 
     async def delete_stock(self, db: Session, *, id: UUID4, soft=True) -> None:
         await self.repo.delete(db=db, id=id, soft=soft)
+        stock_leaderboards.invalidate()
 
     async def get_stock_by_keywords(
             self, db: Session, *,
@@ -107,6 +108,10 @@ class StockService:
         )
         return stocks
 
+    @coalesce(
+        ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, invalidated_by=("stocks", "stock_totals", "sales"),
+        debounce=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    )
     async def get_total_stock_value_and_daily_sale(
             self, db: Session
     ) -> TotalStockValueAndDailySaleSchema:
@@ -123,23 +128,35 @@ class StockService:
             ),
         )
 
+    @coalesce(
+        ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, invalidated_by=("stocks", "stock_totals", "sales"),
+        debounce=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    )
     async def assemble_summary(
             self, db: Session, *,
             skip: int = 0,
             limit: int = 5,
             time_range_min: Optional[datetime] = None,
             time_range_max: Optional[datetime] = None,
+            window: Optional[LeaderboardWindow] = None,
     ) -> StockSummarySchema:
-        payload = dict(
-            most_issued=await self.repo.list_most_issued_stock(
-                db=db, skip=skip, limit=limit, time_range_min=time_range_min, time_range_max=time_range_max
-            ),
-            most_profitable=await self.repo.list_most_profitable_stock(
-                db=db, skip=skip, limit=limit, time_range_min=time_range_min, time_range_max=time_range_max
-            ),
-            most_refunded=await self.repo.list_most_refunded_stock(
+        # fixed windows are served from the leaderboards, custom ranges query the sales table
+        rankings = {}
+        if not (time_range_min or time_range_max):
+            rankings = await self._leaderboard_rankings(db=db, window=window or "all", skip=skip, limit=limit)
+        queries = dict(
+            most_issued=self.repo.list_most_issued_stock,
+            most_profitable=self.repo.list_most_profitable_stock,
+            most_refunded=self.repo.list_most_refunded_stock,
+        )
+        for ranking, query in queries.items():
+            if ranking in rankings: continue
+            rankings[ranking] = await query(
                 db=db, skip=skip, limit=limit, time_range_min=time_range_min, time_range_max=time_range_max
-            ),
+            )
+
+        payload = dict(
+            **rankings,
             soon_expiring=await self.repo.list_soon_expiring_stock(
                 db=db, skip=skip, limit=limit, time_range_min=time_range_min, time_range_max=time_range_max
             ),
@@ -150,5 +167,26 @@ class StockService:
         )
         return StockSummarySchema(**payload)
 
+    async def reconcile_totals(self, db: Session) -> None:
+        purchase_drift, return_drift = await self.repo.reconcile_totals(db=db)
+        if purchase_drift or return_drift: log.warning(
+            f"<StockTotals> corrected drift: purchase value {purchase_drift:+}, expected return {return_drift:+}"
+        )
+
+    async def _leaderboard_rankings(
+            self, db: Session, *, window: LeaderboardWindow, skip: int, limit: int
+    ) -> dict:
+        pages = {}
+        for ranking in RANKINGS:
+            ids = await stock_leaderboards.top(db=db, window=window, ranking=ranking, skip=skip, limit=limit)
+            if ids is not None: pages[ranking] = ids
+
+        wanted = {stock_id for ids in pages.values() for stock_id in ids}
+        stocks = {stock.id: stock for stock in await self.repo.get_many_by_ids(db=db, ids=list(wanted), silent=True)}
+        return {
+            ranking: [stocks[stock_id] for stock_id in ids if stock_id in stocks]
+            for ranking, ids in pages.items()
+        }
+
 
 stock_service = StockService()
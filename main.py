@@ -8,6 +8,11 @@ from uvicorn import run
 from apis.routers import router
 from config.event import event_manager
 from config.settings import AppSettings, settings
+from services.admission import AdmissionMiddleware, RouteClass
+from services.idempotency import IdempotencyMiddleware
+from services.metrics import MetricsMiddleware, metrics_registry
+from services.profiling import ProfilerMiddleware
+from services.timeouts import TimeoutMiddleware
 from utils.exceptions.exc_500 import http_500_exc_internal_server_error
 
 
@@ -18,12 +23,59 @@ class App:
         self.__add_routes(router=router, settings=settings)
 
     def __setup_middlewares(self, settings: AppSettings):
+        self.__app.add_middleware(
+            TimeoutMiddleware,
+            registry=metrics_registry,
+            timeout=settings.REQUEST_TIMEOUT_SECONDS,
+            prefix=settings.API_PREFIX,
+            exempt=["/health", "/metrics"],
+        )
+        self.__app.add_middleware(
+            IdempotencyMiddleware,
+            routes=[
+                ("POST", "/shop/receipts"),
+                ("POST", "/shop/receipts/{id}/refund"),
+                ("DELETE", "/shop/receipts/{id}"),
+                ("DELETE", "/shop/sales/{id}"),
+            ],
+            registry=metrics_registry,
+            prefix=settings.API_PREFIX,
+        )
+        if settings.ADMISSION_CONTROL_ENABLED: self.__app.add_middleware(
+            AdmissionMiddleware,
+            classes=[
+                RouteClass(
+                    "checkout",
+                    routes=[("POST", "/shop/receipts"), ("DELETE", "/shop/receipts/"), ("*", "/shop/sales")],
+                    limit=settings.ADMISSION_CHECKOUT_LIMIT,
+                    queue_size=settings.ADMISSION_CHECKOUT_QUEUE,
+                ),
+                RouteClass(
+                    "reports",
+                    routes=[("GET", "/shop/dash/")],
+                    limit=settings.ADMISSION_REPORTS_LIMIT,
+                    queue_size=settings.ADMISSION_REPORTS_QUEUE,
+                ),
+            ],
+            default=RouteClass(
+                "reads", routes=[], limit=settings.ADMISSION_READS_LIMIT, queue_size=settings.ADMISSION_READS_QUEUE
+            ),
+            registry=metrics_registry,
+            max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+            prefix=settings.API_PREFIX,
+            exempt=["/health", "/metrics"],
+        )
+        self.__app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+        self.__app.add_middleware(ProfilerMiddleware)
+        # added last so it is outermost: the 503s, 504s and 409s of the middlewares above carry CORS headers too
         self.__app.add_middleware(
             CORSMiddleware,
             allow_origins=settings.ALLOWED_ORIGIN_LIST,
             allow_credentials=settings.IS_ALLOWED_CREDENTIALS,
             allow_methods=settings.ALLOWED_METHOD_LIST,
             allow_headers=settings.ALLOWED_HEADER_LIST,
+            expose_headers=settings.EXPOSED_HEADER_LIST,
         )
 
     def __add_routes(self, router: APIRouter, settings: AppSettings):
@@ -0,0 +1,2 @@
+from services.admission.limiter import AdmissionQueue
+from services.admission.middleware import AdmissionMiddleware, RouteClass
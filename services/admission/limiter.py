@@ -0,0 +1,57 @@
+import asyncio
+from collections import deque
+from typing import Deque
+
+
+class AdmissionQueue:
+    """
+    A concurrency budget with a short, bounded waiting line in front of it.
+
+    Up to `limit` holders run at once; the next `queue_size` wait in arrival order for at most
+    `max_wait` seconds. Anything beyond that is refused straight away, which is the point: a
+    request refused now can be retried elsewhere, one stuck behind a full pool only times out.
+    A freed slot is handed directly to the longest waiter, so newcomers cannot jump the line.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, max_wait: float):
+        if limit <= 0: raise ValueError(f"Admission limit of {name!r} must be positive")
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def depth(self) -> int:
+        return len(self.waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Take a slot, waiting in line if needed; False when the line is full or the wait ran out.
+        """
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return True
+        if len(self.waiters) >= self.queue_size: return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait((waiter,), timeout=self.max_wait)
+        except asyncio.CancelledError:
+            # the client went away while waiting; pass on a slot it may have been handed meanwhile
+            if waiter.done(): self.release()
+            else: self.waiters.remove(waiter)
+            raise
+        if waiter.done(): return True
+        self.waiters.remove(waiter)
+        return False
+
+    def release(self) -> None:
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot changes hands, `active` stays as it is
+                return
+        self.active -= 1
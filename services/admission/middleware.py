@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Iterable, Sequence
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.logger import log
+from services.admission.limiter import AdmissionQueue
+from services.metrics import MetricsRegistry
+
+
+@dataclass
+class RouteClass:
+    """
+    A group of routes sharing one admission budget. Routes are (method, path prefix) pairs;
+    a method of "*" matches any method.
+    """
+    name: str
+    routes: Sequence[tuple[str, str]]
+    limit: int
+    queue_size: int
+
+
+class AdmissionMiddleware:
+    """
+    Load shedding: every request takes a slot from its route class's budget before it runs, so
+    a burst on one class (a dashboard stampede) cannot use up the database connections another
+    class (checkout) needs.
+
+    Requests over budget wait in a short queue; when that is full, or the wait exceeds
+    `max_wait` seconds, the request is refused with an immediate 503 and a Retry-After header
+    instead of piling up on the connection pool. Classes are matched in order and unmatched
+    requests go to `default`; `exempt` path prefixes (health checks, metrics) are never queued.
+    """
+
+    def __init__(
+            self, app: ASGIApp, classes: Iterable[RouteClass], default: RouteClass, registry: MetricsRegistry, *,
+            max_wait: float, retry_after: int, prefix: str = "", exempt: Iterable[str] = (),
+    ):
+        self.app = app
+        self.classes = [
+            ([(method.upper(), prefix + path) for method, path in route_class.routes],
+             AdmissionQueue(route_class.name, route_class.limit, route_class.queue_size, max_wait))
+            for route_class in classes
+        ]
+        self.default = AdmissionQueue(default.name, default.limit, default.queue_size, max_wait)
+        self.exempt = tuple(prefix + path for path in exempt)
+        self.retry_after = str(retry_after)
+
+        self.in_flight = registry.gauge(
+            "admission_in_flight", "Requests holding an admission slot, by route class.", ("route_class",)
+        )
+        self.queue_depth = registry.gauge(
+            "admission_queue_depth", "Requests waiting for an admission slot, by route class.", ("route_class",)
+        )
+        self.shed = registry.counter(
+            "admission_shed_total", "Requests refused with a 503 by admission control.", ("route_class",)
+        )
+        self.wait = registry.histogram(
+            "admission_wait_seconds", "Time requests waited for an admission slot.", ("route_class",)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            return await self.app(scope, receive, send)
+
+        queue = self._classify(scope)
+        self.queue_depth.set(queue.depth + 1, route_class=queue.name)
+        start = perf_counter()
+        try:
+            admitted = await queue.acquire()
+        finally:
+            self.queue_depth.set(queue.depth, route_class=queue.name)
+        self.wait.observe(perf_counter() - start, route_class=queue.name)
+
+        if not admitted:
+            self.shed.inc(route_class=queue.name)
+            log.warning(f"<Admission> shed {scope['method']} {scope['path']} ({queue.name} is over budget)")
+            response = JSONResponse(
+                {"detail": "The server is busy. Please retry shortly."},
+                status_code=503, headers={"Retry-After": self.retry_after},
+            )
+            return await response(scope, receive, send)
+
+        self.in_flight.set(queue.active, route_class=queue.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
+            self.in_flight.set(queue.active, route_class=queue.name)
+
+    def _classify(self, scope: Scope) -> AdmissionQueue:
+        method, path = scope["method"], scope["path"]
+        for routes, queue in self.classes:
+            if any(method_ in ("*", method) and path.startswith(path_) for method_, path_ in routes): return queue
+        return self.default
@@ -0,0 +1 @@
+from services.coalescing.single_flight import SingleFlight, coalesce
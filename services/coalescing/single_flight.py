@@ -0,0 +1,136 @@
+import asyncio
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from functools import wraps
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, TypeVar
+
+from services.invalidation import invalidation_bus
+from services.metrics import MetricsRegistry, metrics_registry
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time: callers asking for a key that is already being
+    computed wait for that result instead of computing it again. With a `ttl` the result is
+    also kept for that many seconds, serving callers that arrive just after it finished.
+
+    Failures are shared with the callers waiting on them but never kept. If the caller doing
+    the work is cancelled, one of the waiters takes over.
+    """
+
+    def __init__(self, name: str, registry: MetricsRegistry, ttl: float = 0.0, max_entries: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self._results: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.calls = registry.counter(
+            "single_flight_calls_total", "Coalesced computations by outcome: computed, coalesced or cached.",
+            ("name", "outcome"),
+        )
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            if self.ttl and (cached := self._results.get(key)) is not None:
+                expires_at, result = cached
+                if expires_at > monotonic():
+                    self.calls.inc(name=self.name, outcome="cached")
+                    return result
+                del self._results[key]
+
+            flight = self._flights.get(key)
+            if flight is None: return await self._compute(key, func)
+
+            self.calls.inc(name=self.name, outcome="coalesced")
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # the computing caller was cancelled, not us: go round and compute it ourselves
+                if flight.cancelled() and not asyncio.current_task().cancelling(): continue
+                raise
+
+    async def _compute(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.calls.inc(name=self.name, outcome="computed")
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as exc:
+            flight.set_exception(exc)
+            flight.exception()  # retrieved, even if nobody was waiting
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+        flight.set_result(result)
+        if self.ttl:
+            self._results[key] = (monotonic() + self.ttl, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries: self._results.popitem(last=False)
+        return result
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop the kept result for `key`, or all of them; computations under way are unaffected.
+        """
+        if key is None: self._results.clear()
+        else: self._results.pop(key, None)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (datetime, date)): return value.isoformat()
+    if isinstance(value, Enum): return value.value
+    if isinstance(value, dict): return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)): return tuple(_freeze(v) for v in value)
+    return value
+
+
+def coalesce(
+        ttl: float = 0.0, exclude: Iterable[str] = ("db",), max_entries: int = 256,
+        invalidated_by: Iterable[str] = (), debounce: float = 0.0,
+):
+    """
+    Decorate an async service method so identical concurrent calls share one computation,
+    keyed on the method and its keyword arguments (bar `exclude`, e.g. the session):
+
+        @coalesce(ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+        async def assemble_dash(self, db: Session) -> SaleSummarySchema: ...
+
+    Kept results are dropped whenever a transaction changing one of the `invalidated_by` tables
+    commits, in any worker, but at most once every `debounce` seconds: on tables written by every
+    checkout, evicting on each would leave nothing to share. The TTL bounds their age should a
+    notification go missing, or be debounced.
+
+    The result is handed to every caller, so it should be immutable and not depend on who is
+    asking beyond the arguments; pass the caller (or their role) as an argument when it does.
+    """
+    excluded = frozenset(exclude)
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        flight = SingleFlight(func.__qualname__, metrics_registry, ttl=ttl, max_entries=max_entries)
+        evicted_at = float("-inf")
+
+        def evict(keys: Any) -> None:
+            nonlocal evicted_at
+            if monotonic() - evicted_at < debounce: return
+            evicted_at = monotonic()
+            flight.invalidate()
+
+        for table in invalidated_by: invalidation_bus.subscribe(table, evict)
+
+        @wraps(func)
+        async def wrapper(self, **kwargs: Any) -> T:
+            key = tuple(sorted((name, _freeze(value)) for name, value in kwargs.items() if name not in excluded))
+            return await flight.do(key, lambda: func(self, **kwargs))
+
+        wrapper.single_flight = flight
+        return wrapper
+
+    return decorator
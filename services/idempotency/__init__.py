@@ -0,0 +1,2 @@
+from services.idempotency.context import IdempotencyClaim, current_idempotency_claim
+from services.idempotency.middleware import IdempotencyMiddleware
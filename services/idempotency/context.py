@@ -0,0 +1,71 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pendulum
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from db.writes import has_writes
+from domains.common.models import IdempotencyKey
+
+
+@dataclass
+class IdempotencyClaim:
+    """
+    The idempotency key held by the running request.
+
+    Mutable for the same reason as `RequestStats`: sync code run through the threadpool sees
+    a copy of the request context that still points at the same instance.
+    """
+    record_id: Any
+    committed: bool = False
+
+
+_idempotency_claim: ContextVar[Optional[IdempotencyClaim]] = ContextVar("idempotency_claim", default=None)
+
+
+def current_idempotency_claim() -> Optional[IdempotencyClaim]:
+    return _idempotency_claim.get()
+
+
+def start_idempotency_claim(record_id: Any) -> IdempotencyClaim:
+    claim = IdempotencyClaim(record_id=record_id)
+    _idempotency_claim.set(claim)
+    return claim
+
+
+def clear_idempotency_claim() -> None:
+    _idempotency_claim.set(None)
+
+
+def mark_committing(session: Session, claim: IdempotencyClaim) -> None:
+    """
+    Flag the claim's key as committed inside the session's transaction, so the flag and the
+    writes it vouches for land (or vanish) together. For sessions working on behalf of other
+    requests, e.g. the checkout batcher; a request's own sessions are flagged on commit.
+    """
+    claims = session.info.setdefault("idempotency_claims", [])
+    if any(pending is claim for pending in claims): return
+    session.connection().execute(
+        update(IdempotencyKey.__table__)
+        .where(IdempotencyKey.__table__.c.id == claim.record_id)
+        .values(committed_at=pendulum.now())
+    )
+    claims.append(claim)
+
+
+@event.listens_for(Session, "before_commit")
+def flag_committed_claim(session: Session) -> None:
+    claim = current_idempotency_claim()
+    if claim is not None and not claim.committed and has_writes(session): mark_committing(session, claim)
+
+
+@event.listens_for(Session, "after_commit")
+def confirm_committed_claims(session: Session) -> None:
+    for claim in session.info.pop("idempotency_claims", ()): claim.committed = True
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_rolled_back_claims(session: Session, previous_transaction: Any) -> None:
+    if previous_transaction.parent is None: session.info.pop("idempotency_claims", None)
@@ -0,0 +1,221 @@
+import json
+import re
+from datetime import datetime, timezone
+from hashlib import sha256
+from typing import Iterable, Optional
+
+import pendulum
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.logger import log
+from config.settings import settings
+from db.session import SessionLocal
+from domains.common.models import IdempotencyKey
+from domains.common.repositories.idempotency_key import idempotency_key_actions
+from services.idempotency.context import clear_idempotency_claim, start_idempotency_claim
+from services.metrics import MetricsRegistry
+
+# replayed for a request whose writes committed but whose response could not be kept
+COMMITTED_MARKER = json.dumps({"detail": "This request was already processed; its original response is not available."}).encode()
+
+
+def _route_pattern(path: str) -> re.Pattern:
+    # "/shop/receipts/{id}" -> ^/shop/receipts/[^/]+$
+    return re.compile("^" + re.sub(r"\\\{\w+\\}", "[^/]+", re.escape(path)) + "$")
+
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive; they were written in UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _caller_scope(authorization: bytes) -> str:
+    # the token's subject, so a retry after a token refresh still finds the key
+    try:
+        token = authorization.decode("latin-1").partition(" ")[2].strip()
+        subject = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+    except (JWTError, UnicodeDecodeError):
+        subject = None
+    if subject is None: return sha256(b"credentials:" + authorization).hexdigest()
+    return sha256(f"user:{subject}".encode()).hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    Makes retried writes safe: a request to one of `routes` carrying an `Idempotency-Key` header
+    runs once, and every retry with the same key gets the stored response back byte for byte.
+
+    Keys are scoped to the authenticated user and bound to the request body; reusing a key for a
+    different request is a 422, and a retry that arrives while the first attempt is still running
+    is a 409. A request that failed before any of its writes committed frees its key, so the client
+    can retry it; once they committed the key is kept, with a short marker standing in for a
+    response that was an error or too large to store. Stored responses expire after
+    `IDEMPOTENCY_KEY_TTL_SECONDS` and are pruned by the scheduler.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Iterable[tuple[str, str]], registry: MetricsRegistry, prefix: str = ""):
+        self.app = app
+        self.routes = [(method.upper(), _route_pattern(prefix + path)) for method, path in routes]
+        self.header = settings.IDEMPOTENCY_HEADER.lower().encode()
+        self.repo = idempotency_key_actions
+        self.outcomes = registry.counter(
+            "idempotency_requests_total", "Requests carrying an idempotency key, by outcome.", ("outcome",)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._covers(scope):
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if self.header not in headers:
+            return await self.app(scope, receive, send)
+
+        key = headers[self.header].decode("latin-1").strip()
+        if not key or len(key) > 255:
+            return await self._reject(scope, receive, send, 400, f"{settings.IDEMPOTENCY_HEADER} must be 1-255 characters.")
+
+        body = await self._read_body(receive)
+        claim = dict(
+            scope=_caller_scope(headers.get(b"authorization", b"")),
+            key=key,
+            method=scope["method"],
+            path=scope["path"],
+            fingerprint=sha256(body).hexdigest(),
+        )
+
+        with SessionLocal() as db:
+            record, claimed = await self._claim(db, claim)
+            if not claimed: return await self._answer(scope, receive, send, record, claim)
+            record_id = record.id
+
+        await self._run(scope, self._replay_receive(body, receive), send, record_id)
+
+    def _covers(self, scope: Scope) -> bool:
+        return any(method == scope["method"] and pattern.match(scope["path"]) for method, pattern in self.routes)
+
+    async def _claim(self, db, claim: dict) -> tuple[Optional[IdempotencyKey], bool]:
+        """
+        Take the key for this request, or return the record that already holds it.
+        """
+        now = pendulum.now()
+        expires_at = now.add(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        record = await self.repo.claim(db, expires_at=expires_at, **claim)
+        if record is not None: return record, True
+
+        existing = await self.repo.get(db, scope=claim["scope"], key=claim["key"])
+        if existing is None or self._is_abandoned(existing, now):
+            # the holder expired or died mid-request; free the key and try once more
+            if existing is not None: await self.repo.release(db, id=existing.id)
+            record = await self.repo.claim(db, expires_at=expires_at, **claim)
+            return record, record is not None
+        return existing, False
+
+    @classmethod
+    def _is_abandoned(cls, record: IdempotencyKey, now: datetime) -> bool:
+        if _aware(record.expires_at) < now: return True
+        # a request whose writes committed is not dead, only its response was lost
+        return record.status_code is None and record.committed_at is None and cls._is_stale(record, now)
+
+    @staticmethod
+    def _is_stale(record: IdempotencyKey, now: datetime) -> bool:
+        lock_timeout = pendulum.duration(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+        return _aware(record.created_at) < now - lock_timeout
+
+    async def _answer(self, scope: Scope, receive: Receive, send: Send, record: Optional[IdempotencyKey], claim: dict) -> None:
+        if record is not None and (record.method, record.path, record.fingerprint) != (
+                claim["method"], claim["path"], claim["fingerprint"]):
+            self.outcomes.inc(outcome="mismatch")
+            return await self._reject(
+                scope, receive, send, 422, f"{settings.IDEMPOTENCY_HEADER} was already used for a different request."
+            )
+        if (record is not None and record.status_code is None
+                and record.committed_at is not None and self._is_stale(record, pendulum.now())):
+            # committed, but the request died before storing its response
+            self.outcomes.inc(outcome="replayed")
+            return await self._replay(send, 200, [("content-type", "application/json")], COMMITTED_MARKER)
+        if record is None or record.status_code is None:
+            self.outcomes.inc(outcome="conflict")
+            return await self._reject(
+                scope, receive, send, 409, f"A request with this {settings.IDEMPOTENCY_HEADER} is still in progress.",
+                headers={"Retry-After": "1"},
+            )
+
+        self.outcomes.inc(outcome="replayed")
+        await self._replay(send, record.status_code, json.loads(record.response_headers), record.response_body)
+
+    @staticmethod
+    async def _replay(send: Send, status_code: int, headers: list, body: Optional[bytes]) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (name.encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ] + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": body or b""})
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, record_id) -> None:
+        status_code, headers, chunks = None, [], []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code, headers = message["status"], message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        claim = start_idempotency_claim(record_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            clear_idempotency_claim()
+            body = b"".join(chunks)
+            storable = status_code is not None and status_code < 500
+            if storable and len(body) > settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                log.warning(f"<Idempotency> {scope['method']} {scope['path']} response too large to store")
+                storable = False
+            with SessionLocal() as db:
+                if storable:
+                    self.outcomes.inc(outcome="stored")
+                    await self.repo.complete(
+                        db, id=record_id, status_code=status_code, body=body,
+                        headers=json.dumps([(name.decode("latin-1"), value.decode("latin-1")) for name, value in headers]),
+                    )
+                elif not claim.committed and await self.repo.release(db, id=record_id, uncommitted_only=True):
+                    self.outcomes.inc(outcome="released")
+                else:
+                    # the writes are in: a retry must not run them again
+                    self.outcomes.inc(outcome="committed")
+                    await self.repo.complete(
+                        db, id=record_id,
+                        status_code=status_code if status_code is not None and status_code < 500 else 200,
+                        body=COMMITTED_MARKER, headers=json.dumps([("content-type", "application/json")]),
+                    )
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks, more_body = [], True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_receive(body: bytes, receive: Receive) -> Receive:
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent: return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return replay
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str, headers: dict = None) -> None:
+        response: Response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+        await response(scope, receive, send)
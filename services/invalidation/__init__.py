@@ -0,0 +1 @@
+from services.invalidation.bus import InvalidationBus, invalidation_bus
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import select
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from config.logger import log
+from config.settings import settings
+from services.metrics import MetricsRegistry, metrics_registry
+
+# Postgres refuses NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7_900
+
+# keys of one table changed by one transaction, or None for "any row of it"
+Changes = Dict[str, Optional[Set[str]]]
+Handler = Callable[[Optional[Set[str]]], None]
+
+
+def _notifications(dbapi_connection: Any, stopped: threading.Event, timeout: float) -> Iterator[str]:
+    if hasattr(dbapi_connection, "poll"):  # psycopg2
+        while not stopped.is_set():
+            if select.select([dbapi_connection], [], [], timeout) == ([], [], []): continue
+            dbapi_connection.poll()
+            while dbapi_connection.notifies: yield dbapi_connection.notifies.pop(0).payload
+    else:  # psycopg 3.2+
+        while not stopped.is_set():
+            for notify in dbapi_connection.notifies(timeout=timeout): yield notify.payload
+
+
+class InvalidationBus:
+    """
+    Tells every worker which tables (and rows) a committed transaction changed, so each can
+    evict what it caches in memory from them.
+
+    Writes are picked up from the ORM session: flushed objects and bulk statements, less those of
+    savepoints that rolled back. On Postgres they are published with one `NOTIFY` sent just before
+    the commit, so it goes out with the commit and never for a rollback, and each worker
+    `LISTEN`s on a connection of its own. Other databases
+    have no such channel (nor more than one worker), so only the writing process is told.
+
+    Notifications are fire-and-forget: one missed while the listener reconnects is made up for
+    by evicting everything, and caches keep a TTL of their own for whatever still slips through.
+    """
+
+    def __init__(self, channel: str, registry: MetricsRegistry, max_keys: int = 50):
+        self.channel = channel
+        self.max_keys = max_keys
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.published = registry.counter(
+            "invalidations_published_total", "Change notifications sent to other workers, by table.", ("table",)
+        )
+        self.received = registry.counter(
+            "invalidations_received_total", "Change notifications received from the database, by table.", ("table",)
+        )
+
+    def subscribe(self, table: str, handler: Handler) -> None:
+        """
+        Call `handler` with the changed keys of `table` after each commit changing it, here or
+        in another worker; the keys are None when the change was not tracked row by row.
+        """
+        self._handlers[table].append(handler)
+
+    def dispatch(self, changes: Changes) -> None:
+        for table, keys in changes.items():
+            for handler in self._handlers.get(table, ()):
+                try:
+                    handler(keys)
+                except Exception:
+                    log.exception(f"<InvalidationBus> handler for {table} failed")
+
+    def dispatch_all(self) -> None:
+        self.dispatch({table: None for table in list(self._handlers)})
+
+    def dispatch_committed(self, changes: Changes) -> None:
+        # handlers touch structures owned by the event loop; commits in the threadpool hand them over
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is None or running is self._loop: self.dispatch(changes)
+        else: self._loop.call_soon_threadsafe(self.dispatch, changes)
+
+    def _publish(self, connection: Any, changes: Changes) -> None:
+        if connection.dialect.name != "postgresql": return
+        payload = json.dumps({table: sorted(keys) if keys is not None else None for table, keys in changes.items()})
+        if len(payload) > NOTIFY_PAYLOAD_LIMIT: payload = json.dumps({table: None for table in changes})
+        connection.exec_driver_sql("SELECT pg_notify(%(channel)s, %(payload)s)", {"channel": self.channel, "payload": payload})
+        for table in changes: self.published.inc(table=table)
+
+    def record(self, session: Session, changes: Changes) -> None:
+        """
+        Note `changes` made in the session's current (sub)transaction; they are dropped if it
+        rolls back, and announced when the whole transaction commits.
+        """
+        # every worker subscribes the same handlers, so changes nobody here listens to concern nobody
+        changes = {table: keys for table, keys in changes.items() if table in self._handlers}
+        if not changes: return
+        transaction = session.get_nested_transaction() or session.get_transaction()
+        session.info.setdefault("invalidations", []).append((transaction, changes))
+
+    def forget(self, session: Session, transaction: Any) -> None:
+        """
+        Drop the changes made in a rolled back `transaction`, savepoints inside it included.
+        """
+        def within(inner: Any) -> bool:
+            while inner is not None:
+                if inner is transaction: return True
+                inner = inner.parent
+            return False
+
+        recorded = session.info.get("invalidations")
+        if recorded: session.info["invalidations"] = [(tx, changes) for tx, changes in recorded if not within(tx)]
+
+    def publish(self, session: Session) -> None:
+        """
+        Announce everything the transaction about to commit changed, in one notification sent
+        from inside it; kept for dispatching in this worker once the commit went through.
+        """
+        session.flush()  # what the commit would flush counts too
+        merged: Changes = {}
+        for _, changes in session.info.pop("invalidations", ()):
+            for table, keys in changes.items():
+                if keys is None or merged.get(table, ()) is None: merged[table] = None
+                else: merged.setdefault(table, set()).update(keys)
+        if not merged: return
+        merged = {table: keys if keys is None or len(keys) <= self.max_keys else None for table, keys in merged.items()}
+        self._publish(session.connection(), merged)
+        session.info["committing_invalidations"] = merged
+
+    async def start(self, engine: Engine) -> None:
+        if engine.dialect.name != "postgresql":
+            log.info("<InvalidationBus> no LISTEN/NOTIFY on this database, caches are only invalidated locally")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopped.clear()
+        # a connection outside the pools: it is held for the life of the worker
+        listener_engine = create_engine(engine.url, poolclass=NullPool)
+        self._thread = threading.Thread(target=self._listen, args=(listener_engine,), name="invalidation-listener", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 5)
+            self._thread = None
+
+    def _listen(self, listener_engine: Engine) -> None:
+        backoff = 1.0
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = listener_engine.raw_connection()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f'LISTEN "{self.channel}"')
+                cursor.close()
+                # whatever was published while nobody listened is lost: start over from an empty cache
+                self._loop.call_soon_threadsafe(self.dispatch_all)
+                log.info(f"<InvalidationBus> listening on {self.channel}")
+                backoff = 1.0
+                for payload in _notifications(dbapi_connection, self._stopped, timeout=1.0):
+                    self._receive(payload)
+            except Exception:
+                if self._stopped.is_set(): break
+                log.exception(f"<InvalidationBus> listener failed, reconnecting in {backoff:.0f}s")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if connection is not None: connection.close()
+
+    def _receive(self, payload: str) -> None:
+        try:
+            changes = {table: set(keys) if keys is not None else None for table, keys in json.loads(payload).items()}
+        except (ValueError, AttributeError, TypeError):
+            log.warning(f"<InvalidationBus> ignored a malformed notification: {payload[:200]}")
+            return
+        for table in changes: self.received.inc(table=table)
+        self._loop.call_soon_threadsafe(self.dispatch, changes)
+
+
+invalidation_bus = InvalidationBus(settings.INVALIDATION_CHANNEL, metrics_registry, max_keys=settings.INVALIDATION_MAX_KEYS)
+
+
+def _row_key(instance: Any) -> Optional[str]:
+    identity = inspect(instance).mapper.primary_key_from_instance(instance)
+    return str(identity[0]) if len(identity) == 1 and identity[0] is not None else None
+
+
+@event.listens_for(Session, "after_flush")
+def record_flushed_changes(session: Session, flush_context: Any) -> None:
+    changes: Changes = {}
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = inspect(instance).mapper.local_table.name
+        key = _row_key(instance)
+        if key is None or (table in changes and changes[table] is None): changes[table] = None
+        else: changes.setdefault(table, set()).add(key)
+    if changes: invalidation_bus.record(session, changes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def record_bulk_changes(orm_execute_state: Any) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete): return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is None: return
+    invalidation_bus.record(orm_execute_state.session, {table.name: None})
+
+
+@event.listens_for(Session, "before_commit")
+def publish_committing_changes(session: Session) -> None:
+    if session.info.get("invalidations") or session.new or session.dirty or session.deleted:
+        invalidation_bus.publish(session)
+
+
+@event.listens_for(Session, "after_commit")
+def dispatch_committed_changes(session: Session) -> None:
+    changes = session.info.pop("committing_invalidations", None)
+    if changes: invalidation_bus.dispatch_committed(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_rolled_back_changes(session: Session, previous_transaction: Any) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop("invalidations", None)
+        session.info.pop("committing_invalidations", None)
+    else:
+        invalidation_bus.forget(session, previous_transaction)
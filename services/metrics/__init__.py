@@ -0,0 +1,10 @@
+from services.metrics.budget import QueryBudgetExceeded, query_budget
+from services.metrics.context import RequestStats, current_request_stats
+from services.metrics.middleware import MetricsMiddleware
+from services.metrics.registry import MetricsRegistry
+from services.metrics.slow_queries import slow_query_log
+from services.metrics.sql import instrument_engine
+
+metrics_registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,65 @@
+import re
+from functools import lru_cache
+from typing import Callable
+
+from config.logger import log
+from config.settings import settings
+from services.metrics.context import RequestStats, current_request_stats
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):(?!:)\w+|\?")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals and bind parameters become `?` and expanded
+    `IN (...)` lists collapse, so the same query issued for different rows counts as one shape.
+    """
+    shape = _LITERALS.sub("?", _PLACEHOLDERS.sub("?", statement))
+    shape = _PLACEHOLDER_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def query_budget(limit: int) -> Callable[[], None]:
+    """
+    Route dependency declaring how many SQL statements one request may execute.
+
+        @router.get("", dependencies=[Depends(query_budget(10))])
+    """
+
+    async def declare_query_budget() -> None:
+        stats = current_request_stats()
+        if stats is not None: stats.budget = limit
+
+    return declare_query_budget
+
+
+def check_request_queries(stats: RequestStats) -> list[str]:
+    """
+    Report the request's budget overrun and any statement shape repeated often enough to be N+1.
+
+    Depending on `QUERY_BUDGET_MODE` the findings are logged as warnings or raised as
+    `QueryBudgetExceeded`; the findings are returned either way.
+    """
+    if settings.QUERY_BUDGET_MODE == "off": return []
+
+    problems = []
+    if stats.budget is not None and stats.queries > stats.budget:
+        problems.append(f"{stats.queries} queries exceed the budget of {stats.budget}")
+    for shape, count in stats.statements.most_common():
+        if count < settings.QUERY_N_PLUS_ONE_THRESHOLD: break
+        problems.append(f"possible N+1, {count}x: {_SELECT_LIST.sub('SELECT ... FROM ', shape)[:200]}")
+
+    if not problems: return problems
+    report = f"<QueryBudget> {stats.route}: " + "; ".join(problems)
+    if settings.QUERY_BUDGET_MODE == "raise": raise QueryBudgetExceeded(report)
+    log.warning(report)
+    return problems
@@ -0,0 +1,33 @@
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class RequestStats:
+    """
+    Database work done on behalf of one request.
+
+    The object is mutable on purpose: sync code run through the threadpool sees a copy of the
+    request context, but that copy still points at the same instance.
+    """
+    route: str = "unmatched"
+    queries: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    budget: Optional[int] = None
+    statements: Counter = field(default_factory=Counter)  # normalised statement shape -> executions
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def start_request_stats() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
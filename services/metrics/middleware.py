@@ -0,0 +1,76 @@
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.metrics.budget import QueryBudgetExceeded, check_request_queries
+from services.metrics.context import start_request_stats
+from services.metrics.registry import MetricsRegistry
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status codes and per-request database work for every HTTP route.
+
+    Routes are labelled by their path template (`/shop/stocks/{stock_id}`) so label
+    cardinality stays bounded; requests that match no route share the `unmatched` label.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry):
+        self.app = app
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "route")
+        )
+        self.in_progress = registry.gauge("http_requests_in_progress", "HTTP requests being handled.")
+        self.queries = registry.histogram(
+            "http_request_db_queries", "SQL statements executed per request.", ("route",), QUERY_BUCKETS
+        )
+        self.db_time = registry.histogram(
+            "http_request_db_seconds", "Time spent in the database per request, in seconds.", ("route",)
+        )
+        self.rows = registry.histogram(
+            "http_request_db_rows", "Rows returned by the database per request.", ("route",), ROW_BUCKETS
+        )
+        self.query_problems = registry.counter(
+            "http_request_query_problems_total", "Requests over their query budget or showing N+1 patterns.", ("route",)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http": return await self.app(scope, receive, send)
+
+        stats = start_request_stats()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start": status_code = message["status"]
+            await send(message)
+
+        self.in_progress.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            self.in_progress.dec()
+
+            route = scope.get("route")
+            stats.route = getattr(route, "path", stats.route)
+            method = scope["method"]
+            self.requests.inc(method=method, route=stats.route, status=str(status_code))
+            self.latency.observe(elapsed, method=method, route=stats.route)
+            self.queries.observe(stats.queries, route=stats.route)
+            self.db_time.observe(stats.db_time, route=stats.route)
+            self.rows.observe(stats.rows, route=stats.route)
+
+        try:
+            problems = check_request_queries(stats)
+        except QueryBudgetExceeded:
+            self.query_problems.inc(route=stats.route)
+            raise
+        if problems: self.query_problems.inc(route=stats.route)
@@ -0,0 +1,136 @@
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import Formatter, INFO, Logger, getLogger
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from typing import Any, Optional
+
+from sqlalchemy.engine import Engine
+
+from config.logger import log
+from config.settings import settings
+from services.metrics.budget import normalize_statement
+
+_APP_ROOT = os.path.abspath(str(settings.BASE_DIR)) + os.sep
+_SKIPPED_DIRS = tuple(os.path.join(_APP_ROOT, d) + os.sep for d in (os.path.join("services", "metrics"), "venv", ".venv"))
+_REPOSITORY_DIRS = (f"{os.sep}repositories{os.sep}", f"{os.sep}crud{os.sep}")
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    origin: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_parameters: str = ""
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "statement": self.statement,
+            "origin": self.origin,
+            "count": self.count,
+            "total_ms": round(self.total_time * 1000, 3),
+            "max_ms": round(self.max_time * 1000, 3),
+            "mean_ms": round(self.total_time * 1000 / self.count, 3),
+            "last_parameters": self.last_parameters,
+        }
+
+
+def find_query_origin() -> str:
+    """
+    Name the code that issued the current statement: the innermost repository method if there
+    is one on the stack, otherwise the innermost application frame.
+    """
+    frame = sys._getframe(1)
+    fallback = "unknown"
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_ROOT) and not filename.startswith(_SKIPPED_DIRS):
+            origin = f"{frame.f_globals.get('__name__', filename)}.{frame.f_code.co_qualname}:{frame.f_lineno}"
+            if any(part in filename for part in _REPOSITORY_DIRS): return origin
+            if fallback == "unknown": fallback = origin
+        frame = frame.f_back
+    return fallback
+
+
+class SlowQueryLog:
+    """
+    Collects statements slower than `SLOW_QUERY_THRESHOLD_MS`, grouped by statement shape.
+
+    A sample of slow SELECTs on PostgreSQL is re-run under `EXPLAIN (ANALYZE, BUFFERS)` on a
+    background thread, and the plan is written to `SLOW_QUERY_LOG_FILE`. Statements that change
+    data are never explained, since ANALYZE would execute them a second time.
+    """
+
+    def __init__(self):
+        self._offenders: dict[str, SlowQuery] = {}
+        self._lock = Lock()
+        self._explainer: Optional[ThreadPoolExecutor] = None
+        self._plan_logger: Optional[Logger] = None
+
+    def record(self, engine: Engine, statement: str, parameters: Any, elapsed: float, executemany: bool) -> None:
+        if elapsed * 1000 < settings.SLOW_QUERY_THRESHOLD_MS or statement.lstrip()[:7].upper() == "EXPLAIN": return
+
+        origin = find_query_origin()
+        parameters_repr = repr(parameters)[:settings.SLOW_QUERY_MAX_PARAMETERS_LENGTH]
+        shape = normalize_statement(statement)
+        with self._lock:
+            offender = self._offenders.setdefault(shape, SlowQuery(statement=shape, origin=origin))
+            offender.count += 1
+            offender.total_time += elapsed
+            offender.max_time = max(offender.max_time, elapsed)
+            offender.last_parameters = parameters_repr
+
+        log.warning(f"<SlowQuery> {elapsed * 1000:.1f}ms in {origin}: {statement} -- parameters: {parameters_repr}")
+        if self._should_explain(engine, statement, executemany):
+            self._executor().submit(self._explain, engine, statement, parameters, origin, elapsed)
+
+    def top(self, limit: int = 20) -> list[dict[str, Any]]:
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda o: o.total_time, reverse=True)[:limit]
+            return [offender.as_dict() for offender in offenders]
+
+    @staticmethod
+    def _should_explain(engine: Engine, statement: str, executemany: bool) -> bool:
+        if executemany or engine.dialect.name != "postgresql": return False
+        if statement.lstrip()[:6].upper() != "SELECT": return False
+        return random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._explainer is None:
+            self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        return self._explainer
+
+    def _plans(self) -> Logger:
+        if self._plan_logger is None:
+            os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG_FILE), exist_ok=True)
+            handler = RotatingFileHandler(
+                settings.SLOW_QUERY_LOG_FILE,
+                maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+            )
+            handler.setFormatter(Formatter("%(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+            self._plan_logger = getLogger(f"{settings.TITLE}.slow_queries")
+            self._plan_logger.setLevel(INFO)
+            self._plan_logger.propagate = False
+            self._plan_logger.addHandler(handler)
+        return self._plan_logger
+
+    def _explain(self, engine: Engine, statement: str, parameters: Any, origin: str, elapsed: float) -> None:
+        try:
+            with engine.connect() as connection:
+                rows = connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).fetchall()
+                connection.rollback()
+        except Exception as e:
+            log.error(f"<SlowQuery> EXPLAIN failed for statement from {origin}: {e}")
+            return
+
+        plan = "\n".join(row[0] for row in rows)
+        self._plans().info(f"{elapsed * 1000:.1f}ms in {origin}\n{statement}\n-- parameters: {parameters!r}\n{plan}\n")
+
+
+slow_query_log = SlowQueryLog()
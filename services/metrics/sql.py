@@ -0,0 +1,57 @@
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.metrics.budget import normalize_statement
+from services.metrics.context import current_request_stats
+from services.metrics.registry import MetricsRegistry
+from services.metrics.slow_queries import slow_query_log
+
+
+def instrument_engine(engine: Engine, registry: MetricsRegistry, pool: str = "default") -> None:
+    """
+    Time every statement run on `engine` and attribute it to the current request, if any.
+    Metrics are labelled with the `pool` the engine serves.
+
+    Rows are taken from the DBAPI `rowcount`; drivers that report -1 for SELECT (sqlite)
+    count as zero rows.
+    """
+    queries = registry.counter("db_queries_total", "SQL statements executed.", ("pool",))
+    duration = registry.histogram(
+        "db_query_duration_seconds", "SQL statement execution time in seconds.", ("pool",),
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+    )
+    checked_out = registry.gauge("db_pool_checked_out", "Connections in use, by pool.", ("pool",))
+
+    @event.listens_for(engine, "checkout")
+    def count_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any):
+        checked_out.inc(pool=pool)
+
+    @event.listens_for(engine, "checkin")
+    def count_checkin(dbapi_connection: Any, connection_record: Any):
+        checked_out.dec(pool=pool)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+        conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+        elapsed = perf_counter() - conn.info["query_start_time"].pop()
+        queries.inc(pool=pool)
+        duration.observe(elapsed, pool=pool)
+        slow_query_log.record(conn.engine, statement, parameters, elapsed, executemany)
+
+        stats = current_request_stats()
+        if stats is None: return
+        stats.queries += 1
+        stats.db_time += elapsed
+        stats.rows += max(cursor.rowcount or 0, 0)
+        stats.statements[normalize_statement(statement)] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def discard_query_timer(exception_context: Any):
+        timers = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+        if timers: timers.pop()
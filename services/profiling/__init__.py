@@ -0,0 +1,2 @@
+from services.profiling.middleware import ProfilerMiddleware, profile_path
+from services.profiling.sampler import SamplingProfiler
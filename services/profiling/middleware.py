@@ -0,0 +1,88 @@
+import os
+import threading
+from urllib.parse import parse_qs
+from uuid import uuid4
+
+import pendulum
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.logger import log
+from config.settings import settings
+from db.session import AuthSessionLocal
+from domains.auth.services.user import user_service
+from domains.auth.utils.get_current_user import get_current_user
+from services.profiling.sampler import SamplingProfiler
+from utils.seeds.create_superuser import SuperAdminRoleInfo
+
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+class ProfilerMiddleware:
+    """
+    Profiles a single request when it carries `X-Profile: 1` (or `?profile=1`) and the caller
+    is a SuperAdmin.
+
+    The folded-stack profile is written to `PROFILE_DIR` and its id returned in the
+    `X-Profile-Id` response header. Requests without the flag only pay for the header lookup.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = settings.PROFILE_HEADER.lower().encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_requested(scope) or not await self._is_super_admin(scope):
+            return await self.app(scope, receive, send)
+
+        profile_id = f"{pendulum.now().format('YYYYMMDDHHmmss')}-{uuid4().hex[:8]}"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(
+            target_thread_id=threading.get_ident(), interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        ).start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            await run_in_threadpool(save_profile, profile_id, scope, profiler)
+
+    def _is_requested(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self.header: return value.decode().lower() in TRUTHY
+        if b"profile" not in scope["query_string"]: return False
+        values = parse_qs(scope["query_string"].decode()).get("profile", [])
+        return bool(values) and values[-1].lower() in TRUTHY
+
+    @staticmethod
+    async def _is_super_admin(scope: Scope) -> bool:
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode()
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token: return False
+
+        with AuthSessionLocal() as db:
+            try:
+                user = await get_current_user(token=token, db=db)
+            except HTTPException:
+                return False
+            roles = await user_service.get_roles(db=db, user_id=user.id)
+        return any(role.title == SuperAdminRoleInfo.title for role in roles)
+
+
+def profile_path(profile_id: str) -> str:
+    return os.path.join(settings.PROFILE_DIR, f"{os.path.basename(profile_id)}.folded")
+
+
+def save_profile(profile_id: str, scope: Scope, profiler: SamplingProfiler) -> None:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w") as file:
+        file.write(profiler.folded())
+    log.info(
+        f"<Profiler> {scope['method']} {scope['path']} -> {profile_id} "
+        f"({profiler.samples} samples every {settings.PROFILE_SAMPLE_INTERVAL_MS}ms)"
+    )
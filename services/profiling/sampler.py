@@ -0,0 +1,62 @@
+import sys
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Optional
+
+from config.settings import settings
+
+_APP_ROOT = str(settings.BASE_DIR)
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of running threads at a fixed interval and counts them in folded form
+    (`thread;outer;...;inner count`), the input format of flamegraph.pl and speedscope.
+
+    The request's own thread is always sampled. Other threads are only sampled while they run
+    application code, which picks up threadpool work without every idle worker's stack.
+    """
+
+    def __init__(self, target_thread_id: int, interval: float):
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._labels: dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None: self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id: continue
+                stack = self._fold(frame)
+                if thread_id != self.target_thread_id and _APP_ROOT not in stack: continue
+                self.stacks[f"{names.get(thread_id, thread_id)};{stack}"] += 1
+            self.samples += 1
+
+    def _fold(self, frame: Optional[FrameType]) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
@@ -0,0 +1,2 @@
+from services.scheduler.scheduler import Job, LeaderElection, Scheduler
+from services.scheduler.triggers import CronTrigger, IntervalTrigger, Trigger
@@ -0,0 +1,145 @@
+import asyncio
+import zlib
+from contextlib import suppress
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Awaitable, Callable, Optional
+
+import pendulum
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from config.logger import log
+from services.metrics import MetricsRegistry
+from services.scheduler.triggers import Trigger
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable[None]]
+    trigger: Trigger
+    # leader-only jobs run on one worker; the rest (e.g. refreshing a per-process cache) run on every worker
+    leader_only: bool = True
+    run_at_startup: bool = False
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class LeaderElection:
+    """
+    Picks one worker to run leader-only jobs by holding a session-level Postgres advisory lock
+    on a dedicated connection. If the leader dies its connection closes, the lock is released
+    and the next worker to ask takes over. Other databases have no shared lock, so every
+    process is its own leader there (fine for the single-worker SQLite setup).
+    """
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.key = zlib.crc32(name.encode())
+        self.connection: Optional[Connection] = None
+
+    def is_leader(self) -> bool:
+        if self.engine.dialect.name != "postgresql": return True
+        if self.connection is not None:
+            try:
+                self.connection.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                log.warning("<Scheduler> lost the leader connection")
+                self.release()
+        try:
+            connection = self.engine.connect()
+            if connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar():
+                # end the implicit transaction; the advisory lock belongs to the session and outlives it
+                connection.commit()
+                self.connection = connection
+                log.info("<Scheduler> elected leader")
+                return True
+            connection.close()
+        except Exception:
+            log.exception("<Scheduler> leader election failed")
+        return False
+
+    def release(self) -> None:
+        if self.connection is None: return
+        with suppress(Exception):
+            self.connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self.connection.commit()
+        with suppress(Exception):
+            self.connection.close()
+        self.connection = None
+
+
+class Scheduler:
+    """
+    Runs registered coroutines on interval or cron triggers inside the application's event loop.
+
+    Each job has its own task and never overlaps itself: the next run is scheduled once the
+    current one finishes. Jobs share the loop with requests, so they should be the same kind
+    of short database work a request does; long batches belong in a management command.
+    """
+
+    def __init__(self, engine: Engine, registry: MetricsRegistry, timezone: str = "UTC", name: str = "scheduler"):
+        self.timezone = timezone
+        self.jobs: dict[str, Job] = {}
+        self.election = LeaderElection(engine, name)
+        self.runs = registry.counter(
+            "scheduler_job_runs_total", "Scheduled job runs by outcome.", ("job", "status")
+        )
+        self.duration = registry.histogram(
+            "scheduler_job_duration_seconds", "Scheduled job run time.", ("job",)
+        )
+        self.last_success = registry.gauge(
+            "scheduler_job_last_success_timestamp_seconds", "Unix time of each job's last successful run.", ("job",)
+        )
+        self.leader = registry.gauge("scheduler_leader", "1 while this worker runs the leader-only jobs.")
+
+    def add_job(
+            self, name: str, func: Callable[[], Awaitable[None]], trigger: Trigger, *,
+            leader_only: bool = True, run_at_startup: bool = False,
+    ) -> Job:
+        if name in self.jobs: raise ValueError(f"Job {name!r} is already scheduled")
+        job = self.jobs[name] = Job(name, func, trigger, leader_only=leader_only, run_at_startup=run_at_startup)
+        return job
+
+    async def start(self) -> None:
+        for job in self.jobs.values():
+            if job.run_at_startup: await self.run_job(job)
+            job.task = asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}")
+        log.info(f"<Scheduler> started {len(self.jobs)} jobs")
+
+    async def stop(self) -> None:
+        tasks = [job.task for job in self.jobs.values() if job.task]
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values(): job.task = None
+        self.election.release()
+        self.leader.set(0)
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            now = pendulum.now(self.timezone)
+            await asyncio.sleep(max((job.trigger.next_run(now) - now).total_seconds(), 0))
+            await self.run_job(job)
+
+    async def run_job(self, job: Job) -> None:
+        if job.leader_only:
+            is_leader = self.election.is_leader()
+            self.leader.set(1 if is_leader else 0)
+            if not is_leader:
+                self.runs.inc(job=job.name, status="skipped")
+                return
+
+        start = perf_counter()
+        try:
+            await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.runs.inc(job=job.name, status="error")
+            log.exception(f"<Scheduler> job {job.name} failed")
+        else:
+            self.runs.inc(job=job.name, status="success")
+            self.last_success.set(pendulum.now().timestamp(), job=job.name)
+        finally:
+            self.duration.observe(perf_counter() - start, job=job.name)
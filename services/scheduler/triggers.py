@@ -0,0 +1,83 @@
+import random
+from datetime import datetime, timedelta
+from typing import Protocol
+
+
+class Trigger(Protocol):
+    def next_run(self, now: datetime) -> datetime: ...
+
+
+class IntervalTrigger:
+    """
+    Fires every `seconds`, delayed by up to `jitter` seconds so workers started together drift apart.
+    """
+
+    def __init__(self, seconds: float, jitter: float = 0.0):
+        if seconds <= 0: raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.jitter = jitter
+
+    def next_run(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.seconds + random.uniform(0, self.jitter))
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds}s"
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset[int]:
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(bound) for bound in part.split("-", 1))
+        else:
+            start = end = int(part)
+            if step: end = high
+        if not low <= start <= end <= high: raise ValueError(f"Cron field {field!r} is out of range {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+class CronTrigger:
+    """
+    Standard five-field cron expression (minute hour day-of-month month day-of-week), evaluated
+    in the timezone of the `now` it is given. Day-of-week runs 0-6 from Sunday; 7 is also Sunday.
+    As in cron, a restricted day-of-month and day-of-week match when either does.
+    """
+
+    def __init__(self, expression: str, jitter: float = 0.0):
+        fields = expression.split()
+        if len(fields) != 5: raise ValueError(f"Cron expression {expression!r} needs five fields")
+        self.expression = expression
+        self.jitter = jitter
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = frozenset(day % 7 for day in _parse_field(fields[4], 0, 7))
+        self.any_day, self.any_weekday = fields[2] == "*", fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday: return day and weekday
+        return day or weekday
+
+    def next_run(self, now: datetime) -> datetime:
+        moment = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)  # covers Feb 29th
+        while moment < limit:
+            if moment.month not in self.months or not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment + timedelta(seconds=random.uniform(0, self.jitter))
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def __repr__(self) -> str:
+        return f"cron {self.expression!r}"
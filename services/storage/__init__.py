@@ -1,16 +1,24 @@
+import mimetypes
 import os
+from typing import Optional
 
 import pendulum
-from fastapi import UploadFile
-from fastapi.responses import FileResponse
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 from config.logger import log
+from config.settings import settings
 from services.storage.abstract_client import ClientInterface
+from services.storage.content_addressed_client import ContentAddressedClient
 from services.storage.local_client import LocalClient
 from utils.enum import BaseEnum
 
 
 def get_client() -> ClientInterface:
+    if settings.STORAGE_BACKEND == ContentAddressedClient.client_name: return ContentAddressedClient()
+    if settings.STORAGE_BACKEND == "s3":
+        from services.storage.s3_client import S3Client
+        return S3Client()
     return LocalClient()
 
 
@@ -49,6 +57,36 @@ class Helper:
     async def get(self, path) -> FileResponse | bytes:
         return await self.client.get(path)
 
+    async def response(self, path: str, range_header: Optional[str] = None) -> Response:
+        """
+        Serve a stored file, honouring a single-range `Range` header.
+        Local files are handed to FileResponse, which handles ranges and sendfile itself.
+        """
+        if isinstance(self.client, LocalClient): return await self.client.get(path)
+
+        size = await self.client.size(path)
+        filename = path.split("/")[-1]
+        headers = {"Accept-Ranges": "bytes", "Content-Disposition": f'attachment; filename="{filename}"'}
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        byte_range = await self._parse_range(range_header, size)
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(await self.client.stream(path), headers=headers, media_type=media_type)
+
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            await self.client.stream(path, start=start, end=end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    async def stream(self, path: str, start: int = 0, end: Optional[int] = None):
+        return await self.client.stream(path, start=start, end=end)
+
     async def rename(self, path: str, new_name: str) -> str:
         return await self.client.rename(path, new_name)
 
@@ -58,8 +96,8 @@ class Helper:
     async def delete(self, path: str):
         return await self.client.delete(path=path)
 
-    async def get_bytes(self, path) -> bytes:
-        return await self.client.get(path=path)
+    async def get_bytes(self, path, start: int = 0, end: Optional[int] = None) -> bytes:
+        return await self.client.get(path=path, raw=True, start=start, end=end)
 
     @staticmethod
     async def _clean_path(path: str, trailing_slash=True) -> str | None:
@@ -73,16 +111,40 @@ class Helper:
             cleaned_path += '/'
         return cleaned_path
 
+    @staticmethod
+    async def _parse_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+        """
+        Parse a single `bytes=` range into inclusive (start, end) offsets.
+        Multi-range or malformed headers return None so the whole file is served.
+        """
+        if not range_header or not range_header.startswith("bytes=") or "," in range_header: return None
+
+        first, _, last = range_header[len("bytes="):].strip().partition("-")
+        try:
+            if first:
+                start, end = int(first), int(last) if last else size - 1
+            else:
+                start, end = max(size - int(last), 0), size - 1
+        except ValueError:
+            return None
+
+        if start >= size or start > end or (not first and not int(last)): raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+        return start, min(end, size - 1)
+
     @staticmethod
     async def get_mime(file: UploadFile) -> str:
         """
         Accepts a file as bytes, BinaryIO (e.g., file-like object), or UploadFile.
-        Tries to guess the file mimetype.
+        Tries to guess the file mimetype from the first UPLOAD_MIME_SNIFF_SIZE bytes.
         """
         import filetype
 
         await file.seek(0)
-        content = await file.read()
+        head = await file.read(settings.UPLOAD_MIME_SNIFF_SIZE)
         await file.seek(0)
 
-        return filetype.guess_mime(content)
+        return filetype.guess_mime(head)
@@ -1,17 +1,38 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
 
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
+from starlette import status
 from starlette.responses import FileResponse
 
+from config.settings import settings
+
 
 class ClientInterface(ABC):
     client_name = "abstract"
 
     @classmethod
     @abstractmethod
-    async def get(cls, path) -> FileResponse | bytes:
+    async def get(cls, path, raw: bool = False, start: int = 0, end: Optional[int] = None) -> FileResponse | bytes:
         """
         Retrieve a file given its filepath.
+        With raw=True return the bytes between start and end (inclusive) instead of a response.
+        """
+        raise NotImplementedError("Method not implemented")
+
+    @classmethod
+    async def size(cls, path) -> int:
+        """
+        Return the size of a file in bytes.
+        """
+        raise NotImplementedError("Method not implemented")
+
+    @classmethod
+    async def stream(
+            cls, path, start: int = 0, end: Optional[int] = None, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Return an async iterator over the bytes between start and end (inclusive), chunk by chunk.
         """
         raise NotImplementedError("Method not implemented")
 
@@ -53,3 +74,17 @@ class ClientInterface(ABC):
         Change a file name.
         """
         raise NotImplementedError("Method not implemented")
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        Release any pooled connections held by the client.
+        """
+        return None
+
+    @staticmethod
+    async def _file_too_large() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the maximum upload size of {settings.UPLOAD_MAX_SIZE} bytes",
+        )
@@ -0,0 +1,142 @@
+import hashlib
+import os
+from contextlib import contextmanager
+from typing import Iterator, TextIO
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from config.logger import log
+from config.settings import settings
+from services.storage.local_client import LocalClient
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - windows development machines
+    fcntl = None
+
+
+class ContentAddressedClient(LocalClient):
+    """
+    Stores every upload once, under the sha256 digest of its content.
+
+    Blobs live at `<UPLOAD_ROOT>/blobs/ab/cd/<digest><ext>` next to a `.refs` file holding
+    a reference count. Uploading identical content returns the existing path and bumps the
+    count; deleting decrements it and only removes the blob when nothing references it.
+    """
+    client_name = "content_addressed"
+
+    @classmethod
+    async def upload(cls, file: UploadFile, filename: str) -> str:
+        if file.size is not None and file.size > settings.UPLOAD_MAX_SIZE:
+            raise await cls._file_too_large()
+
+        temp_dir = os.path.join(cls._blob_root(), "tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        temp_path = os.path.join(temp_dir, uuid4().hex)
+
+        digest = hashlib.sha256()
+        written = await run_in_threadpool(cls._copy_in_chunks, file.file, temp_path, digest)
+        if written is None: raise await cls._file_too_large()
+
+        blob_path = cls._blob_path(digest.hexdigest(), os.path.splitext(filename)[-1])
+        await run_in_threadpool(cls._commit_blob, temp_path, blob_path)
+        return blob_path.replace("\\", "/")
+
+    @classmethod
+    async def delete(cls, path: str) -> None:
+        if not cls._is_blob(path): return await super().delete(path)
+        if os.path.exists(path): await run_in_threadpool(cls._release_blob, path)
+
+    @classmethod
+    async def copy(cls, src: str, dest: str) -> str:
+        """
+        Copies of a blob share its storage; only the reference count changes.
+        """
+        if not cls._is_blob(src): return await super().copy(src, dest)
+        if not os.path.exists(src): raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Source file not found: {src}"
+        )
+        await run_in_threadpool(cls._adjust_refs, src, 1)
+        return src
+
+    @classmethod
+    async def move(cls, src: str, dest: str) -> str:
+        """
+        Blob paths are derived from content, so moving one is a no-op.
+        """
+        if not cls._is_blob(src): return await super().move(src, dest)
+        return src
+
+    @classmethod
+    async def rename(cls, path: str, new_name: str) -> str:
+        """
+        Blob names are their digest, so renaming one is a no-op.
+        """
+        if not cls._is_blob(path): return await super().rename(path, new_name)
+        return path
+
+    @classmethod
+    def digest(cls, path: str) -> str:
+        """
+        Return the content digest of a blob path, usable as a cache key for derived artifacts.
+        """
+        return os.path.splitext(os.path.basename(path))[0]
+
+    @classmethod
+    def _commit_blob(cls, temp_path: str, blob_path: str) -> None:
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with cls._locked_refs(blob_path) as refs:
+            count = int(refs.read() or 0)
+            if count and os.path.exists(blob_path):
+                os.remove(temp_path)
+                log.debug(f"<ContentAddressedClient> deduplicated upload into {blob_path}")
+            else:
+                os.replace(temp_path, blob_path)
+                count = 0
+            cls._write_refs(refs, count + 1)
+
+    @classmethod
+    def _release_blob(cls, blob_path: str) -> None:
+        with cls._locked_refs(blob_path) as refs:
+            count = max(int(refs.read() or 0) - 1, 0)
+            # keep the (tiny) refs file so a concurrent upload of the same content sees a consistent count
+            cls._write_refs(refs, count)
+            if not count and os.path.exists(blob_path): os.remove(blob_path)
+
+    @classmethod
+    def _adjust_refs(cls, blob_path: str, delta: int) -> None:
+        with cls._locked_refs(blob_path) as refs:
+            cls._write_refs(refs, max(int(refs.read() or 0) + delta, 0))
+
+    @staticmethod
+    @contextmanager
+    def _locked_refs(blob_path: str) -> Iterator[TextIO]:
+        fd = os.open(f"{blob_path}.refs", os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+") as refs:
+            if fcntl: fcntl.flock(refs.fileno(), fcntl.LOCK_EX)
+            try:
+                yield refs
+            finally:
+                if fcntl: fcntl.flock(refs.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_refs(refs: TextIO, count: int) -> None:
+        refs.seek(0)
+        refs.truncate()
+        refs.write(str(count))
+        refs.flush()
+
+    @staticmethod
+    def _blob_root() -> str:
+        return os.path.join(settings.UPLOAD_ROOT, "blobs")
+
+    @classmethod
+    def _blob_path(cls, digest: str, extension: str) -> str:
+        return os.path.join(cls._blob_root(), digest[:2], digest[2:4], f"{digest}{extension.lower()}")
+
+    @classmethod
+    def _is_blob(cls, path: str) -> bool:
+        return os.path.abspath(path).startswith(os.path.abspath(cls._blob_root()) + os.sep)
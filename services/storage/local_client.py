@@ -1,9 +1,12 @@
+import mmap
 import os
 from shutil import copyfile, move
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Optional
 
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import FileResponse
 from starlette import status
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from config.logger import log
 from config.settings import settings
@@ -15,21 +18,38 @@ class LocalClient(ClientInterface):
     client_name = "local"
 
     @classmethod
-    async def get(cls, path, raw: bool = False) -> FileResponse | bytes:
+    async def get(cls, path, raw: bool = False, start: int = 0, end: Optional[int] = None) -> FileResponse | bytes:
         if not os.path.exists(path):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"File not found")
         if not raw:
+            # FileResponse answers Range requests and uses sendfile/pathsend when the server supports it
             return FileResponse(str(path), filename=path.split("/")[-1])
-        with open(path, "rb") as f:
-            file = f.read()
-        return file
+        return await run_in_threadpool(cls._read_range, path, start, end)
+
+    @classmethod
+    async def size(cls, path) -> int:
+        if not os.path.exists(path):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"File not found")
+        return os.path.getsize(path)
+
+    @classmethod
+    async def stream(
+            cls, path, start: int = 0, end: Optional[int] = None, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        if not os.path.exists(path):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"File not found")
+        chunks = cls._iter_range(path, start, end, chunk_size or settings.STORAGE_STREAM_CHUNK_SIZE)
+        return iterate_in_threadpool(chunks)
 
     @classmethod
     async def upload(cls, file: UploadFile, filename: str) -> str:
+        if file.size is not None and file.size > settings.UPLOAD_MAX_SIZE:
+            raise await cls._file_too_large()
+
         file_location = os.path.join(settings.UPLOAD_ROOT, filename)
         os.makedirs(os.path.dirname(file_location), exist_ok=True)
-        with open(file_location, "wb") as file_object:
-            file_object.write(file.file.read())
+        written = await run_in_threadpool(cls._copy_in_chunks, file.file, file_location)
+        if written is None: raise await cls._file_too_large()
         # file_location = cls._append_domain_name(file_location)
         file_location = file_location.replace("\\", "/")
         return file_location
@@ -113,6 +133,53 @@ class LocalClient(ClientInterface):
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Source file not found"
             )
 
+    @staticmethod
+    def _read_range(path: str, start: int, end: Optional[int]) -> bytes:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size: return b""
+            end = size - 1 if end is None else min(end, size - 1)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[start:end + 1]
+
+    @staticmethod
+    def _iter_range(path: str, start: int, end: Optional[int], chunk_size: int) -> Iterator[bytes]:
+        """
+        Yield the requested byte range from a memory map, so only the touched pages are read.
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size: return
+            end = size - 1 if end is None else min(end, size - 1)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(start, end + 1, chunk_size):
+                    yield mapped[offset:min(offset + chunk_size, end + 1)]
+
+    @staticmethod
+    def _copy_in_chunks(source: BinaryIO, destination: str, digest: Any = None) -> int | None:
+        """
+        Copy the upload to disk in UPLOAD_CHUNK_SIZE pieces so memory stays bounded,
+        feeding each chunk to `digest` (a hashlib object) when one is given.
+        Runs on a worker thread. Returns the number of bytes written, or None (and
+        removes the partial file) when the upload exceeds UPLOAD_MAX_SIZE.
+        """
+        written = 0
+        try:
+            with open(destination, "wb") as file_object:
+                while chunk := source.read(settings.UPLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > settings.UPLOAD_MAX_SIZE: break
+                    if digest is not None: digest.update(chunk)
+                    file_object.write(chunk)
+        except:
+            if os.path.exists(destination): os.remove(destination)
+            raise
+
+        if written > settings.UPLOAD_MAX_SIZE:
+            os.remove(destination)
+            return None
+        return written
+
     @staticmethod
     async def _strip_domain_name(path: str) -> str:
         path = path.replace(f"{settings.APP_DOMAIN}/", "")
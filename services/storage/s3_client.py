@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import hmac
+import mimetypes
+import os
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Optional
+from urllib.parse import quote, urlencode
+from xml.etree import ElementTree
+
+import httpx
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from config.logger import log
+from config.settings import settings
+from services.storage.abstract_client import ClientInterface
+from utils.exceptions.exc_500 import http_500_exc_internal_server_error
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+PATH_PREFIX = "S3:"
+
+
+class S3Client(ClientInterface):
+    """
+    Client for any S3-compatible object store (AWS, MinIO, moto server).
+
+    Uses path-style addressing against AWS_S3_ENDPOINT_URL and a single pooled
+    `httpx.AsyncClient`. Large uploads go through concurrent multipart upload and
+    reads are fetched as parallel ranged GETs, both bounded by AWS_S3_MAX_CONCURRENCY.
+    Stored paths are returned as `S3:<key>`, the prefix `utils.query_check.File` expects.
+    """
+    client_name = "s3"
+    _http: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    async def get(cls, path, raw: bool = False, start: int = 0, end: Optional[int] = None):
+        if not raw:
+            filename = cls._key(path).split("/")[-1]
+            return StreamingResponse(
+                await cls.stream(path, start=start, end=end),
+                media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
+        return b"".join([chunk async for chunk in await cls.stream(path, start=start, end=end)])
+
+    @classmethod
+    async def size(cls, path) -> int:
+        response = await cls._request("HEAD", cls._key(path))
+        return int(response.headers.get("content-length", 0))
+
+    @classmethod
+    async def stream(
+            cls, path, start: int = 0, end: Optional[int] = None, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        key = cls._key(path)
+        size = await cls.size(path)
+        end = size - 1 if end is None else min(end, size - 1)
+        chunk_size = chunk_size or settings.AWS_S3_PART_SIZE
+        ranges = [(offset, min(offset + chunk_size - 1, end)) for offset in range(start, end + 1, chunk_size)]
+        return cls._fetch_in_order(key, ranges)
+
+    @classmethod
+    async def upload(cls, file: UploadFile, filename: str) -> str:
+        if file.size is not None and file.size > settings.UPLOAD_MAX_SIZE:
+            raise await cls._file_too_large()
+
+        key = cls._key(filename)
+        first_part = await run_in_threadpool(file.file.read, settings.AWS_S3_PART_SIZE)
+        if len(first_part) < settings.AWS_S3_PART_SIZE:
+            await cls._request("PUT", key, content=first_part, unsigned=True)
+            return cls._path(key)
+
+        upload_id = await cls._create_multipart_upload(key)
+        try:
+            etags = await cls._upload_parts(key, upload_id, file.file, first_part)
+            await cls._complete_multipart_upload(key, upload_id, etags)
+        except BaseException:
+            await cls._abort_multipart_upload(key, upload_id)
+            raise
+        return cls._path(key)
+
+    @classmethod
+    async def delete(cls, path: str) -> None:
+        try:
+            await cls._request("DELETE", cls._key(path))
+        except HTTPException as e:
+            if e.status_code != status.HTTP_404_NOT_FOUND: raise
+
+    @classmethod
+    async def copy(cls, src: str, dest: str) -> str:
+        src_key = cls._key(src)
+        dest_key = "/".join(part for part in [dest.strip("/"), src_key.split("/")[-1]] if part)
+        await cls._request("PUT", dest_key, headers={
+            "x-amz-copy-source": quote(f"/{settings.AWS_S3_BUCKET}/{src_key}", safe="/-_.~"),
+        })
+        return cls._path(dest_key)
+
+    @classmethod
+    async def move(cls, src: str, dest: str) -> str:
+        new_path = await cls.copy(src, dest)
+        await cls.delete(src)
+        return new_path
+
+    @classmethod
+    async def rename(cls, path: str, new_name: str) -> str:
+        key = cls._key(path)
+        directory, filename = os.path.split(key)
+        new_key = "/".join(part for part in [directory, new_name + os.path.splitext(filename)[-1]] if part)
+        await cls._request("PUT", new_key, headers={
+            "x-amz-copy-source": quote(f"/{settings.AWS_S3_BUCKET}/{key}", safe="/-_.~"),
+        })
+        await cls.delete(path)
+        return cls._path(new_key)
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._http is not None:
+            await cls._http.aclose()
+            cls._http = None
+
+    @classmethod
+    async def _fetch_in_order(cls, key: str, ranges: list[tuple[int, int]]) -> AsyncIterator[bytes]:
+        """
+        Fetch ranges concurrently, at most AWS_S3_MAX_CONCURRENCY ahead, yielding them in order.
+        """
+        remaining = iter(ranges)
+        pending = deque(
+            asyncio.create_task(cls._get_range(key, start, end))
+            for start, end in islice(remaining, settings.AWS_S3_MAX_CONCURRENCY)
+        )
+        try:
+            while pending:
+                chunk = await pending.popleft()
+                if (next_range := next(remaining, None)) is not None:
+                    pending.append(asyncio.create_task(cls._get_range(key, *next_range)))
+                yield chunk
+        finally:
+            for task in pending: task.cancel()
+
+    @classmethod
+    async def _get_range(cls, key: str, start: int, end: int) -> bytes:
+        response = await cls._request("GET", key, headers={"range": f"bytes={start}-{end}"})
+        return response.content
+
+    @classmethod
+    async def _create_multipart_upload(cls, key: str) -> str:
+        response = await cls._request("POST", key, params={"uploads": ""})
+        return ElementTree.fromstring(response.content).findtext("{*}UploadId")
+
+    @classmethod
+    async def _upload_parts(cls, key: str, upload_id: str, source: BinaryIO, first_part: bytes) -> list[str]:
+        """
+        Upload parts concurrently. The semaphore also caps how many parts are held in memory.
+        """
+        slots = asyncio.Semaphore(settings.AWS_S3_MAX_CONCURRENCY)
+        tasks: list[asyncio.Task] = []
+
+        async def send(part_number: int, body: bytes) -> str:
+            try:
+                response = await cls._request(
+                    "PUT", key, params={"partNumber": str(part_number), "uploadId": upload_id},
+                    content=body, unsigned=True,
+                )
+                return response.headers["etag"]
+            finally:
+                slots.release()
+
+        body, part_number, total = first_part, 1, 0
+        try:
+            while body:
+                total += len(body)
+                if total > settings.UPLOAD_MAX_SIZE: raise await cls._file_too_large()
+
+                await slots.acquire()
+                if failed := next((t for t in tasks if t.done() and t.exception()), None): raise failed.exception()
+
+                tasks.append(asyncio.create_task(send(part_number, body)))
+                part_number += 1
+                body = await run_in_threadpool(source.read, settings.AWS_S3_PART_SIZE)
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks: task.cancel()
+            raise
+
+    @classmethod
+    async def _complete_multipart_upload(cls, key: str, upload_id: str, etags: list[str]) -> None:
+        parts = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in enumerate(etags, start=1)
+        )
+        body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode()
+        response = await cls._request("POST", key, params={"uploadId": upload_id}, content=body)
+        # S3 can report a failed completion with a 200 status and an <Error> body
+        if b"<Error>" in response.content:
+            log.error(f"Failed to complete multipart upload for {key}: {response.text}")
+            raise await http_500_exc_internal_server_error()
+
+    @classmethod
+    async def _abort_multipart_upload(cls, key: str, upload_id: str) -> None:
+        try:
+            await cls._request("DELETE", key, params={"uploadId": upload_id})
+        except:
+            log.exception(f"Failed to abort multipart upload {upload_id} for {key}")
+
+    @classmethod
+    async def _request(
+            cls, method: str, key: str, *,
+            params: Optional[dict[str, str]] = None,
+            headers: Optional[dict[str, str]] = None,
+            content: bytes = b"",
+            unsigned: bool = False,
+    ) -> httpx.Response:
+        url = f"{settings.AWS_S3_ENDPOINT_URL.rstrip('/')}/{settings.AWS_S3_BUCKET}/{quote(key, safe='/-_.~')}"
+        if params: url += "?" + urlencode(sorted(params.items()), quote_via=quote, safe="-_.~")
+
+        payload_hash = UNSIGNED_PAYLOAD if unsigned else hashlib.sha256(content).hexdigest()
+        signed_headers = cls._sign(method, url, headers or {}, payload_hash)
+        try:
+            response = await cls._client().request(method, url, headers=signed_headers, content=content)
+        except httpx.HTTPError:
+            log.exception(f"S3 {method} {key} failed")
+            raise await http_500_exc_internal_server_error()
+
+        if response.status_code == status.HTTP_404_NOT_FOUND:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+        if response.status_code >= status.HTTP_400_BAD_REQUEST:
+            log.error(f"S3 {method} {key} returned {response.status_code}: {response.text}")
+            raise await http_500_exc_internal_server_error()
+        return response
+
+    @classmethod
+    def _client(cls) -> httpx.AsyncClient:
+        if cls._http is None:
+            cls._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.AWS_S3_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.AWS_S3_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AWS_S3_MAX_CONNECTIONS,
+                ),
+            )
+        return cls._http
+
+    @staticmethod
+    def _sign(method: str, url: str, headers: dict[str, str], payload_hash: str) -> dict[str, str]:
+        """
+        Sign a request with AWS Signature Version 4.
+        """
+        parsed = httpx.URL(url)
+        now = datetime.now(timezone.utc)
+        amz_date, date_stamp = now.strftime("%Y%m%dT%H%M%SZ"), now.strftime("%Y%m%d")
+
+        headers = {k.lower(): str(v).strip() for k, v in headers.items()}
+        headers.update({
+            "host": parsed.netloc.decode(),
+            "x-amz-date": amz_date,
+            "x-amz-content-sha256": payload_hash,
+        })
+        signed_header_names = ";".join(sorted(headers))
+        canonical_headers = "".join(f"{name}:{headers[name]}\n" for name in sorted(headers))
+        canonical_query = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(parsed.params.multi_items())
+        )
+        canonical_request = "\n".join([
+            method, parsed.raw_path.split(b"?")[0].decode(), canonical_query,
+            canonical_headers, signed_header_names, payload_hash,
+        ])
+
+        scope = f"{date_stamp}/{settings.AWS_S3_REGION}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+
+        signing_key = f"AWS4{settings.AWS_SECRET_ACCESS_KEY}".encode()
+        for part in (date_stamp, settings.AWS_S3_REGION, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={settings.AWS_ACCESS_KEY_ID}/{scope}, "
+            f"SignedHeaders={signed_header_names}, Signature={signature}"
+        )
+        return headers
+
+    @staticmethod
+    def _key(path: str) -> str:
+        path = path.replace("\\", "/")
+        if path.startswith(PATH_PREFIX): path = path[len(PATH_PREFIX):]
+        if settings.AWS_S3_CUSTOM_DOMAIN and path.startswith(settings.AWS_S3_CUSTOM_DOMAIN):
+            path = path[len(settings.AWS_S3_CUSTOM_DOMAIN):]
+        return path.lstrip("/")
+
+    @staticmethod
+    def _path(key: str) -> str:
+        return f"{PATH_PREFIX}{key}"
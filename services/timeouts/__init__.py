@@ -0,0 +1,4 @@
+from services.timeouts.budget import statement_timeout
+from services.timeouts.context import RequestDeadline, current_request_deadline
+from services.timeouts.middleware import TimeoutMiddleware
+from services.timeouts.watchdog import QueryWatchdog, RequestDeadlineExceeded, instrument_timeouts, query_watchdog
@@ -0,0 +1,18 @@
+from typing import Callable
+
+from services.timeouts.context import current_request_deadline
+
+
+def statement_timeout(seconds: float) -> Callable[[], None]:
+    """
+    Route dependency giving a request `seconds` of database time, counted from its start,
+    instead of the default `REQUEST_TIMEOUT_SECONDS`.
+
+        @router.get("", dependencies=[Depends(statement_timeout(30))])
+    """
+
+    async def declare_statement_timeout() -> None:
+        deadline = current_request_deadline()
+        if deadline is not None: deadline.deadline = deadline.started_at + seconds
+
+    return declare_statement_timeout
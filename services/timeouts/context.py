@@ -0,0 +1,48 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import monotonic
+from typing import Optional
+
+
+@dataclass
+class RequestDeadline:
+    """
+    Time budget of one request's database work.
+
+    Mutable for the same reason as `RequestStats`: sync code run through the threadpool sees
+    a copy of the request context that still points at the same instance.
+
+    Once the request's writes have committed the budget no longer applies: failing what is left
+    (reading back the result) would turn a done deal into an error the client retries.
+    """
+    started_at: float
+    deadline: float
+    timed_out: bool = False
+    disconnected: bool = False
+    committed: bool = False
+
+    @property
+    def remaining(self) -> float:
+        return self.deadline - monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return not self.committed and (self.timed_out or self.disconnected or self.remaining <= 0)
+
+
+_request_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_request_deadline() -> Optional[RequestDeadline]:
+    return _request_deadline.get()
+
+
+def start_request_deadline(timeout: float) -> RequestDeadline:
+    now = monotonic()
+    deadline = RequestDeadline(started_at=now, deadline=now + timeout)
+    _request_deadline.set(deadline)
+    return deadline
+
+
+def clear_request_deadline() -> None:
+    _request_deadline.set(None)
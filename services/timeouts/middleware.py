@@ -0,0 +1,118 @@
+import asyncio
+from typing import Callable, Iterable, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.logger import log
+from services.metrics import MetricsRegistry
+from services.timeouts.context import RequestDeadline, clear_request_deadline, start_request_deadline
+from services.timeouts.watchdog import query_watchdog
+from utils.exceptions.exc_504 import http_504_exc_gateway_timeout
+
+
+class TimeoutMiddleware:
+    """
+    Gives every request a deadline for its database work, `timeout` seconds unless the route
+    declares its own with `statement_timeout`. Statements past the deadline are cancelled, and
+    so are those of a request whose client has disconnected; either way the connection goes
+    back to the pool instead of waiting on a query nobody will read.
+
+    A request that ran out of time is answered with a 504, whatever the endpoint made of the
+    cancelled statement, unless its writes had committed: then its own response goes out, and
+    its deadline is lifted for the rest of it. `exempt` path prefixes get no deadline.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry, timeout: float, prefix: str = "", exempt: Iterable[str] = ()):
+        self.app = app
+        self.timeout = timeout
+        self.exempt = tuple(prefix + path for path in exempt)
+        self.timeouts = registry.counter(
+            "request_timeouts_total", "Requests whose database work was cut short, by reason.", ("reason",)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            return await self.app(scope, receive, send)
+
+        deadline = start_request_deadline(self.timeout)
+        receive, stop_listening = self._watch_disconnect(scope, receive, deadline)
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                if deadline.timed_out and not deadline.committed: return await self._send_timeout(scope, send)
+                response_started = True
+            elif message["type"] == "http.response.body" and not response_started:
+                return  # the body of a response replaced by the 504
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            # the cancelled statement's error, or whatever the endpoint turned it into
+            if not deadline.timed_out or deadline.committed or response_started: raise
+            await self._send_timeout(scope, send)
+        finally:
+            stop_listening()
+            # outer middlewares' own database work (idempotency records) is not bound by the request's deadline
+            clear_request_deadline()
+            if deadline.disconnected:
+                self.timeouts.inc(reason="disconnect")
+                log.warning(f"<Timeout> client left {scope['method']} {scope['path']}; its database work was cancelled")
+            elif deadline.timed_out:
+                self.timeouts.inc(reason="deadline")
+                log.warning(f"<Timeout> {scope['method']} {scope['path']} ran out of time for database work")
+
+    @staticmethod
+    def _watch_disconnect(scope: Scope, receive: Receive, deadline: RequestDeadline) -> tuple[Receive, Callable[[], None]]:
+        """
+        Keep listening for `http.disconnect` once the request body is read, without taking
+        messages from the app: its later `receive` calls are answered from here. Returns the
+        `receive` to hand to the app and a function stopping the listener.
+        """
+        headers = dict(scope["headers"])
+        has_body = (b"content-length" in headers and headers[b"content-length"] != b"0") or b"transfer-encoding" in headers
+        disconnected = asyncio.Event()
+        body_sent = False
+        listener: Optional[asyncio.Task] = None
+
+        async def listen() -> None:
+            while (await receive())["type"] != "http.disconnect": pass
+            deadline.disconnected = True
+            disconnected.set()
+            query_watchdog.poke()
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_sent, listener
+            if body_sent:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            if not has_body:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                deadline.disconnected = True
+                disconnected.set()
+            elif not message.get("more_body", False):
+                body_sent = True
+                listener = asyncio.create_task(listen())
+            return message
+
+        def stop() -> None:
+            if listener is not None: listener.cancel()
+
+        if not has_body: listener = asyncio.create_task(listen())
+        return receive_wrapper, stop
+
+    @staticmethod
+    async def _send_timeout(scope: Scope, send: Send) -> None:
+        exc = await http_504_exc_gateway_timeout()
+        response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+
+        async def no_receive() -> Message:
+            return {"type": "http.disconnect"}
+
+        await response(scope, no_receive, send)
@@ -0,0 +1,159 @@
+import threading
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from db.writes import has_writes
+from services.metrics import MetricsRegistry, metrics_registry
+from services.timeouts.context import RequestDeadline, current_request_deadline
+
+# Postgres query_canceled: raised for statement_timeout as well as for a cancel request
+QUERY_CANCELED_SQLSTATE = "57014"
+
+
+class RequestDeadlineExceeded(RuntimeError):
+    pass
+
+
+def _cancel(dbapi_connection: Any) -> None:
+    # psycopg (2 and 3) send a cancel request to the server; sqlite3 interrupts the running statement
+    cancel = getattr(dbapi_connection, "cancel", None) or getattr(dbapi_connection, "interrupt", None)
+    if cancel is not None: cancel()
+
+
+class QueryWatchdog:
+    """
+    Cancels statements still running when their request's deadline passes or its client
+    disconnects.
+
+    The statement blocks the thread that runs it (for async endpoints, the event loop itself),
+    so the cancel has to come from elsewhere: a single daemon thread sleeping until the nearest
+    deadline. Postgres' own `statement_timeout` normally gets there first; the watchdog covers
+    other databases and connections where the server cannot be relied on.
+
+    Each execution is watched under a token of its own, and cancelled while the lock is held:
+    a statement that finished meanwhile is still waiting to unwatch itself, so its connection
+    cannot have gone back to the pool and on to another request's statement.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self._condition = threading.Condition()
+        self._watched: dict[object, tuple[RequestDeadline, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.cancelled = registry.counter(
+            "db_statements_cancelled_total", "Statements cancelled because their request ran out of time."
+        )
+
+    def watch(self, deadline: RequestDeadline, dbapi_connection: Any) -> object:
+        """
+        Watch a statement about to run; returns the token to unwatch it with.
+        """
+        token = object()
+        with self._condition:
+            self._watched[token] = (deadline, dbapi_connection)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-watchdog", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return token
+
+    def unwatch(self, token: Optional[object]) -> None:
+        if token is None: return
+        with self._condition:
+            self._watched.pop(token, None)
+
+    def poke(self) -> None:
+        """
+        Re-check the watched statements now, e.g. after a client disconnected.
+        """
+        with self._condition:
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                expired = [token for token, (deadline, _) in self._watched.items() if deadline.expired]
+                if not expired:
+                    remaining = [deadline.remaining for deadline, _ in self._watched.values()]
+                    self._condition.wait(max(min(remaining), 0.001) if remaining else None)
+                    continue
+                for token in expired:
+                    deadline, dbapi_connection = self._watched.pop(token)
+                    if not deadline.disconnected: deadline.timed_out = True
+                    try:
+                        _cancel(dbapi_connection)
+                        self.cancelled.inc()
+                    except Exception:
+                        log.exception("<QueryWatchdog> could not cancel a statement")
+
+
+query_watchdog = QueryWatchdog(metrics_registry)
+
+
+def instrument_timeouts(engine: Engine, statement_timeout_ms: int = 0) -> None:
+    """
+    Hold every statement run on `engine` for a request to that request's deadline: it is refused
+    once the deadline has passed, and cancelled by the watchdog if it runs past it. A request's
+    budget never lifts the pool's own `statement_timeout_ms` cap.
+    """
+
+    @event.listens_for(engine, "connect")
+    def remember_statement_timeout(dbapi_connection: Any, connection_record: Any):
+        if statement_timeout_ms: connection_record.info["statement_timeout_ms"] = statement_timeout_ms
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def watch_statement(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+        deadline = current_request_deadline()
+        if deadline is None: return
+        if deadline.expired:
+            if not deadline.disconnected: deadline.timed_out = True
+            raise RequestDeadlineExceeded("The request ran out of time for database work")
+        conn.info["watchdog_token"] = query_watchdog.watch(deadline, conn.connection.dbapi_connection)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def unwatch_statement(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+        query_watchdog.unwatch(conn.info.pop("watchdog_token", None))
+
+    @event.listens_for(engine, "handle_error")
+    def unwatch_failed_statement(exception_context: Any):
+        if exception_context.connection is not None:
+            query_watchdog.unwatch(exception_context.connection.info.pop("watchdog_token", None))
+        deadline = current_request_deadline()
+        if deadline is None or deadline.disconnected or deadline.committed: return
+        original = exception_context.original_exception
+        code = getattr(original, "pgcode", None) or getattr(original, "sqlstate", None)
+        if code == QUERY_CANCELED_SQLSTATE or deadline.remaining <= 0: deadline.timed_out = True
+
+
+@event.listens_for(Session, "after_begin")
+def set_statement_timeout(session: Session, transaction: Any, connection: Any) -> None:
+    """
+    Let Postgres enforce what is left of the request's budget on the new transaction's statements,
+    or the pool's own limit if that is tighter.
+    """
+    deadline = current_request_deadline()
+    if deadline is None or deadline.committed or connection.dialect.name != "postgresql": return
+    timeout_ms = max(int(deadline.remaining * 1000), 1)
+    pool_timeout_ms = connection.info.get("statement_timeout_ms")
+    if pool_timeout_ms: timeout_ms = min(timeout_ms, pool_timeout_ms)
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+@event.listens_for(Session, "before_commit")
+def note_committing_writes(session: Session) -> None:
+    deadline = current_request_deadline()
+    if deadline is not None and not deadline.committed and has_writes(session): session.info["committing_deadline"] = deadline
+
+
+@event.listens_for(Session, "after_commit")
+def release_committed_deadline(session: Session) -> None:
+    deadline = session.info.pop("committing_deadline", None)
+    if deadline is not None: deadline.committed = True
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_committing_deadline(session: Session, previous_transaction: Any) -> None:
+    if previous_transaction.parent is None: session.info.pop("committing_deadline", None)
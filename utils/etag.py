@@ -0,0 +1,22 @@
+from typing import Optional
+
+from fastapi import Header, Response
+
+from utils.exceptions.exc_412 import http_412_exc_precondition_failed
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = f'"{version}"'
+
+
+async def if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    Dependency giving the version a conditional update expects, from an If-Match header holding
+    the ETag of an earlier read. None when the header is missing or `*`, i.e. update unconditionally.
+    """
+    if if_match is None or if_match.strip() == "*": return None
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit(): raise await http_412_exc_precondition_failed(
+        "If-Match should hold the ETag of an earlier read of this resource."
+    )
+    return int(tag)
@@ -0,0 +1,24 @@
+"""
+Raises an HTTPException with status code 412 (Precondition Failed).
+
+Typically used when a conditional request's precondition does not hold,
+e.g. the If-Match header names a version of the resource that is no
+longer current.
+
+Args:
+    message (str): A descriptive error message.
+
+Returns:
+    HTTPException: FastAPI exception with status code 412.
+"""
+
+from fastapi import HTTPException, status
+
+
+async def http_412_exc_precondition_failed(
+        message: str = "The resource was modified since it was read. Fetch it again and retry."
+) -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail=message,
+    )
@@ -0,0 +1,23 @@
+"""
+Raises an HTTPException with status code 504 (Gateway Timeout).
+
+Indicates that the request ran out of its time budget waiting on the
+database; the work was cancelled and may be retried.
+
+Args:
+    message (str): A descriptive error message.
+
+Returns:
+    HTTPException: FastAPI exception with status code 504.
+"""
+
+from fastapi import HTTPException, status
+
+
+async def http_504_exc_gateway_timeout(
+        message: str = "The request took too long and was cancelled. Please retry or narrow it down."
+) -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=message,
+    )
@@ -0,0 +1,285 @@
+"""
+Bulk synthetic data for load testing and staging databases (PostgreSQL only).
+
+    python -m utils.seeds.bulk_seed --stocks 100000 --receipts 1000000 --expenses 200000
+
+Rows are generated as numpy arrays and streamed into the tables with `COPY ... FROM STDIN`,
+so the full-size dataset (~5M sales) loads in minutes instead of hours of ORM inserts.
+"""
+import argparse
+import asyncio
+import io
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Sequence
+from uuid import UUID
+
+import pendulum
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from config.logger import log
+
+DRUGS = (
+    "paracetamol", "amoxicillin", "ibuprofen", "metformin", "amlodipine", "omeprazole", "ciprofloxacin",
+    "azithromycin", "artemether", "lumefantrine", "diclofenac", "loratadine", "cetirizine", "salbutamol",
+    "prednisolone", "metronidazole", "doxycycline", "losartan", "atorvastatin", "folic acid",
+)
+FORMS = ("tablet", "capsule", "syrup", "suspension", "injection", "cream")
+STRENGTHS = (5, 10, 20, 50, 100, 250, 500, 1000)
+PAYMENT_TYPES = ("CASH", "MOMO", "CARD")
+EXPENSES = ("rent", "electricity", "water", "salaries", "transport", "internet", "cleaning", "security")
+
+COPY_CHUNK_ROWS = 100_000
+
+
+@dataclass
+class BulkSeedSize:
+    stocks: int = 100_000
+    receipts: int = 1_000_000
+    sales_per_receipt: int = 5  # average; between 1 and 2x-1 sales per receipt
+    expenses: int = 200_000
+    refund_rate: float = 0.02
+    days: int = 365
+
+
+class BulkSeeder:
+    """
+    Generates stocks, receipts, sales and expenses with numpy and loads them with COPY.
+
+    The data keeps the invariants the app maintains: every sale points at an existing stock and
+    receipt, a receipt's `total_cost` is the sum of its sales, refunded receipts soft-delete all
+    their sales, and each stock's `issues`/`total_issues_cost` count its remaining sales.
+    """
+
+    def __init__(self, engine: Engine, size: BulkSeedSize, created_by_id: UUID, seed: int = 42):
+        if engine.dialect.name != "postgresql": raise ValueError(
+            f"COPY seeding needs PostgreSQL, not {engine.dialect.name}"
+        )
+        import numpy as np
+
+        self.np = np
+        self.engine = engine
+        self.size = size
+        self.created_by_id = created_by_id.hex
+        self.rng = np.random.default_rng(seed)
+        self.now = int(pendulum.now("UTC").timestamp())
+
+    async def seed(self) -> None:
+        np = self.np
+        started = pendulum.now()
+        log.info(f"<BulkSeeder> generating {self.size}")
+
+        stocks = self._stocks()
+        receipts, sales = self._receipts_and_sales(stocks)
+        live = ~sales["refunded"]
+        stocks["issues"] = np.bincount(sales["item"][live], minlength=self.size.stocks)
+        stocks["total_issues_cost"] = np.round(
+            np.bincount(sales["item"][live], weights=sales["cost"][live], minlength=self.size.stocks), 2
+        )
+
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            self._copy(cursor, "stocks", self._stock_rows(stocks))
+            self._copy(cursor, "receipts", self._receipt_rows(receipts))
+            self._copy(cursor, "sales", self._sale_rows(sales, receipts, stocks))
+            self._copy(cursor, "expenses", self._expense_rows())
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        # COPY bypasses the ORM hooks that keep the running stock valuation current
+        from domains.shop.services.stock import stock_service
+        with Session(self.engine) as db:
+            await stock_service.reconcile_totals(db=db)
+
+        log.info(
+            f"<BulkSeeder> loaded {self.size.stocks} stocks, {self.size.receipts} receipts, "
+            f"{len(sales['item'])} sales and {self.size.expenses} expenses in {pendulum.now().diff(started).in_words()}"
+        )
+
+    def _uuids(self, count: int) -> list[str]:
+        raw = self.rng.integers(0, 256, size=(count, 16), dtype=self.np.uint8)
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+        hexed = raw.tobytes().hex()
+        return [hexed[i:i + 32] for i in range(0, count * 32, 32)]
+
+    def _timestamps(self, count: int) -> Any:
+        np = self.np
+        seconds = self.now - self.rng.integers(0, self.size.days * 86_400, size=count)
+        return seconds, np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s")
+
+    def _stocks(self) -> dict[str, Any]:
+        np, n = self.np, self.size.stocks
+        purchase_price = np.round(self.rng.uniform(0.5, 200, n), 2)
+        _, created_at = self._timestamps(n)
+        today = np.datetime64(pendulum.now("UTC").date().isoformat(), "D")
+        return {
+            "id": self._uuids(n),
+            "drug": self.rng.integers(0, len(DRUGS), n),
+            "strength": self.rng.integers(0, len(STRENGTHS), n),
+            "form": self.rng.integers(0, len(FORMS), n),
+            "purchase_price": purchase_price,
+            "selling_price": np.round(purchase_price * self.rng.uniform(1.1, 1.6, n), 2),
+            "quantity": self.rng.integers(50, 5_001, n),
+            "expiry_date": np.datetime_as_string(today + self.rng.integers(-60, 3 * 365, n), unit="D"),
+            "created_at": created_at,
+        }
+
+    def _receipts_and_sales(self, stocks: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+        np, n = self.np, self.size.receipts
+        per_receipt = self.rng.integers(1, 2 * self.size.sales_per_receipt, n)
+        receipt = np.repeat(np.arange(n), per_receipt)
+        item = self.rng.integers(0, self.size.stocks, len(receipt))
+        quantity = self.rng.integers(1, 4, len(receipt))
+        cost = np.round(stocks["selling_price"][item] * quantity, 2)
+
+        seconds, created_at = self._timestamps(n)
+        refunded = self.rng.random(n) < self.size.refund_rate
+        deleted_at = np.datetime_as_string((seconds + 300).astype("datetime64[s]"), unit="s")  # refunded 5 minutes later
+        total_cost = np.round(np.bincount(receipt, weights=cost, minlength=n), 2)
+
+        receipts = {
+            "id": self._uuids(n),
+            "total_cost": total_cost,
+            "amount_paid": total_cost + self.rng.choice([0, 0, 0, 0.5, 1, 5], n),
+            "payment_type": self.rng.integers(0, len(PAYMENT_TYPES), n),
+            "created_at": created_at,
+            "deleted_at": deleted_at,
+            "refunded": refunded,
+        }
+        sales = {
+            "id": self._uuids(len(receipt)),
+            "receipt": receipt,
+            "item": item,
+            "quantity": quantity,
+            "cost": cost,
+            "refunded": refunded[receipt],
+        }
+        return receipts, sales
+
+    def _stock_rows(self, stocks: dict[str, Any]) -> Iterator[Sequence[Any]]:
+        columns = (
+            "drug", "strength", "form", "purchase_price", "selling_price", "quantity",
+            "expiry_date", "created_at", "issues", "total_issues_cost",
+        )
+        for index, (stock_id, drug, strength, form, purchase, selling, quantity, expiry, created, issues, issued) in (
+                enumerate(zip(stocks["id"], *(stocks[column].tolist() for column in columns)))
+        ):
+            yield (
+                stock_id, f"STK{index:07d}", f"{DRUGS[drug]} {STRENGTHS[strength]}mg {FORMS[form]}", "",
+                purchase, selling, quantity, expiry, issues, issued, self.created_by_id,
+                f"{created}+00", f"{created}+00", "",
+            )
+
+    def _receipt_rows(self, receipts: dict[str, Any]) -> Iterator[Sequence[Any]]:
+        for receipt_id, total, paid, payment, created, deleted, refunded in zip(
+                receipts["id"], receipts["total_cost"].tolist(), receipts["amount_paid"].tolist(),
+                receipts["payment_type"].tolist(), receipts["created_at"].tolist(),
+                receipts["deleted_at"].tolist(), receipts["refunded"].tolist(),
+        ):
+            deleted_at = f"{deleted}+00" if refunded else ""
+            yield (
+                receipt_id, total, round(paid, 2), self.created_by_id, PAYMENT_TYPES[payment],
+                f"{created}+00", deleted_at or f"{created}+00", deleted_at,
+            )
+
+    def _sale_rows(
+            self, sales: dict[str, Any], receipts: dict[str, Any], stocks: dict[str, Any]
+    ) -> Iterator[Sequence[Any]]:
+        receipt_ids, stock_ids = receipts["id"], stocks["id"]
+        payment_types = receipts["payment_type"].tolist()
+        created, deleted, refunded = (receipts[key].tolist() for key in ("created_at", "deleted_at", "refunded"))
+        for sale_id, receipt, item, quantity, cost in zip(
+                sales["id"], sales["receipt"].tolist(), sales["item"].tolist(),
+                sales["quantity"].tolist(), sales["cost"].tolist(),
+        ):
+            deleted_at = f"{deleted[receipt]}+00" if refunded[receipt] else ""
+            yield (
+                sale_id, quantity, PAYMENT_TYPES[payment_types[receipt]], cost, stock_ids[item],
+                receipt_ids[receipt], self.created_by_id,
+                f"{created[receipt]}+00", deleted_at or f"{created[receipt]}+00", deleted_at,
+            )
+
+    def _expense_rows(self) -> Iterator[Sequence[Any]]:
+        n = self.size.expenses
+        _, paid_at = self._timestamps(n)
+        for expense_id, expense, price, paid in zip(
+                self._uuids(n), self.rng.integers(0, len(EXPENSES), n).tolist(),
+                self.np.round(self.rng.uniform(5, 2_000, n), 2).tolist(), paid_at.tolist(),
+        ):
+            yield expense_id, EXPENSES[expense], price, "", self.created_by_id, paid, f"{paid}+00", f"{paid}+00", ""
+
+    def _copy(self, cursor: Any, table: str, rows: Iterable[Sequence[Any]]) -> None:
+        columns = COPY_COLUMNS[table]
+        statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text, NULL '')"
+        buffer, count = io.StringIO(), 0
+        for row in rows:
+            buffer.write("\t".join(map(str, row)))
+            buffer.write("\n")
+            count += 1
+            if count % COPY_CHUNK_ROWS == 0:
+                self._flush(cursor, statement, buffer)
+                buffer = io.StringIO()
+        self._flush(cursor, statement, buffer)
+        log.info(f"<BulkSeeder> copied {count} rows into {table}")
+
+    def _flush(self, cursor: Any, statement: str, buffer: io.StringIO) -> None:
+        if not buffer.tell(): return
+        buffer.seek(0)
+        if self.engine.dialect.driver == "psycopg":
+            with cursor.copy(statement) as copy: copy.write(buffer.getvalue())
+        else:
+            cursor.copy_expert(statement, buffer)
+
+
+COPY_COLUMNS = {
+    "stocks": (
+        "id", "ref", "name", "description", "purchase_price", "selling_price", "quantity", "expiry_date",
+        "issues", "total_issues_cost", "created_by_id", "created_at", "updated_at", "deleted_at",
+    ),
+    "receipts": (
+        "id", "total_cost", "amount_paid", "created_by_id", "payment_type", "created_at", "updated_at", "deleted_at",
+    ),
+    "sales": (
+        "id", "quantity", "payment_type", "cost", "item_id", "receipt_id", "created_by_id",
+        "created_at", "updated_at", "deleted_at",
+    ),
+    "expenses": (
+        "id", "expense", "price", "description", "created_by_id", "paid_at", "created_at", "updated_at", "deleted_at",
+    ),
+}
+
+
+def seed_bulk_data(size: BulkSeedSize, seed: int = 42) -> None:
+    from db.session import engine
+    from domains.auth.models import User
+    from utils.seeds.create_superuser import SuperAdminInfo, create_system_admin
+
+    asyncio.run(create_system_admin())
+    with engine.connect() as connection:
+        admin_id = connection.execute(select(User.id).where(User.username == SuperAdminInfo.username)).scalar_one()
+    asyncio.run(BulkSeeder(engine, size, created_by_id=admin_id, seed=seed).seed())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m utils.seeds.bulk_seed")
+    parser.add_argument("--stocks", type=int, default=BulkSeedSize.stocks)
+    parser.add_argument("--receipts", type=int, default=BulkSeedSize.receipts)
+    parser.add_argument("--sales-per-receipt", type=int, default=BulkSeedSize.sales_per_receipt)
+    parser.add_argument("--expenses", type=int, default=BulkSeedSize.expenses)
+    parser.add_argument("--refund-rate", type=float, default=BulkSeedSize.refund_rate)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    seed_bulk_data(BulkSeedSize(
+        stocks=args.stocks,
+        receipts=args.receipts,
+        sales_per_receipt=args.sales_per_receipt,
+        expenses=args.expenses,
+        refund_rate=args.refund_rate,
+    ), seed=args.seed)